@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DIARIO INCREMENTAL DE REGISTROS (NDJSON APPEND-ONLY)
+====================================================
+Cada registro enriquecido se agrega como una línea JSON al final del
+diario: costo O(1) por registro, sin releer ni reescribir la base.
+
+La deduplicación, el orden y la exportación a CSV/JSON se hacen aparte,
+en un paso de compactación (`pipeline_completo.compactar_base_datos`),
+una vez al final de la corrida o cuando se pida con `--compactar`.
+
+Si la corrida se corta, los registros ya escritos quedan en el diario y
+se compactan en la próxima.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class DiarioRegistros:
+    """Archivo NDJSON de solo-agregado con los registros pendientes de compactar"""
+
+    def __init__(self, ruta: Path, fsync: bool = False):
+        self.ruta = Path(ruta)
+        self.fsync = fsync
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._archivo = None
+
+    def _abrir(self):
+        if self._archivo is None:
+            self._archivo = open(self.ruta, 'a', encoding='utf-8')
+        return self._archivo
+
+    def agregar(self, registro: Dict[str, Any]) -> None:
+        """Agrega un registro al final del diario y lo baja a disco"""
+        archivo = self._abrir()
+        archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+        archivo.flush()
+        if self.fsync:
+            os.fsync(archivo.fileno())
+
+    def agregar_varios(self, registros: Iterable[Dict[str, Any]]) -> None:
+        for registro in registros:
+            self.agregar(registro)
+
+    def leer(self) -> Iterator[Dict[str, Any]]:
+        """Itera los registros del diario (ignora una última línea truncada)"""
+        if not self.ruta.exists():
+            return
+        with open(self.ruta, 'r', encoding='utf-8') as f:
+            for n, linea in enumerate(f, 1):
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError:
+                    logger.warning(f"⚠️  Línea {n} del diario corrupta, se ignora")
+
+    def leer_todos(self) -> List[Dict[str, Any]]:
+        return list(self.leer())
+
+    def vaciar(self) -> None:
+        """Descarta el diario (después de compactarlo)"""
+        self.cerrar()
+        if self.ruta.exists():
+            self.ruta.unlink()
+
+    def cerrar(self) -> None:
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    def __enter__(self) -> 'DiarioRegistros':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BASE CONSOLIDADA EN PARQUET
+===========================
+La base consolidada de `pipeline_completo.py` se guardaba como CSV (y un
+JSON indentado completo) en cada compactación, y se volvía a leer con
+`pd.read_csv` infiriendo tipos.
+
+Ahora el almacén de trabajo es un Parquet con esquema fijo (`ESQUEMA`):
+
+- los tipos no dependen de la inferencia (rating float, reviews int,
+  place_id/cid/teléfono texto, flags booleanos)
+- se leen solo las columnas pedidas (proyección)
+- los filtros se empujan al lector y se saltean row groups enteros usando
+  las estadísticas min/max (la base se guarda ordenada por rating)
+
+CSV y JSON pasan a ser exportaciones explícitas (`exportar`).
+
+    almacen = AlmacenParquet(DB_PARQUET)
+    df = almacen.leer(
+        columnas=['titulo', 'telefono', 'rating'],
+        filtros=filtro_relevancia(min_rating=4.0, max_rating=4.85, min_votos=100)
+                + filtro_barrio('Palermo')
+    )
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# ESQUEMA
+# ==============================================================================
+
+ESQUEMA = pa.schema([
+    ('titulo', pa.string()),
+    ('categoria', pa.string()),
+    ('telefono', pa.string()),
+    ('direccion', pa.string()),
+    ('ciudad', pa.string()),
+    ('codigo_postal', pa.string()),
+    ('pais', pa.string()),
+    ('barrio', pa.string()),
+    ('latitud', pa.float64()),
+    ('longitud', pa.float64()),
+    ('rating', pa.float64()),
+    ('cantidad_reviews', pa.int64()),
+    ('url', pa.string()),
+    ('dominio', pa.string()),
+    ('place_id', pa.string()),
+    ('cid', pa.string()),
+    ('verificado', pa.bool_()),
+    ('emails', pa.string()),
+    ('whatsapp', pa.string()),
+    ('redes', pa.string()),
+    ('url_menu', pa.string()),
+    ('tiene_web_propia', pa.bool_()),
+    ('es_cadena', pa.bool_()),
+    ('fecha_extraccion', pa.timestamp('us')),
+])
+
+FILAS_POR_GRUPO = 5000
+
+Filtro = Tuple[str, str, Any]
+
+
+def _texto(serie: pd.Series) -> pd.Series:
+    """Texto sin NaN; números enteros sin '.0' (p. ej. cid o teléfono leídos de un CSV)"""
+    def convertir(x):
+        if x is None or (isinstance(x, float) and pd.isna(x)):
+            return ''
+        if isinstance(x, float) and x.is_integer():
+            return str(int(x))
+        return str(x)
+    return serie.map(convertir).astype(object)
+
+
+def _booleano(serie: pd.Series) -> pd.Series:
+    valores = {'true': True, '1': True, 'false': False, '0': False, '': False}
+    return serie.map(
+        lambda x: valores.get(str(x).strip().lower(), False) if not isinstance(x, bool) else x
+    ).astype(bool)
+
+
+def normalizar(df: pd.DataFrame) -> pd.DataFrame:
+    """Lleva un DataFrame de registros al esquema fijo (columnas, orden y tipos)"""
+    extras = [c for c in df.columns if c not in ESQUEMA.names]
+    if extras:
+        logger.debug(f"Columnas fuera del esquema descartadas: {extras}")
+
+    salida = {}
+    for campo in ESQUEMA:
+        serie = df[campo.name] if campo.name in df else pd.Series([None] * len(df), index=df.index)
+        if pa.types.is_string(campo.type):
+            salida[campo.name] = _texto(serie)
+        elif pa.types.is_floating(campo.type):
+            salida[campo.name] = pd.to_numeric(serie, errors='coerce').astype('float64')
+        elif pa.types.is_integer(campo.type):
+            salida[campo.name] = pd.to_numeric(serie, errors='coerce').fillna(0).astype('int64')
+        elif pa.types.is_boolean(campo.type):
+            salida[campo.name] = _booleano(serie)
+        else:
+            salida[campo.name] = pd.to_datetime(serie, errors='coerce', format='mixed')
+    return pd.DataFrame(salida, index=df.index)
+
+
+def filtro_relevancia(
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    min_votos: Optional[int] = None
+) -> List[Filtro]:
+    """Filtros de rating/reviews (los mismos umbrales que `generar_mensajes_palermo`)"""
+    filtros: List[Filtro] = []
+    if min_rating is not None:
+        filtros.append(('rating', '>=', min_rating))
+    if max_rating is not None:
+        filtros.append(('rating', '<=', max_rating))
+    if min_votos is not None:
+        filtros.append(('cantidad_reviews', '>=', min_votos))
+    return filtros
+
+
+def filtro_barrio(barrio: str) -> List[Filtro]:
+    """Negocios de un barrio (la columna `barrio` la asigna `barrios_caba`)"""
+    return [('barrio', '==', barrio.strip().title())]
+
+
+# ==============================================================================
+# ALMACÉN
+# ==============================================================================
+
+class AlmacenParquet:
+    """Base consolidada en un archivo Parquet con esquema fijo"""
+
+    def __init__(self, ruta: Path):
+        self.ruta = Path(ruta)
+
+    def existe(self) -> bool:
+        return self.ruta.exists()
+
+    def leer(
+        self,
+        columnas: Optional[Sequence[str]] = None,
+        filtros: Optional[List[Filtro]] = None
+    ) -> pd.DataFrame:
+        """
+        Lee la base (o solo `columnas`) aplicando `filtros` en el lector,
+        p. ej. [('rating', '>=', 4.0), ('cantidad_reviews', '>=', 100)].
+        """
+        if not self.existe():
+            return pd.DataFrame(columns=list(columnas or ESQUEMA.names))
+        tabla = pq.read_table(
+            self.ruta,
+            columns=list(columnas) if columnas else None,
+            filters=filtros or None,
+            schema=ESQUEMA
+        )
+        return tabla.to_pandas()
+
+    def contar(self) -> int:
+        return pq.ParquetFile(self.ruta).metadata.num_rows if self.existe() else 0
+
+    def guardar(self, df: pd.DataFrame) -> None:
+        """Reemplaza la base de forma atómica (archivo temporal + rename)"""
+        tabla = pa.Table.from_pandas(normalizar(df), schema=ESQUEMA, preserve_index=False)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal = self.ruta.with_suffix('.parquet.tmp')
+        pq.write_table(tabla, temporal, row_group_size=FILAS_POR_GRUPO, compression='zstd')
+        temporal.replace(self.ruta)
+
+    def migrar_desde_csv(self, ruta_csv: Path) -> bool:
+        """Crea el Parquet a partir de una base CSV anterior (una sola vez)"""
+        if self.existe() or not Path(ruta_csv).exists():
+            return False
+        logger.info(f"🔁 Migrando base CSV a Parquet: {ruta_csv} → {self.ruta}")
+        self.guardar(pd.read_csv(ruta_csv, dtype=str, keep_default_na=False))
+        return True
+
+    # --------------------------------------------------------------------------
+    # Exportaciones
+    # --------------------------------------------------------------------------
+
+    def exportar(
+        self,
+        ruta: Path,
+        formato: Optional[str] = None,
+        columnas: Optional[Sequence[str]] = None,
+        filtros: Optional[List[Filtro]] = None
+    ) -> int:
+        """Exporta la base (o una proyección/filtro) a CSV o JSON; devuelve las filas escritas"""
+        ruta = Path(ruta)
+        formato = (formato or ruta.suffix.lstrip('.')).lower()
+        df = self.leer(columnas, filtros)
+        if 'fecha_extraccion' in df:
+            df['fecha_extraccion'] = df['fecha_extraccion'].map(
+                lambda x: x.isoformat() if pd.notna(x) else ''
+            )
+        if formato == 'csv':
+            df.to_csv(ruta, index=False, encoding='utf-8')
+        elif formato == 'json':
+            df.to_json(ruta, orient='records', indent=2, force_ascii=False)
+        else:
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+        return len(df)
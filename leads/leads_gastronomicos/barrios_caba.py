@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASIGNACIÓN DE BARRIOS POR POLÍGONOS
+===================================
+`generar_mensajes_palermo.es_palermo` decidía la ubicación buscando
+palabras ('Palermo', 'Soho', 'C1414'...) en la dirección y el código
+postal: lento por item y poco preciso (direcciones sin barrio, códigos
+postales que cruzan barrios).
+
+`IndiceBarrios` carga los polígonos de los barrios de un GeoJSON local
+(p. ej. el de barrios de data.buenosaires.gob.ar, guardado en
+`datos/barrios_caba.geojson`) y asigna el barrio de muchos puntos de una
+vez:
+
+- una grilla sobre el bounding box guarda, por celda, qué polígonos la
+  tocan; cada punto solo se prueba contra los candidatos de su celda
+- el punto-en-polígono (ray casting, par/impar, así los huecos y los
+  MultiPolygon funcionan solos) está vectorizado con numpy
+
+    indice = IndiceBarrios.desde_geojson(RUTA_BARRIOS)
+    barrios = indice.asignar(df['latitud'], df['longitud'])
+    filas = filas_por_barrio(barrios)['palermo']
+"""
+
+import json
+import logging
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+RUTA_BARRIOS = Path(__file__).parent / "datos" / "barrios_caba.geojson"
+CELDAS_GRILLA = 64                      # la grilla es de CELDAS_GRILLA x CELDAS_GRILLA
+PROPIEDADES_NOMBRE = ('barrio', 'BARRIO', 'nombre', 'NOMBRE', 'name', 'Name')
+
+Anillo = np.ndarray                     # (n, 2) con columnas lon, lat
+
+
+def clave_barrio(nombre: str) -> str:
+    """Nombre comparable: sin acentos, minúsculas ('Núñez', 'NUÑEZ' -> 'nunez')"""
+    texto = unicodedata.normalize('NFD', str(nombre or '').strip().lower())
+    return ' '.join(''.join(c for c in texto if unicodedata.category(c) != 'Mn').split())
+
+
+# ==============================================================================
+# PUNTO EN POLÍGONO
+# ==============================================================================
+
+def _dentro_de_anillos(lon: np.ndarray, lat: np.ndarray, anillos: List[Anillo]) -> np.ndarray:
+    """Ray casting par/impar sobre todos los anillos (exteriores y huecos) de un barrio"""
+    dentro = np.zeros(lon.shape, dtype=bool)
+    for anillo in anillos:
+        x1, y1 = anillo[:-1, 0], anillo[:-1, 1]
+        x2, y2 = anillo[1:, 0], anillo[1:, 1]
+        for ax, ay, bx, by in zip(x1, y1, x2, y2):
+            cruza = (ay > lat) != (by > lat)
+            if not cruza.any():
+                continue
+            x_corte = ax + (lat - ay) * (bx - ax) / ((by - ay) or 1e-300)
+            dentro ^= cruza & (lon < x_corte)
+    return dentro
+
+
+def _anillos_de_geometria(geometria: dict) -> List[Anillo]:
+    tipo = geometria.get('type')
+    coordenadas = geometria.get('coordinates') or []
+    if tipo == 'Polygon':
+        poligonos = [coordenadas]
+    elif tipo == 'MultiPolygon':
+        poligonos = coordenadas
+    else:
+        return []
+    anillos = []
+    for poligono in poligonos:
+        for anillo in poligono:
+            puntos = np.asarray(anillo, dtype=float)[:, :2]
+            if len(puntos) < 3:
+                continue
+            if not np.array_equal(puntos[0], puntos[-1]):
+                puntos = np.vstack([puntos, puntos[:1]])
+            anillos.append(puntos)
+    return anillos
+
+
+# ==============================================================================
+# ÍNDICE
+# ==============================================================================
+
+class IndiceBarrios:
+    """Polígonos de barrios + grilla de candidatos por celda"""
+
+    def __init__(self, barrios: Dict[str, List[Anillo]], celdas: int = CELDAS_GRILLA):
+        if not barrios:
+            raise ValueError("No hay polígonos de barrios")
+        self.nombres: List[str] = list(barrios)
+        self._anillos: List[List[Anillo]] = [barrios[n] for n in self.nombres]
+        self.celdas = celdas
+
+        todos = np.vstack([a for anillos in self._anillos for a in anillos])
+        self._min = todos.min(axis=0)
+        self._max = todos.max(axis=0)
+        self._tam = (self._max - self._min) / celdas
+
+        # candidatos[celda_x, celda_y, barrio]: el bbox del barrio toca la celda
+        self._candidatos = np.zeros((celdas, celdas, len(self.nombres)), dtype=bool)
+        for k, anillos in enumerate(self._anillos):
+            puntos = np.vstack(anillos)
+            (x0, y0), (x1, y1) = self._celda(puntos.min(axis=0)), self._celda(puntos.max(axis=0))
+            self._candidatos[x0:x1 + 1, y0:y1 + 1, k] = True
+
+    @classmethod
+    def desde_geojson(
+        cls,
+        ruta: Union[str, Path] = RUTA_BARRIOS,
+        propiedad: Optional[str] = None,
+        celdas: int = CELDAS_GRILLA
+    ) -> 'IndiceBarrios':
+        """
+        Carga un FeatureCollection de barrios. El nombre sale de `propiedad`
+        o de la primera de `PROPIEDADES_NOMBRE` que exista.
+        """
+        with open(ruta, 'r', encoding='utf-8') as f:
+            geojson = json.load(f)
+        barrios: Dict[str, List[Anillo]] = defaultdict(list)
+        for feature in geojson.get('features', []):
+            propiedades = feature.get('properties') or {}
+            clave = propiedad or next((p for p in PROPIEDADES_NOMBRE if p in propiedades), None)
+            nombre = str(propiedades.get(clave, '')).strip().title() if clave else ''
+            anillos = _anillos_de_geometria(feature.get('geometry') or {})
+            if nombre and anillos:
+                barrios[nombre].extend(anillos)
+        logger.info(f"🗺️  {len(barrios)} barrios cargados de {Path(ruta).name}")
+        return cls(dict(barrios), celdas)
+
+    @classmethod
+    def cargar(cls, ruta: Union[str, Path] = RUTA_BARRIOS) -> Optional['IndiceBarrios']:
+        """Como `desde_geojson`, pero devuelve None si el archivo no está"""
+        if not Path(ruta).exists():
+            logger.warning(f"⚠️  Sin polígonos de barrios ({ruta}); se usa la dirección")
+            return None
+        return cls.desde_geojson(ruta)
+
+    def _celda(self, punto: np.ndarray) -> Tuple[int, int]:
+        celda = np.floor((punto - self._min) / self._tam).astype(int)
+        celda = np.clip(celda, 0, self.celdas - 1)
+        return int(celda[0]), int(celda[1])
+
+    def asignar(self, latitudes: Iterable[float], longitudes: Iterable[float]) -> np.ndarray:
+        """
+        Barrio de cada punto ('' si cae fuera de todos o no tiene
+        coordenadas), en una sola pasada vectorizada.
+        """
+        lat = np.asarray(latitudes, dtype=float)
+        lon = np.asarray(longitudes, dtype=float)
+        resultado = np.full(lat.shape, '', dtype=object)
+
+        validos = np.isfinite(lat) & np.isfinite(lon) \
+            & (lon >= self._min[0]) & (lon <= self._max[0]) \
+            & (lat >= self._min[1]) & (lat <= self._max[1])
+        posiciones = np.flatnonzero(validos)
+        if posiciones.size == 0:
+            return resultado
+
+        lon_v, lat_v = lon[posiciones], lat[posiciones]
+        cx = np.clip(((lon_v - self._min[0]) / self._tam[0]).astype(int), 0, self.celdas - 1)
+        cy = np.clip(((lat_v - self._min[1]) / self._tam[1]).astype(int), 0, self.celdas - 1)
+        candidatos = self._candidatos[cx, cy]                 # (puntos, barrios)
+        pendiente = np.ones(posiciones.size, dtype=bool)
+
+        for k, nombre in enumerate(self.nombres):
+            probar = np.flatnonzero(candidatos[:, k] & pendiente)
+            if probar.size == 0:
+                continue
+            dentro = _dentro_de_anillos(lon_v[probar], lat_v[probar], self._anillos[k])
+            encontrados = probar[dentro]
+            resultado[posiciones[encontrados]] = nombre
+            pendiente[encontrados] = False
+        return resultado
+
+    def barrio(self, latitud: float, longitud: float) -> str:
+        return self.asignar([latitud], [longitud])[0]
+
+
+def filas_por_barrio(barrios: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Índice barrio -> posiciones de las filas (clave normalizada con `clave_barrio`)"""
+    valores, inversa = np.unique(np.asarray(barrios, dtype=str), return_inverse=True)
+    orden = np.argsort(inversa, kind='stable')
+    grupos = np.split(orden, np.cumsum(np.bincount(inversa, minlength=len(valores)))[:-1])
+
+    indice: Dict[str, List[np.ndarray]] = defaultdict(list)
+    for valor, grupo in zip(valores, grupos):
+        clave = clave_barrio(valor)
+        if clave:
+            indice[clave].append(grupo)
+    return {c: (g[0] if len(g) == 1 else np.sort(np.concatenate(g))) for c, g in indice.items()}
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MICRO-BENCHMARKS DE ESCALADO
+============================
+Los validadores (`es_email_valido`), la clasificación (`es_cadena_grande`),
+`normalizar_titulo` y las dos deduplicaciones (`consolidar_y_guardar`,
+`eliminar_duplicados_y_guardar`) nunca se habían medido con más de unos
+miles de filas.
+
+Este script arma datos sintéticos con la forma de los reales:
+
+- `generar_items(n)`: items de DataForSEO (`title`, `address_info`,
+  `rating.value`, `place_id`...), con repetidos por place_id, el mismo
+  negocio con otro place_id, locales de cadenas y perfiles de redes
+- `generar_registros(n)`: los `registro` que arma `procesar_negocio`
+  a partir de esos items (forma `pipeline` o `directo`)
+- `generar_emails(n)`: candidatos a email, válidos y falsos positivos
+
+y mide cada función a 10k, 100k y 1M filas: tiempo (pasada sin
+tracemalloc), memoria asignada neta y pico (pasada con tracemalloc, con
+las líneas que más asignan) y pico de RSS del proceso.
+
+Las deduplicaciones escriben en un directorio temporal, no en
+`resultados/`.
+
+Uso:
+    python3 benchmark_escalado.py
+    python3 benchmark_escalado.py --tamanos 10000 100000 --funciones consolidar_y_guardar
+    python3 benchmark_escalado.py --sin-tracemalloc     # 1M filas con menos memoria
+
+El resultado queda en `resultados/benchmarks/escalado_<timestamp>.json`.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import random
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+TAMANOS = (10_000, 100_000, 1_000_000)
+SEMILLA = 7
+LINEAS_TOP = 5                      # líneas que más asignan, por medición
+
+DIRECTORIO_RESULTADOS = Path(__file__).parent / "resultados" / "benchmarks"
+
+# Composición de los datos sintéticos
+PROPORCION_REPETIDOS = 0.10         # mismo place_id (aparece en dos búsquedas)
+PROPORCION_MISMO_NEGOCIO = 0.04     # otro place_id, mismo teléfono/dirección y título parecido
+PROPORCION_CADENAS = 0.05
+PROPORCION_REDES = 0.10             # la "web" es Instagram/Facebook
+PROPORCION_SIN_WEB = 0.25
+PROPORCION_CON_EMAIL = 0.40         # de los que tienen web propia
+
+_RUBROS = ('Parrilla', 'Bodegón', 'Café', 'Pizzería', 'Cantina', 'Bar', 'Restaurant',
+           'Trattoria', 'Cervecería', 'Sushi', 'Heladería', 'Panadería')
+_NOMBRES = ('Don Mario', 'La Esquina', 'El Puerto', 'Los Amigos', 'Lo de Tito', 'La Dorita',
+            'El Federal', 'La Vecina', 'El Obrero', 'Santa Rosa', 'La Rambla', 'Güerrín',
+            'El Preferido', 'La Cabrera', 'Don Julio', 'El Cuartito', 'Las Violetas', 'Ñandú')
+_SUFIJOS = ('', '', '', ' - Sucursal Palermo', ' Belgrano', ' 2', ' Recoleta', ' San Telmo', ' (Local 3)')
+_CADENAS = ('Starbucks', 'Café Martínez', 'Havanna', 'Burger King', 'Mostaza', 'Freddo', 'McDonald\'s')
+_CALLES = ('Av. Corrientes', 'Av. Santa Fe', 'Honduras', 'Thames', 'Defensa', 'Av. Cabildo',
+           'Gorriti', 'Av. Córdoba', 'Arenales', 'Juncal', 'Av. Rivadavia', 'Humboldt')
+_CATEGORIAS = ('Restaurant', 'Bar', 'Cafe', 'Pizza restaurant', 'Steak house', 'Coffee shop', 'Pub')
+_REDES = ('https://www.instagram.com/{}/', 'https://www.facebook.com/{}', 'https://linktr.ee/{}')
+_TLDS = ('.com.ar', '.com', '.ar', '.com.ar')
+_LOCALES = ('info', 'reservas', 'hola', 'contacto', 'eventos', 'administracion', 'ventas')
+_PROVEEDORES = ('gmail.com', 'hotmail.com', 'yahoo.com.ar', 'outlook.com')
+_FALSOS_EMAILS = (
+    'logo@2x.png', 'icon-home@3x.webp', 'a1b2c3d4e5f6@o123456.ingest.sentry.io',
+    'user@example.com', 'tu@email.com', 'nombre@dominio', 'info@wixpress.com',
+    'bootstrap@5.3.0', 'x@y.z', 'email@tudominio.com',
+)
+_FECHA = datetime(2025, 10, 15, 17, 19, 24).isoformat()
+_LETRAS = 'abcdefghijklmnopqrstuvwxyz'
+_BASE_PLACE_ID = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-'
+
+
+def _slug(texto: str) -> str:
+    tabla = str.maketrans('áéíóúüñ', 'aeiouun')
+    return ''.join(c for c in texto.lower().translate(tabla) if c.isalnum())
+
+
+# ==============================================================================
+# DATOS SINTÉTICOS
+# ==============================================================================
+
+def _item_nuevo(rng: random.Random) -> Dict[str, Any]:
+    es_cadena = rng.random() < PROPORCION_CADENAS
+    if es_cadena:
+        nombre = rng.choice(_CADENAS)
+        titulo = f"{nombre}{rng.choice(_SUFIJOS[3:])}"
+    else:
+        nombre = f"{rng.choice(_RUBROS)} {rng.choice(_NOMBRES)} {''.join(rng.choices(_LETRAS, k=3))}"
+        titulo = f"{nombre}{rng.choice(_SUFIJOS)}"
+    slug = _slug(nombre)
+
+    azar = rng.random()
+    if azar < PROPORCION_SIN_WEB:
+        url, dominio = None, None
+    elif azar < PROPORCION_SIN_WEB + PROPORCION_REDES:
+        url = rng.choice(_REDES).format(slug)
+        dominio = url.split('/')[2]
+    else:
+        dominio = f"www.{slug}{rng.choice(_TLDS)}"
+        url = f"https://{dominio}/"
+
+    return {
+        'type': 'maps_search',
+        'title': titulo,
+        'category': rng.choice(_CATEGORIAS),
+        'address': f"{rng.choice(_CALLES)} {rng.randint(100, 6000)}, C{rng.randint(1000, 1440)} CABA",
+        'address_info': {'city': 'Buenos Aires', 'zip': f"C{rng.randint(1000, 1440)}", 'country_code': 'AR'},
+        'phone': f"+54 11 {rng.randint(4000, 6999)}-{rng.randint(1000, 9999)}" if rng.random() < 0.85 else None,
+        'url': url,
+        'domain': dominio,
+        'latitude': -34.6037 + rng.uniform(-0.09, 0.09),
+        'longitude': -58.3816 + rng.uniform(-0.11, 0.11),
+        'rating': {'rating_type': 'Max5', 'value': round(rng.uniform(3.0, 5.0), 1), 'votes_count': int(rng.paretovariate(1.2) * 20)},
+        'place_id': 'ChIJ' + ''.join(rng.choices(_BASE_PLACE_ID, k=23)),
+        'cid': str(rng.randrange(10 ** 18, 10 ** 19)),
+        'is_claimed': rng.random() < 0.6,
+        '_es_cadena': es_cadena,
+    }
+
+
+def generar_items(n: int, semilla: int = SEMILLA) -> Iterator[Dict[str, Any]]:
+    """`n` items con la forma de `tasks[].result[].items[]` de DataForSEO"""
+    rng = random.Random(semilla)
+    recientes: List[Dict[str, Any]] = []
+    for _ in range(n):
+        azar = rng.random()
+        if recientes and azar < PROPORCION_REPETIDOS:
+            item = dict(rng.choice(recientes))
+        elif recientes and azar < PROPORCION_REPETIDOS + PROPORCION_MISMO_NEGOCIO:
+            base = rng.choice(recientes)
+            item = _item_nuevo(rng)
+            item.update({k: base[k] for k in ('phone', 'address', 'address_info', 'latitude', 'longitude', '_es_cadena')})
+            item['title'] = base['title'] + rng.choice((' - Sucursal', ' Resto', ' Bar', ''))
+        else:
+            item = _item_nuevo(rng)
+        if len(recientes) < 1000:
+            recientes.append(item)
+        else:
+            recientes[rng.randrange(1000)] = item
+        yield item
+
+
+def generar_emails(n: int, semilla: int = SEMILLA) -> List[str]:
+    """Candidatos a email como los que salen del regex: propios, de proveedores y falsos positivos"""
+    rng = random.Random(semilla)
+    emails = []
+    for _ in range(n):
+        azar = rng.random()
+        if azar < 0.45:
+            emails.append(f"{rng.choice(_LOCALES)}@{_slug(rng.choice(_NOMBRES))}{rng.choice(_TLDS)}")
+        elif azar < 0.70:
+            emails.append(f"{_slug(rng.choice(_NOMBRES))}{rng.randint(1, 99)}@{rng.choice(_PROVEEDORES)}")
+        else:
+            emails.append(rng.choice(_FALSOS_EMAILS))
+    return emails
+
+
+def registro_de_item(item: Dict[str, Any], rng: random.Random, forma: str = 'pipeline') -> Dict[str, Any]:
+    """El `registro` que arma `procesar_negocio` (pipeline) o `procesar_negocio_para_email` (directo)"""
+    url = item.get('url') or ''
+    dominio = item.get('domain') or ''
+    tiene_web_propia = bool(url) and 'www.' in dominio
+    emails = ''
+    if tiene_web_propia and not item['_es_cadena'] and rng.random() < PROPORCION_CON_EMAIL:
+        emails = ', '.join(f"{l}@{dominio[4:]}" for l in rng.sample(_LOCALES, rng.choice((1, 1, 2))))
+    telefono = item.get('phone') or ''
+    registro = {
+        'titulo': item['title'],
+        'categoria': item['category'],
+        'telefono': telefono,
+        'direccion': item['address'],
+        'ciudad': item['address_info']['city'],
+    }
+    if forma == 'pipeline':
+        registro.update({
+            'codigo_postal': item['address_info']['zip'],
+            'pais': item['address_info']['country_code'],
+            'latitud': item['latitude'],
+            'longitud': item['longitude'],
+        })
+    registro.update({
+        'rating': item['rating']['value'],
+        'cantidad_reviews': item['rating']['votes_count'],
+        'url': url,
+        'dominio': dominio,
+        'place_id': item['place_id'],
+    })
+    if forma == 'pipeline':
+        registro.update({'cid': item['cid'], 'verificado': item['is_claimed']})
+    registro['emails'] = emails
+    if forma == 'pipeline':
+        registro['whatsapp'] = telefono
+    registro.update({
+        'tiene_web_propia': tiene_web_propia,
+        'es_cadena': item['_es_cadena'],
+        'fecha_extraccion': _FECHA,
+    })
+    return registro
+
+
+def generar_registros(n: int, semilla: int = SEMILLA, forma: str = 'pipeline') -> List[Dict[str, Any]]:
+    rng = random.Random(semilla + 1)
+    return [registro_de_item(item, rng, forma) for item in generar_items(n, semilla)]
+
+
+# ==============================================================================
+# MEDICIÓN
+# ==============================================================================
+
+@dataclass
+class Medicion:
+    funcion: str
+    filas: int
+    segundos: float = 0.0
+    pico_rss_mb: Optional[float] = None
+    asignado_neto_mb: Optional[float] = None
+    pico_tracemalloc_mb: Optional[float] = None
+    top_asignaciones: List[Dict[str, Any]] = field(default_factory=list)
+    omitido: Optional[str] = None
+
+    def resumen(self) -> Dict[str, Any]:
+        if self.omitido:
+            return {'funcion': self.funcion, 'filas': self.filas, 'omitido': self.omitido}
+        return {
+            'funcion': self.funcion,
+            'filas': self.filas,
+            'segundos': round(self.segundos, 4),
+            'us_por_fila': round(self.segundos / self.filas * 1e6, 3) if self.filas else None,
+            'filas_por_segundo': round(self.filas / self.segundos) if self.segundos else None,
+            'pico_rss_mb': self.pico_rss_mb,
+            'asignado_neto_mb': self.asignado_neto_mb,
+            'pico_tracemalloc_mb': self.pico_tracemalloc_mb,
+            'top_asignaciones': self.top_asignaciones,
+        }
+
+
+_MB = 1024 * 1024
+
+
+def _rss_pico_kb() -> Optional[int]:
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reiniciar_rss_pico() -> bool:
+    """Linux: vuelve el pico de RSS (VmHWM) al RSS actual"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def _sin_logs() -> Iterator[None]:
+    logging.disable(logging.INFO)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def medir(nombre: str, filas: int, funcion: Callable[[], Any], con_tracemalloc: bool = True) -> Medicion:
+    """Una pasada cronometrada (con pico de RSS) y, opcionalmente, otra con tracemalloc"""
+    medicion = Medicion(nombre, filas)
+
+    gc.collect()
+    rss_medible = _reiniciar_rss_pico()
+    rss_antes = _rss_pico_kb()
+    with _sin_logs():
+        inicio = time.perf_counter()
+        funcion()
+        medicion.segundos = time.perf_counter() - inicio
+    if rss_medible and rss_antes is not None:
+        medicion.pico_rss_mb = round((_rss_pico_kb() - rss_antes) / 1024, 1)
+
+    if con_tracemalloc:
+        gc.collect()
+        tracemalloc.start()
+        antes = tracemalloc.take_snapshot()
+        with _sin_logs():
+            resultado = funcion()
+        despues = tracemalloc.take_snapshot()
+        actual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del resultado
+        diferencias = despues.compare_to(antes, 'lineno')
+        medicion.asignado_neto_mb = round(sum(d.size_diff for d in diferencias) / _MB, 2)
+        medicion.pico_tracemalloc_mb = round(pico / _MB, 2)
+        medicion.top_asignaciones = [
+            {
+                'linea': f"{Path(d.traceback[0].filename).name}:{d.traceback[0].lineno}",
+                'mb': round(d.size_diff / _MB, 3),
+                'bloques': d.count_diff,
+            }
+            for d in sorted(diferencias, key=lambda d: d.size_diff, reverse=True)[:LINEAS_TOP]
+        ]
+    return medicion
+
+
+# ==============================================================================
+# FUNCIONES MEDIDAS
+# ==============================================================================
+
+class Entradas:
+    """Datos de un tamaño, generados una sola vez y compartidos por las funciones"""
+
+    def __init__(self, filas: int, semilla: int):
+        self.filas = filas
+        self.semilla = semilla
+        self._cache: Dict[str, Any] = {}
+
+    def _obtener(self, clave: str, generar: Callable[[], Any]) -> Any:
+        if clave not in self._cache:
+            inicio = time.perf_counter()
+            self._cache[clave] = generar()
+            logger.info(f"   🧬 {clave}: {self.filas} filas generadas en {time.perf_counter() - inicio:.1f}s")
+        return self._cache[clave]
+
+    def emails(self) -> List[str]:
+        return self._obtener('emails', lambda: generar_emails(self.filas, self.semilla))
+
+    def titulos_y_dominios(self) -> List[Tuple[str, str]]:
+        return self._obtener('titulos', lambda: [
+            (item['title'], item.get('domain') or '') for item in generar_items(self.filas, self.semilla)
+        ])
+
+    def registros(self, forma: str) -> List[Dict[str, Any]]:
+        # Una forma por vez: a 1M filas no entran las dos en memoria
+        clave = f"registros_{forma}"
+        for otra in [k for k in self._cache if k.startswith('registros_') and k != clave]:
+            del self._cache[otra]
+        return self._obtener(clave, lambda: generar_registros(self.filas, self.semilla, forma))
+
+
+def _es_email_valido_pipeline(entradas: Entradas) -> Callable[[], Any]:
+    from pipeline_completo import es_email_valido
+    emails = entradas.emails()
+    return lambda: [es_email_valido(e) for e in emails]
+
+
+def _es_email_valido_directo(entradas: Entradas) -> Callable[[], Any]:
+    from extraer_emails_directamente import es_email_valido
+    emails = entradas.emails()
+    return lambda: [es_email_valido(e) for e in emails]
+
+
+def _es_cadena_grande(entradas: Entradas) -> Callable[[], Any]:
+    from clasificacion_negocios import es_cadena_grande
+    pares = entradas.titulos_y_dominios()
+    es_cadena_grande('', '')                    # arma la tabla de acentos (lru_cache) fuera de la medición
+    return lambda: [es_cadena_grande(t, d) for t, d in pares]
+
+
+def _normalizar_titulo(agresivo: bool) -> Callable[[Entradas], Callable[[], Any]]:
+    def preparar(entradas: Entradas) -> Callable[[], Any]:
+        from resolucion_entidades import normalizar_titulo
+        titulos = [t for t, _ in entradas.titulos_y_dominios()]
+        return lambda: [normalizar_titulo(t, agresivo) for t in titulos]
+    return preparar
+
+
+@contextmanager
+def _salida_temporal(modulo, **rutas: str) -> Iterator[None]:
+    """Apunta las rutas de salida del módulo a un directorio temporal mientras dura la medición"""
+    originales = {nombre: getattr(modulo, nombre) for nombre in ('OUTPUT_DIR', *rutas)}
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as directorio:
+        modulo.OUTPUT_DIR = Path(directorio)
+        for nombre, archivo in rutas.items():
+            setattr(modulo, nombre, Path(directorio) / archivo)
+        try:
+            yield
+        finally:
+            for nombre, valor in originales.items():
+                setattr(modulo, nombre, valor)
+
+
+def _consolidar_y_guardar(entradas: Entradas) -> Callable[[], Any]:
+    import pandas as pd
+    import pipeline_completo
+    registros = entradas.registros('pipeline')
+
+    def ejecutar():
+        with _salida_temporal(pipeline_completo, DB_PARQUET='base.parquet'):
+            pipeline_completo.consolidar_y_guardar(registros, pd.DataFrame())
+    return ejecutar
+
+
+def _eliminar_duplicados_y_guardar(entradas: Entradas) -> Callable[[], Any]:
+    import extraer_emails_directamente
+    registros = entradas.registros('directo')
+
+    def ejecutar():
+        with _salida_temporal(extraer_emails_directamente, CSV_FINAL='emails.csv'):
+            extraer_emails_directamente.eliminar_duplicados_y_guardar(registros)
+    return ejecutar
+
+
+FUNCIONES: Dict[str, Callable[[Entradas], Callable[[], Any]]] = {
+    'es_email_valido_pipeline': _es_email_valido_pipeline,
+    'es_email_valido_directo': _es_email_valido_directo,
+    'es_cadena_grande': _es_cadena_grande,
+    'normalizar_titulo': _normalizar_titulo(False),
+    'normalizar_titulo_agresivo': _normalizar_titulo(True),
+    'consolidar_y_guardar': _consolidar_y_guardar,
+    'eliminar_duplicados_y_guardar': _eliminar_duplicados_y_guardar,
+}
+
+
+# ==============================================================================
+# MAIN
+# ==============================================================================
+
+def ejecutar_benchmark(
+    tamanos: List[int],
+    funciones: List[str],
+    semilla: int = SEMILLA,
+    con_tracemalloc: bool = True
+) -> List[Medicion]:
+    mediciones = []
+    for filas in tamanos:
+        logger.info(f"\n📏 {filas:,} filas")
+        entradas = Entradas(filas, semilla)
+        for nombre in funciones:
+            try:
+                funcion = FUNCIONES[nombre](entradas)
+            except ImportError as e:
+                medicion = Medicion(nombre, filas, omitido=f"No se pudo importar: {e}")
+                logger.warning(f"   ⏭️  {nombre}: {medicion.omitido}")
+                mediciones.append(medicion)
+                continue
+            medicion = medir(nombre, filas, funcion, con_tracemalloc)
+            r = medicion.resumen()
+            logger.info(
+                f"   ⏱️  {nombre:<30} {r['segundos']:>9.3f}s  {r['us_por_fila']:>9.2f} µs/fila"
+                + (f"  pico {r['pico_tracemalloc_mb']:.1f} MB" if r['pico_tracemalloc_mb'] is not None else '')
+                + (f"  RSS +{r['pico_rss_mb']:.0f} MB" if r['pico_rss_mb'] is not None else '')
+            )
+            mediciones.append(medicion)
+        del entradas
+        gc.collect()
+    return mediciones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks de escalado (validadores, normalización, deduplicación)')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS), help='Filas por medición')
+    parser.add_argument('--funciones', nargs='+', choices=list(FUNCIONES), default=list(FUNCIONES))
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--sin-tracemalloc', action='store_true',
+                        help='Solo tiempo y pico de RSS (tracemalloc duplica la memoria a 1M filas)')
+    parser.add_argument('--salida', type=Path, help='JSON de resultados (por defecto en resultados/benchmarks/)')
+    args = parser.parse_args()
+
+    mediciones = ejecutar_benchmark(args.tamanos, args.funciones, args.semilla, not args.sin_tracemalloc)
+
+    informe = {
+        'fecha': datetime.now().isoformat(),
+        'parametros': {
+            'tamanos': args.tamanos, 'semilla': args.semilla, 'tracemalloc': not args.sin_tracemalloc,
+        },
+        'mediciones': [m.resumen() for m in mediciones],
+    }
+    salida = args.salida or DIRECTORIO_RESULTADOS / f"escalado_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+
+    logger.info("\n" + "=" * 92)
+    logger.info(f"{'FUNCIÓN':<32}{'FILAS':>10}{'SEGUNDOS':>11}{'µS/FILA':>10}{'NETO MB':>10}{'PICO MB':>10}{'RSS MB':>9}")
+    logger.info("=" * 92)
+    for m in informe['mediciones']:
+        if 'omitido' in m:
+            logger.info(f"{m['funcion']:<32}{m['filas']:>10}  omitido")
+            continue
+        neto = m['asignado_neto_mb']
+        pico = m['pico_tracemalloc_mb']
+        rss = m['pico_rss_mb']
+        logger.info(
+            f"{m['funcion']:<32}{m['filas']:>10}{m['segundos']:>11.3f}{m['us_por_fila']:>10.2f}"
+            f"{neto if neto is not None else '-':>10}{pico if pico is not None else '-':>10}"
+            f"{rss if rss is not None else '-':>9}"
+        )
+    logger.info(f"\n📁 Resultados: {salida}")
+
+
+if __name__ == "__main__":
+    main()
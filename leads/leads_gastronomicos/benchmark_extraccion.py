@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK OFFLINE DE EXTRACCIÓN DE CONTACTOS
+============================================
+Ningún cambio a `extraer_emails_de_url`, `extraer_emails_de_html` o
+`extraer_whatsapp_playwright` se podía medir: no había benchmark y la
+única prueba era correr el pipeline contra la red real.
+
+Este script levanta un servidor HTTP local (aiohttp, en un hilo) que
+sirve miles de sitios sintéticos de restaurantes, cada uno en su propio
+host `<slug>.localhost` (se resuelven a 127.0.0.1 dentro del proceso;
+Chromium ya resuelve `*.localhost` a loopback). Cada sitio tiene:
+
+- latencia log-normal (mediana `LATENCIA_MEDIANA`, escalable)
+- email en el texto de la home, en un `mailto:`, solo en /contacto, en una
+  página grande (~1 MB) o inyectado por JavaScript; o ninguno
+- WhatsApp en un enlace wa.me, en el texto o inyectado por JavaScript
+- algunos redirigen (301), otros se cuelgan hasta el timeout o dan 500
+- señuelos que no son emails (`logo@2x.png`, DSN de Sentry)
+
+Como cada sitio sabe qué contactos tiene, para cada camino de extracción
+se informa sitios/segundo, latencia p50/p95 y tasa de acierto (por tipo
+de sitio), además de los falsos positivos. Sin red.
+
+Caminos:
+    html_pipeline        pipeline_completo.extraer_emails_de_html sobre las homes en memoria
+    html_directo         extraer_emails_directamente.extraer_emails_de_html, ídem
+    url_secuencial       pipeline_completo.extraer_emails_de_url, una URL por vez (muestra)
+    urls_concurrente     descarga_concurrente.extraer_emails_de_urls
+    sitios_rastreo       rastreo_contactos.enriquecer_sitios con `emails_pipeline` (home + contacto)
+    whatsapp_estatico    enriquecer_sitios con `whatsapp` + `senal_js`, solo la home (cuántas irían al navegador)
+    sitios_enriquecidos  rastreo_contactos.enriquecer_sitios: emails + WhatsApp + redes + carta
+                         en una sola pasada (comparar `pedidos_http` con los dos caminos anteriores)
+    whatsapp_playwright  pipeline_completo.extraer_whatsapp_playwright (muestra)
+    whatsapp_pool        pool_playwright.PoolNavegadores (muestra)
+
+Uso:
+    python3 benchmark_extraccion.py
+    python3 benchmark_extraccion.py --sitios 5000 --caminos urls_concurrente sitios_rastreo
+    python3 benchmark_extraccion.py --escala-latencia 0      # solo CPU, sin esperas
+
+El resultado queda en `resultados/benchmarks/extraccion_<timestamp>.json`.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+import socket
+import statistics
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from aiohttp import web
+
+from metricas import METRICAS
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+SITIOS = 2000
+SEMILLA = 7
+TIMEOUT_SEGUNDOS = 5
+MUESTRA_SECUENCIAL = 100           # url_secuencial hace una URL por vez
+MUESTRA_NAVEGADOR = 30             # caminos con Playwright
+CONCURRENCIA = 50
+
+LATENCIA_MEDIANA = 0.08            # segundos
+LATENCIA_SIGMA = 0.8               # log-normal: p95 ~ 3.7x la mediana
+LATENCIA_MAXIMA = 3.0
+KB_PAGINA_GRANDE = 1024
+
+DIRECTORIO_RESULTADOS = Path(__file__).parent / "resultados" / "benchmarks"
+SUFIJO_HOSTS = '.localhost'
+
+# Dónde está el email de cada sitio (proporciones)
+UBICACIONES_EMAIL = {
+    'home_texto': 0.30,
+    'mailto': 0.15,
+    'contacto': 0.15,              # solo en /contacto, enlazada desde la home
+    'js': 0.10,                    # lo arma un script: solo lo ve un navegador
+    'grande': 0.05,                # al final de una home de ~1 MB
+    'ninguno': 0.25,
+}
+UBICACIONES_WHATSAPP = {'enlace': 0.30, 'texto': 0.05, 'js': 0.10, 'ninguno': 0.55}
+PROPORCION_REDIRIGE = 0.10
+PROPORCION_COLGADO = 0.02
+PROPORCION_ERROR = 0.02
+PROPORCION_SENUELOS = 0.30
+
+CAMINOS = (
+    'html_pipeline', 'html_directo', 'url_secuencial', 'urls_concurrente',
+    'sitios_rastreo', 'whatsapp_estatico', 'sitios_enriquecidos', 'whatsapp_playwright', 'whatsapp_pool',
+)
+CAMINOS_NAVEGADOR = ('whatsapp_playwright', 'whatsapp_pool')
+
+_TIPOS = ('Parrilla', 'Bodegón', 'Café', 'Pizzería', 'Cantina', 'Bar', 'Trattoria', 'Cervecería', 'Sushi')
+_NOMBRES = ('Don Mario', 'La Esquina', 'El Puerto', 'Los Amigos', 'Lo de Tito', 'La Dorita',
+            'El Federal', 'San Telmo', 'La Vecina', 'El Obrero', 'Santa Rosa', 'La Rambla')
+_LOCALES = ('info', 'reservas', 'hola', 'contacto', 'eventos', 'administracion')
+_RELLENO = (
+    'Cocina de autor con productos de estación y una carta de vinos argentinos. ',
+    'Abrimos de martes a domingo para almuerzo y cena, con opciones sin TACC. ',
+    'Nuestro salón tiene capacidad para eventos privados y cumpleaños. ',
+    'Pastas caseras, carnes a la parrilla y postres de la casa todos los días. ',
+)
+
+
+def _letras(n: int) -> str:
+    """Id en letras (sin dígitos, así ningún validador descarta el email)"""
+    letras = ''
+    n += 1
+    while n:
+        n, r = divmod(n - 1, 26)
+        letras = chr(ord('a') + r) + letras
+    return letras
+
+
+def _slug(texto: str) -> str:
+    texto = unicodedata.normalize('NFD', texto.lower())
+    texto = ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
+    return re.sub(r'[^a-z0-9]+', '-', texto).strip('-')
+
+
+def _digitos(numero: Optional[str]) -> str:
+    return re.sub(r'\D', '', numero or '')
+
+
+# ==============================================================================
+# SITIOS SINTÉTICOS
+# ==============================================================================
+
+@dataclass
+class SitioSintetico:
+    """Un sitio de restaurante y la verdad de qué contactos tiene"""
+    host: str
+    nombre: str
+    emails: Set[str] = field(default_factory=set)
+    ubicacion_email: str = 'ninguno'
+    whatsapp: Optional[str] = None
+    ubicacion_whatsapp: str = 'ninguno'
+    latencia: float = 0.0
+    redirige: bool = False
+    colgado: bool = False
+    error: bool = False
+    senuelos: bool = False
+
+    def url(self, puerto: int) -> str:
+        return f"http://{self.host}:{puerto}/"
+
+
+def _elegir(rng: random.Random, proporciones: Dict[str, float]) -> str:
+    return rng.choices(list(proporciones), weights=list(proporciones.values()))[0]
+
+
+def generar_sitios(n: int = SITIOS, semilla: int = SEMILLA) -> List[SitioSintetico]:
+    """`n` sitios reproducibles (misma semilla = mismos sitios)"""
+    rng = random.Random(semilla)
+    sitios = []
+    for i in range(n):
+        nombre = f"{rng.choice(_TIPOS)} {rng.choice(_NOMBRES)} {_letras(i).upper()}"
+        slug = _slug(nombre)
+        sitio = SitioSintetico(
+            host=f"{slug}{SUFIJO_HOSTS}",
+            nombre=nombre,
+            ubicacion_email=_elegir(rng, UBICACIONES_EMAIL),
+            ubicacion_whatsapp=_elegir(rng, UBICACIONES_WHATSAPP),
+            latencia=min(LATENCIA_MAXIMA, rng.lognormvariate(math.log(LATENCIA_MEDIANA), LATENCIA_SIGMA)),
+            redirige=rng.random() < PROPORCION_REDIRIGE,
+            senuelos=rng.random() < PROPORCION_SENUELOS,
+        )
+        azar = rng.random()
+        sitio.colgado = azar < PROPORCION_COLGADO
+        sitio.error = PROPORCION_COLGADO <= azar < PROPORCION_COLGADO + PROPORCION_ERROR
+        if sitio.ubicacion_email != 'ninguno':
+            sitio.emails = {f"{rng.choice(_LOCALES)}@{slug}.com.ar"}
+        if sitio.ubicacion_whatsapp != 'ninguno':
+            sitio.whatsapp = f"54911{rng.randint(10_000_000, 99_999_999)}"
+        sitios.append(sitio)
+    return sitios
+
+
+def _parrafos(rng: random.Random, cantidad: int) -> str:
+    return ''.join(f"<p>{''.join(rng.choice(_RELLENO) for _ in range(4))}</p>\n" for _ in range(cantidad))
+
+
+def pagina_home(sitio: SitioSintetico) -> str:
+    rng = random.Random(sitio.host)
+    email = next(iter(sitio.emails), '')
+    cuerpo = [f"<h1>{sitio.nombre}</h1>", _parrafos(rng, 20)]
+    scripts = []
+
+    if sitio.ubicacion_email == 'home_texto':
+        cuerpo.append(f"<p>Reservas y consultas: {email}</p>")
+    elif sitio.ubicacion_email == 'mailto':
+        cuerpo.append(f'<p><a href="mailto:{email}?subject=Reserva">Escribinos</a></p>')
+    elif sitio.ubicacion_email == 'js':
+        local, dominio = email.split('@')
+        cuerpo.append('<p id="email-contacto"></p>')
+        scripts.append(
+            f"var u='{local}', d='{dominio}';"
+            "document.getElementById('email-contacto').textContent = u + '@' + d;"
+        )
+    elif sitio.ubicacion_email == 'grande':
+        bloque = _parrafos(rng, 8)
+        cuerpo.append(bloque * max(1, KB_PAGINA_GRANDE * 1024 // len(bloque)))
+        cuerpo.append(f"<p>Contacto: {email}</p>")
+
+    if sitio.ubicacion_whatsapp == 'enlace':
+        cuerpo.append(f'<a class="flotante" href="https://wa.me/{sitio.whatsapp}">WhatsApp</a>')
+    elif sitio.ubicacion_whatsapp == 'texto':
+        n = sitio.whatsapp
+        cuerpo.append(f"<p>WhatsApp: +{n[:2]} {n[2]} {n[3:5]} {n[5:9]} {n[9:]}</p>")
+    elif sitio.ubicacion_whatsapp == 'js':
+        n = sitio.whatsapp
+        cuerpo.append('<div id="wpp"></div>')
+        scripts.append(
+            "var a = document.createElement('a'); a.textContent = 'WhatsApp';"
+            f"a.href = 'https://wa.me/' + '{n[:5]}' + '{n[5:]}';"
+            "document.getElementById('wpp').appendChild(a);"
+        )
+
+    if sitio.senuelos:
+        cuerpo.append('<img src="/img/logo@2x.png" alt="logo">')
+        scripts.append("Sentry.init({dsn: 'https://a1b2c3d4e5@o12345.ingest.sentry.io/678'});")
+
+    return (
+        '<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">'
+        f'<title>{sitio.nombre}</title><link rel="stylesheet" href="/static/estilos.css"></head><body>'
+        '<header><nav><a href="/">Inicio</a> <a href="/menu">Menú</a> '
+        '<a href="/contacto">Contacto</a></nav></header><main>'
+        + '\n'.join(cuerpo)
+        + f'</main><footer>© 2025 {sitio.nombre}</footer>'
+        + ''.join(f'<script>{s}</script>' for s in scripts)
+        + '</body></html>'
+    )
+
+
+def pagina_contacto(sitio: SitioSintetico) -> str:
+    rng = random.Random(sitio.host + '/contacto')
+    email = next(iter(sitio.emails), '') if sitio.ubicacion_email == 'contacto' else ''
+    return (
+        f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>Contacto - {sitio.nombre}</title></head>'
+        f'<body><h1>Contacto</h1>{_parrafos(rng, 3)}'
+        + (f'<p>Escribinos a <a href="mailto:{email}">{email}</a></p>' if email else '<form>...</form>')
+        + '</body></html>'
+    )
+
+
+# ==============================================================================
+# SERVIDOR LOCAL
+# ==============================================================================
+
+class ServidorFixtures:
+    """Sirve los sitios sintéticos en 127.0.0.1, eligiendo el sitio por el header Host"""
+
+    def __init__(self, sitios: List[SitioSintetico], escala_latencia: float = 1.0, segundos_colgado: float = 30.0):
+        self._por_host = {s.host: s for s in sitios}
+        self.escala_latencia = escala_latencia
+        self.segundos_colgado = segundos_colgado
+        self.puerto = 0
+        self.pedidos = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hilo: Optional[threading.Thread] = None
+        self._homes: Dict[str, str] = {}
+
+    async def _atender(self, request: web.Request) -> web.StreamResponse:
+        self.pedidos += 1
+        sitio = self._por_host.get(request.host.split(':')[0])
+        if sitio is None:
+            raise web.HTTPNotFound()
+        if self.escala_latencia:
+            await asyncio.sleep(sitio.latencia * self.escala_latencia)
+        if sitio.colgado:
+            await asyncio.sleep(self.segundos_colgado)
+        if sitio.error:
+            raise web.HTTPInternalServerError()
+
+        ruta = request.path
+        if ruta == '/' and sitio.redirige:
+            raise web.HTTPMovedPermanently('/inicio')
+        if ruta in ('/', '/inicio'):
+            html = self._homes.get(sitio.host)
+            if html is None:
+                html = pagina_home(sitio)
+                if sitio.ubicacion_email != 'grande':
+                    self._homes[sitio.host] = html
+        elif ruta == '/contacto':
+            html = pagina_contacto(sitio)
+        else:
+            raise web.HTTPNotFound()
+        return web.Response(text=html, content_type='text/html', charset='utf-8')
+
+    def iniciar(self) -> 'ServidorFixtures':
+        listo = threading.Event()
+
+        def _correr() -> None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            app = web.Application()
+            app.router.add_route('GET', '/{ruta:.*}', self._atender)
+            runner = web.AppRunner(app, access_log=None)
+            self._loop.run_until_complete(runner.setup())
+            sitio = web.TCPSite(runner, '127.0.0.1', 0, backlog=4096)
+            self._loop.run_until_complete(sitio.start())
+            self.puerto = runner.addresses[0][1]
+            listo.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(runner.cleanup())
+            self._loop.close()
+
+        self._hilo = threading.Thread(target=_correr, name='servidor-fixtures', daemon=True)
+        self._hilo.start()
+        listo.wait()
+        logger.info(f"🧪 Servidor de fixtures: {len(self._por_host)} sitios en 127.0.0.1:{self.puerto}")
+        return self
+
+    def cerrar(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._hilo.join(timeout=5)
+
+    def __enter__(self) -> 'ServidorFixtures':
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+@contextmanager
+def dns_local(sufijo: str = SUFIJO_HOSTS) -> Iterator[None]:
+    """Dentro del bloque, los hosts `*<sufijo>` resuelven a 127.0.0.1 (requests y aiohttp)"""
+    original = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        if isinstance(host, str) and host.rstrip('.').endswith(sufijo):
+            host = '127.0.0.1'
+        return original(host, *args, **kwargs)
+
+    socket.getaddrinfo = getaddrinfo
+    try:
+        yield
+    finally:
+        socket.getaddrinfo = original
+
+
+# ==============================================================================
+# MEDICIÓN
+# ==============================================================================
+
+@dataclass
+class ResultadoCamino:
+    camino: str
+    sitios: int = 0
+    segundos: float = 0.0
+    latencias: List[float] = field(default_factory=list)
+    fuente_latencia: str = 'por sitio'
+    aciertos: Dict[str, List[int]] = field(default_factory=dict)    # ubicación -> [aciertos, total]
+    falsos_positivos: int = 0
+    a_navegador: Optional[int] = None       # whatsapp_estatico: URLs que escalarían a Playwright
+    pedidos_http: Optional[int] = None      # caminos concurrentes: pedidos hechos por el motor
+    aciertos_whatsapp: Optional[List[int]] = None   # sitios_enriquecidos: [aciertos, sitios con WhatsApp]
+    omitido: Optional[str] = None
+
+    def anotar(self, ubicacion: str, acierto: bool) -> None:
+        cuenta = self.aciertos.setdefault(ubicacion, [0, 0])
+        cuenta[0] += int(acierto)
+        cuenta[1] += 1
+
+    @property
+    def tasa_acierto(self) -> Optional[float]:
+        aciertos = sum(a for u, (a, _) in self.aciertos.items() if u != 'ninguno')
+        total = sum(t for u, (_, t) in self.aciertos.items() if u != 'ninguno')
+        return aciertos / total if total else None
+
+    def resumen(self) -> Dict[str, Any]:
+        if self.omitido:
+            return {'camino': self.camino, 'omitido': self.omitido}
+        latencias = sorted(self.latencias)
+        return {
+            'camino': self.camino,
+            'sitios': self.sitios,
+            'segundos': round(self.segundos, 3),
+            'sitios_por_segundo': round(self.sitios / self.segundos, 2) if self.segundos else None,
+            'latencia': {
+                'fuente': self.fuente_latencia,
+                'p50_ms': round(_percentil(latencias, 0.50) * 1000, 2),
+                'p95_ms': round(_percentil(latencias, 0.95) * 1000, 2),
+            },
+            'tasa_acierto': round(self.tasa_acierto, 4) if self.tasa_acierto is not None else None,
+            'aciertos_por_tipo': {u: {'aciertos': a, 'total': t} for u, (a, t) in sorted(self.aciertos.items())},
+            'falsos_positivos': self.falsos_positivos,
+            **({'a_navegador': self.a_navegador} if self.a_navegador is not None else {}),
+            **({'pedidos_http': self.pedidos_http} if self.pedidos_http is not None else {}),
+            **({'aciertos_whatsapp': dict(zip(('aciertos', 'total'), self.aciertos_whatsapp))}
+               if self.aciertos_whatsapp is not None else {}),
+        }
+
+
+def _percentil(valores: List[float], q: float) -> float:
+    if not valores:
+        return 0.0
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method='inclusive')[max(0, min(98, round(q * 100) - 1))]
+
+
+def _evaluar_emails(resultado: ResultadoCamino, sitio: SitioSintetico, encontrados: Set[str]) -> None:
+    encontrados = {e.lower() for e in encontrados}
+    resultado.anotar(sitio.ubicacion_email, bool(encontrados & sitio.emails) if sitio.emails else not encontrados)
+    resultado.falsos_positivos += len(encontrados - sitio.emails)
+
+
+def _evaluar_whatsapp(resultado: ResultadoCamino, sitio: SitioSintetico, encontrado: Optional[str]) -> None:
+    digitos = _digitos(encontrado)
+    if sitio.whatsapp:
+        resultado.anotar(sitio.ubicacion_whatsapp, digitos.endswith(sitio.whatsapp[-8:]) if digitos else False)
+    else:
+        resultado.anotar('ninguno', not digitos)
+    if digitos and (not sitio.whatsapp or not digitos.endswith(sitio.whatsapp[-8:])):
+        resultado.falsos_positivos += 1
+
+
+# ==============================================================================
+# CAMINOS
+# ==============================================================================
+
+def _camino_html(nombre: str, extractor: Callable[[str], Set[str]], sitios: List[SitioSintetico]) -> ResultadoCamino:
+    resultado = ResultadoCamino(nombre, fuente_latencia='por página')
+    paginas = [(s, pagina_home(s)) for s in sitios]
+    inicio = time.perf_counter()
+    for sitio, html in paginas:
+        t0 = time.perf_counter()
+        emails = extractor(html)
+        resultado.latencias.append(time.perf_counter() - t0)
+        _evaluar_emails(resultado, sitio, emails)
+    resultado.segundos = time.perf_counter() - inicio
+    resultado.sitios = len(paginas)
+    return resultado
+
+
+def camino_html_pipeline(sitios, puerto, args) -> ResultadoCamino:
+    from pipeline_completo import extraer_emails_de_html
+    return _camino_html('html_pipeline', extraer_emails_de_html, sitios)
+
+
+def camino_html_directo(sitios, puerto, args) -> ResultadoCamino:
+    from extraer_emails_directamente import extraer_emails_de_html
+    return _camino_html('html_directo', extraer_emails_de_html, sitios)
+
+
+def camino_url_secuencial(sitios, puerto, args) -> ResultadoCamino:
+    from pipeline_completo import extraer_emails_de_url
+    resultado = ResultadoCamino('url_secuencial')
+    muestra = sitios[:args.muestra_secuencial]
+    inicio = time.perf_counter()
+    for sitio in muestra:
+        t0 = time.perf_counter()
+        emails = extraer_emails_de_url(sitio.url(puerto), timeout=args.timeout)
+        resultado.latencias.append(time.perf_counter() - t0)
+        _evaluar_emails(resultado, sitio, emails)
+    resultado.segundos = time.perf_counter() - inicio
+    resultado.sitios = len(muestra)
+    return resultado
+
+
+def _camino_concurrente(nombre: str, sitios, puerto, ejecutar, evaluar=None) -> ResultadoCamino:
+    resultado = ResultadoCamino(nombre, fuente_latencia='por pedido HTTP')
+    urls = {s.url(puerto): s for s in sitios}
+    METRICAS.reiniciar()
+    inicio = time.perf_counter()
+    por_url = ejecutar(list(urls))
+    resultado.segundos = time.perf_counter() - inicio
+    histograma = METRICAS.histograma('http_segundos')
+    resultado.pedidos_http = int(METRICAS.contador('http_respuestas_total'))
+    resultado.latencias = [histograma.percentil(q / 100) for q in range(1, 100)]
+    for url, sitio in urls.items():
+        if evaluar is None:
+            _evaluar_emails(resultado, sitio, por_url.get(url, set()))
+        else:
+            evaluar(resultado, sitio, por_url.get(url))
+    resultado.sitios = len(urls)
+    return resultado
+
+
+def camino_urls_concurrente(sitios, puerto, args) -> ResultadoCamino:
+    from descarga_concurrente import extraer_emails_de_urls
+    from pipeline_completo import extraer_emails_de_html
+    return _camino_concurrente('urls_concurrente', sitios, puerto, lambda urls: extraer_emails_de_urls(
+        urls, extraer_emails_de_html, concurrencia=args.concurrencia, timeout=args.timeout
+    ))
+
+
+def camino_sitios_rastreo(sitios, puerto, args) -> ResultadoCamino:
+    from rastreo_contactos import enriquecer_sitios
+    return _camino_concurrente('sitios_rastreo', sitios, puerto, lambda urls: {
+        url: set(datos.get('emails_pipeline') or ())
+        for url, datos in enriquecer_sitios(
+            urls, ['emails_pipeline'], criterio='emails_pipeline',
+            concurrencia=args.concurrencia, timeout=args.timeout
+        ).items()
+    })
+
+
+def camino_whatsapp_estatico(sitios, puerto, args) -> ResultadoCamino:
+    from rastreo_contactos import enriquecer_sitios
+    from whatsapp_escalonado import DeteccionWhatsapp
+
+    def evaluar(resultado, sitio, datos):
+        deteccion = DeteccionWhatsapp.de_resultados(datos or {})
+        _evaluar_whatsapp(resultado, sitio, deteccion.numero)
+        if deteccion.escalar:
+            resultado.a_navegador = (resultado.a_navegador or 0) + 1
+
+    resultado = _camino_concurrente('whatsapp_estatico', sitios, puerto, lambda urls: enriquecer_sitios(
+        urls, ['whatsapp', 'senal_js'], concurrencia=args.concurrencia, timeout=args.timeout
+    ), evaluar)
+    resultado.a_navegador = resultado.a_navegador or 0
+    return resultado
+
+
+def camino_sitios_enriquecidos(sitios, puerto, args) -> ResultadoCamino:
+    from pipeline_completo import EXTRACTORES_WEB
+    from rastreo_contactos import enriquecer_sitios
+    from whatsapp_escalonado import DeteccionWhatsapp
+
+    whatsapp = [0, 0]
+
+    def evaluar(resultado, sitio, datos):
+        datos = datos or {}
+        _evaluar_emails(resultado, sitio, set(datos.get('emails_pipeline') or ()))
+        deteccion = DeteccionWhatsapp.de_resultados(datos)
+        resultado.a_navegador = (resultado.a_navegador or 0) + int(deteccion.escalar)
+        if sitio.whatsapp:
+            whatsapp[0] += int(_digitos(deteccion.numero).endswith(sitio.whatsapp[-8:]) if deteccion.numero else False)
+            whatsapp[1] += 1
+
+    resultado = _camino_concurrente('sitios_enriquecidos', sitios, puerto, lambda urls: enriquecer_sitios(
+        urls, EXTRACTORES_WEB, criterio='emails_pipeline', concurrencia=args.concurrencia, timeout=args.timeout
+    ), evaluar)
+    resultado.a_navegador = resultado.a_navegador or 0
+    resultado.aciertos_whatsapp = whatsapp
+    return resultado
+
+
+def _camino_whatsapp(nombre: str, sitios, puerto, args, extraer: Callable[[List[str]], Dict[str, Optional[str]]]) -> ResultadoCamino:
+    resultado = ResultadoCamino(nombre)
+    muestra = sitios[:args.muestra_navegador]
+    inicio = time.perf_counter()
+    encontrados = extraer([s.url(puerto) for s in muestra], resultado.latencias)
+    resultado.segundos = time.perf_counter() - inicio
+    for sitio in muestra:
+        _evaluar_whatsapp(resultado, sitio, encontrados.get(sitio.url(puerto)))
+    resultado.sitios = len(muestra)
+    return resultado
+
+
+def camino_whatsapp_playwright(sitios, puerto, args) -> ResultadoCamino:
+    from pipeline_completo import extraer_whatsapp_playwright
+
+    def extraer(urls, latencias):
+        encontrados = {}
+        for url in urls:
+            t0 = time.perf_counter()
+            encontrados[url] = extraer_whatsapp_playwright(url, timeout=args.timeout)
+            latencias.append(time.perf_counter() - t0)
+        return encontrados
+    return _camino_whatsapp('whatsapp_playwright', sitios, puerto, args, extraer)
+
+
+def camino_whatsapp_pool(sitios, puerto, args) -> ResultadoCamino:
+    from pool_playwright import PoolNavegadores
+
+    def extraer(urls, latencias):
+        encontrados = {}
+        with PoolNavegadores(timeout=args.timeout) as pool:
+            inicio = time.perf_counter()
+            futuros = {url: pool.enviar(url) for url in urls}
+            for url, futuro in futuros.items():
+                encontrados[url] = futuro.result()
+                latencias.append(time.perf_counter() - inicio)     # tiempo hasta tener ese resultado
+        return encontrados
+    resultado = _camino_whatsapp('whatsapp_pool', sitios, puerto, args, extraer)
+    resultado.fuente_latencia = 'hasta el resultado (pool)'
+    return resultado
+
+
+EJECUTORES = {
+    'html_pipeline': camino_html_pipeline,
+    'html_directo': camino_html_directo,
+    'url_secuencial': camino_url_secuencial,
+    'urls_concurrente': camino_urls_concurrente,
+    'sitios_rastreo': camino_sitios_rastreo,
+    'whatsapp_estatico': camino_whatsapp_estatico,
+    'sitios_enriquecidos': camino_sitios_enriquecidos,
+    'whatsapp_playwright': camino_whatsapp_playwright,
+    'whatsapp_pool': camino_whatsapp_pool,
+}
+
+
+def _navegador_disponible() -> Optional[str]:
+    """None si Playwright puede lanzar Chromium; si no, el motivo"""
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+    except Exception as e:
+        return f"Playwright/Chromium no disponible: {str(e).strip().splitlines()[0][:80]}"
+    return None
+
+
+# ==============================================================================
+# MAIN
+# ==============================================================================
+
+def ejecutar_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    sitios = generar_sitios(args.sitios, args.semilla)
+    resultados: List[ResultadoCamino] = []
+    sin_navegador = None
+    if any(c in CAMINOS_NAVEGADOR for c in args.caminos):
+        sin_navegador = _navegador_disponible()
+
+    with dns_local(), ServidorFixtures(sitios, args.escala_latencia, args.timeout + 5) as servidor:
+        for camino in args.caminos:
+            if camino in CAMINOS_NAVEGADOR and sin_navegador:
+                resultados.append(ResultadoCamino(camino, omitido=sin_navegador))
+                logger.warning(f"⏭️  {camino}: {sin_navegador}")
+                continue
+            logger.info(f"\n⏱️  {camino}...")
+            try:
+                resultado = EJECUTORES[camino](sitios, servidor.puerto, args)
+            except ImportError as e:
+                resultado = ResultadoCamino(camino, omitido=f"No se pudo importar: {e}")
+            resultados.append(resultado)
+            r = resultado.resumen()
+            if resultado.omitido:
+                logger.warning(f"   ⏭️  {resultado.omitido}")
+            else:
+                logger.info(
+                    f"   {r['sitios']} sitios en {r['segundos']:.2f}s ({r['sitios_por_segundo']} sitios/s), "
+                    f"p50 {r['latencia']['p50_ms']:.1f}ms / p95 {r['latencia']['p95_ms']:.1f}ms "
+                    f"({r['latencia']['fuente']}), acierto {100 * (r['tasa_acierto'] or 0):.1f}%, "
+                    f"{r['falsos_positivos']} falsos positivos"
+                    + (f", {r['a_navegador']} al navegador" if 'a_navegador' in r else '')
+                    + (f", {r['pedidos_http']} pedidos HTTP" if 'pedidos_http' in r else '')
+                )
+
+    composicion: Dict[str, Dict[str, int]] = {'email': {}, 'whatsapp': {}}
+    for s in sitios:
+        composicion['email'][s.ubicacion_email] = composicion['email'].get(s.ubicacion_email, 0) + 1
+        composicion['whatsapp'][s.ubicacion_whatsapp] = composicion['whatsapp'].get(s.ubicacion_whatsapp, 0) + 1
+    return {
+        'fecha': datetime.now().isoformat(),
+        'parametros': {
+            'sitios': args.sitios, 'semilla': args.semilla, 'timeout': args.timeout,
+            'escala_latencia': args.escala_latencia, 'concurrencia': args.concurrencia,
+            'muestra_secuencial': args.muestra_secuencial, 'muestra_navegador': args.muestra_navegador,
+        },
+        'composicion': {
+            **composicion,
+            'redirigen': sum(s.redirige for s in sitios),
+            'colgados': sum(s.colgado for s in sitios),
+            'errores': sum(s.error for s in sitios),
+        },
+        'caminos': [r.resumen() for r in resultados],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark offline de los caminos de extracción de contactos')
+    parser.add_argument('--sitios', type=int, default=SITIOS, help='Sitios sintéticos a servir')
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--caminos', nargs='+', choices=CAMINOS, default=list(CAMINOS))
+    parser.add_argument('--timeout', type=int, default=TIMEOUT_SEGUNDOS,
+                        help='Timeout por pedido; los sitios colgados tardan timeout + 5s')
+    parser.add_argument('--escala-latencia', type=float, default=1.0,
+                        help='Multiplica la latencia simulada (0 = sin esperas)')
+    parser.add_argument('--concurrencia', type=int, default=CONCURRENCIA)
+    parser.add_argument('--muestra-secuencial', type=int, default=MUESTRA_SECUENCIAL,
+                        help='Sitios para url_secuencial')
+    parser.add_argument('--muestra-navegador', type=int, default=MUESTRA_NAVEGADOR,
+                        help='Sitios para los caminos con Playwright')
+    parser.add_argument('--salida', type=Path, help='JSON de resultados (por defecto en resultados/benchmarks/)')
+    args = parser.parse_args()
+
+    informe = ejecutar_benchmark(args)
+
+    salida = args.salida or DIRECTORIO_RESULTADOS / f"extraccion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+
+    logger.info("\n" + "=" * 96)
+    logger.info(f"{'CAMINO':<22}{'SITIOS':>8}{'SITIOS/S':>10}{'P50 MS':>10}{'P95 MS':>10}{'ACIERTO':>10}{'FALSOS':>8}")
+    logger.info("=" * 96)
+    for r in informe['caminos']:
+        if 'omitido' in r:
+            logger.info(f"{r['camino']:<22}  omitido: {r['omitido'][:60]}")
+            continue
+        logger.info(
+            f"{r['camino']:<22}{r['sitios']:>8}{r['sitios_por_segundo'] or 0:>10.1f}"
+            f"{r['latencia']['p50_ms']:>10.1f}{r['latencia']['p95_ms']:>10.1f}"
+            f"{100 * (r['tasa_acierto'] or 0):>9.1f}%{r['falsos_positivos']:>8}"
+        )
+    logger.info(f"\n📁 Resultados: {salida}")
+
+
+if __name__ == "__main__":
+    main()
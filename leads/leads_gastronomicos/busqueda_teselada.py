@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BÚSQUEDA TESELADA EN DATAFORSEO (QUADTREE ADAPTATIVO)
+=====================================================
+DataForSEO devuelve como máximo 1000 items por búsqueda. Con un único
+círculo de 20 km sobre CABA todo lo que queda fuera del top 1000 por
+votos se pierde sin aviso.
+
+Este módulo parte el círculo en 4 sub-círculos que cubren sus cuadrantes
+y vuelve a subdividir solo las teselas que vuelven "saturadas" (con
+tantos items como el límite). Las consultas corren en paralelo y el
+resultado se une y deduplica por `place_id`.
+
+Uso:
+    items = buscar_teselado(buscar_circulo, CABA_LAT, CABA_LON, 20, limite=1000)
+
+donde `buscar_circulo(lat, lon, radio_km)` hace una consulta y devuelve
+la lista de items.
+"""
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+KM_POR_GRADO_LAT = 111.32
+RADIO_MINIMO_KM = 0.5       # No subdividir por debajo de este radio
+MAX_TESELAS = 256           # Tope de consultas por búsqueda (cada una se cobra)
+TRABAJADORES = 8
+
+
+@dataclass(frozen=True)
+class Tesela:
+    """Círculo de búsqueda: centro, radio y profundidad en el quadtree"""
+    lat: float
+    lon: float
+    radio_km: float
+    nivel: int = 0
+
+    @property
+    def location_coordinate(self) -> str:
+        return f"{self.lat:.6f},{self.lon:.6f},{self.radio_km:.3f}"
+
+
+def subdividir(tesela: Tesela) -> List[Tesela]:
+    """
+    Devuelve 4 círculos que cubren la tesela.
+
+    El cuadrado que contiene al círculo (lado 2r) se parte en 4 cuadrados
+    de lado r; cada hijo es el círculo circunscripto a uno de ellos
+    (centro desplazado r/2, radio r/√2).
+    """
+    offset_km = tesela.radio_km / 2
+    radio_hijo = tesela.radio_km / math.sqrt(2)
+    dlat = offset_km / KM_POR_GRADO_LAT
+    dlon = offset_km / (KM_POR_GRADO_LAT * math.cos(math.radians(tesela.lat)))
+
+    return [
+        Tesela(tesela.lat + sy * dlat, tesela.lon + sx * dlon, radio_hijo, tesela.nivel + 1)
+        for sy in (1, -1)
+        for sx in (-1, 1)
+    ]
+
+
+def _clave_item(item: Dict[str, Any]) -> str:
+    """Clave de deduplicación: place_id, o cid, o título+dirección"""
+    return (
+        item.get('place_id')
+        or (f"cid:{item['cid']}" if item.get('cid') else '')
+        or f"{item.get('title', '')}|{item.get('address', '')}"
+    )
+
+
+# ==============================================================================
+# BÚSQUEDA
+# ==============================================================================
+
+def buscar_teselado(
+    buscar: Callable[[float, float, float], List[Dict[str, Any]]],
+    lat: float,
+    lon: float,
+    radio_km: float,
+    limite: int = 1000,
+    radio_minimo_km: float = RADIO_MINIMO_KM,
+    max_teselas: int = MAX_TESELAS,
+    trabajadores: int = TRABAJADORES
+) -> List[Dict[str, Any]]:
+    """
+    Cubre el círculo (lat, lon, radio_km) con un quadtree adaptativo.
+
+    Una tesela se considera saturada si devuelve >= `limite` items; en ese
+    caso se consulta también cada uno de sus 4 hijos. Devuelve los items
+    únicos ordenados por cantidad de votos (como `order_by` de la API).
+    """
+    unicos: Dict[str, Dict[str, Any]] = {}
+    consultas = 0
+    saturadas_sin_dividir = 0
+
+    with ThreadPoolExecutor(max_workers=trabajadores) as executor:
+        pendientes = {}
+
+        def _enviar(tesela: Tesela) -> None:
+            nonlocal consultas
+            consultas += 1
+            pendientes[executor.submit(buscar, tesela.lat, tesela.lon, tesela.radio_km)] = tesela
+
+        _enviar(Tesela(lat, lon, radio_km))
+
+        while pendientes:
+            listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                tesela = pendientes.pop(futuro)
+                try:
+                    items = futuro.result() or []
+                except Exception as e:
+                    logger.error(f"❌ Error en tesela {tesela.location_coordinate}: {str(e)}")
+                    items = []
+
+                nuevos = 0
+                for item in items:
+                    clave = _clave_item(item)
+                    if clave not in unicos:
+                        unicos[clave] = item
+                        nuevos += 1
+
+                saturada = len(items) >= limite
+                logger.info(
+                    f"   🧩 Tesela nivel {tesela.nivel} ({tesela.location_coordinate}): "
+                    f"{len(items)} items, {nuevos} nuevos{' — saturada' if saturada else ''}"
+                )
+
+                if not saturada:
+                    continue
+                hijos = subdividir(tesela)
+                if hijos[0].radio_km < radio_minimo_km or consultas + len(hijos) > max_teselas:
+                    saturadas_sin_dividir += 1
+                    continue
+                for hijo in hijos:
+                    _enviar(hijo)
+
+    if saturadas_sin_dividir:
+        logger.warning(
+            f"⚠️  {saturadas_sin_dividir} teselas siguen saturadas "
+            f"(radio mínimo {radio_minimo_km} km o tope de {max_teselas} consultas)"
+        )
+    logger.info(f"✅ Teselado: {consultas} consultas, {len(unicos)} negocios únicos")
+
+    return sorted(
+        unicos.values(),
+        key=lambda x: (x.get('rating') or {}).get('votes_count', 0) or 0,
+        reverse=True
+    )
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CACHE HTTP EN DISCO CON REVALIDACIÓN CONDICIONAL
+================================================
+Guarda en SQLite cada respuesta descargada (cuerpo, status, headers,
+ETag y Last-Modified) indexada por la URL canónica (`clave_url`, la
+misma que usa el rastreo para unificar sitios). En la próxima corrida:
+
+- si la entrada es más nueva que el TTL, se usa sin tocar la red
+- si venció, se revalida con If-None-Match / If-Modified-Since y un 304
+  reutiliza el cuerpo guardado
+
+Además guarda el resultado de cada extractor (p. ej. el set de emails)
+por URL, así un hit fresco o un 304 se saltea también el parseo.
+
+La comparten `pipeline_completo.py` y `extraer_emails_directamente.py`
+a través de `descarga_concurrente.MotorDescargas`.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from urls_canonicas import clave_url
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+RUTA_CACHE = Path(__file__).parent / "resultados" / "cache_http.sqlite"
+TTL_HORAS = 24 * 7
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS respuestas (
+    clave         TEXT PRIMARY KEY,
+    url_final     TEXT,
+    status        INTEGER,
+    headers       TEXT,
+    cuerpo        TEXT,
+    etag          TEXT,
+    last_modified TEXT,
+    guardado_en   REAL
+);
+CREATE TABLE IF NOT EXISTS resultados (
+    clave     TEXT,
+    extractor TEXT,
+    valor     TEXT,
+    PRIMARY KEY (clave, extractor)
+);
+"""
+
+
+def clave_cache(url: str) -> str:
+    """
+    Clave de la cache: la misma de `urls_canonicas.clave_url` (sin esquema,
+    sin `www.`, sin barra final ni tracking), así las variantes que el
+    rastreo unifica comparten fila. El esquema queda solo en `url_final`.
+    """
+    return clave_url(url)
+
+
+@dataclass
+class EntradaCache:
+    """Respuesta guardada en la cache"""
+    clave: str
+    url_final: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    cuerpo: str = ''
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    guardado_en: float = 0.0
+
+
+class CacheHTTP:
+    """Cache persistente de respuestas HTTP y de resultados de extracción"""
+
+    def __init__(self, ruta: Path = RUTA_CACHE, ttl_horas: float = TTL_HORAS):
+        self.ruta = Path(ruta)
+        self.ttl_segundos = ttl_horas * 3600
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.ruta), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_ESQUEMA)
+        self.hits_frescos = 0
+        self.revalidadas = 0
+        self.guardadas = 0
+
+    # --------------------------------------------------------------------------
+    # Respuestas
+    # --------------------------------------------------------------------------
+
+    def obtener(self, url: str) -> Optional[EntradaCache]:
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT clave, url_final, status, headers, cuerpo, etag, last_modified, guardado_en "
+                "FROM respuestas WHERE clave = ?",
+                (clave_cache(url),)
+            ).fetchone()
+        if fila is None:
+            return None
+        return EntradaCache(
+            clave=fila[0], url_final=fila[1], status=fila[2],
+            headers=json.loads(fila[3] or '{}'), cuerpo=fila[4] or '',
+            etag=fila[5], last_modified=fila[6], guardado_en=fila[7] or 0.0
+        )
+
+    def es_fresca(self, entrada: EntradaCache) -> bool:
+        return (time.time() - entrada.guardado_en) < self.ttl_segundos
+
+    @staticmethod
+    def headers_revalidacion(entrada: EntradaCache) -> Dict[str, str]:
+        """Headers condicionales para revalidar una entrada vencida"""
+        headers = {}
+        if entrada.etag:
+            headers['If-None-Match'] = entrada.etag
+        if entrada.last_modified:
+            headers['If-Modified-Since'] = entrada.last_modified
+        return headers
+
+    def guardar(self, url: str, url_final: str, status: int, headers: Dict[str, str], cuerpo: str) -> None:
+        """
+        Guarda una respuesta nueva e invalida los resultados de extractores.
+        `headers` debe venir con las claves en minúsculas.
+        """
+        clave = clave_cache(url)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respuestas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    clave, url_final, status, json.dumps(headers), cuerpo,
+                    headers.get('etag'), headers.get('last-modified'), time.time()
+                )
+            )
+            self._conn.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+        self.guardadas += 1
+
+    def refrescar(self, url: str) -> None:
+        """Marca como fresca una entrada revalidada con 304"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE respuestas SET guardado_en = ? WHERE clave = ?",
+                (time.time(), clave_cache(url))
+            )
+        self.revalidadas += 1
+
+    # --------------------------------------------------------------------------
+    # Resultados de extractores
+    # --------------------------------------------------------------------------
+
+    def resultado(self, url: str, extractor: str) -> Optional[Any]:
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT valor FROM resultados WHERE clave = ? AND extractor = ?",
+                (clave_cache(url), extractor)
+            ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def guardar_resultado(self, url: str, extractor: str, valor: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?)",
+                (clave_cache(url), extractor, json.dumps(valor, ensure_ascii=False))
+            )
+
+    def resultados(self, url: str, extractores: Iterable[str]) -> Dict[str, Any]:
+        """Resultados guardados de varios extractores; los que faltan no aparecen"""
+        nombres = list(extractores)
+        with self._lock:
+            filas = self._conn.execute(
+                f"SELECT extractor, valor FROM resultados WHERE clave = ? "
+                f"AND extractor IN ({', '.join('?' * len(nombres))})",
+                (clave_cache(url), *nombres)
+            ).fetchall()
+        return {extractor: json.loads(valor) for extractor, valor in filas}
+
+    def guardar_resultados(self, url: str, valores: Dict[str, Any]) -> None:
+        clave = clave_cache(url)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?)",
+                [(clave, extractor, json.dumps(valor, ensure_ascii=False)) for extractor, valor in valores.items()]
+            )
+
+    def cerrar(self) -> None:
+        logger.info(
+            f"💾 Cache HTTP: {self.hits_frescos} hits frescos, "
+            f"{self.revalidadas} revalidadas (304), {self.guardadas} descargas guardadas"
+        )
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CLASIFICACIÓN DE CADENAS Y PLATAFORMAS
+======================================
+`es_cadena_grande` normalizaba (NFD) cada entrada de `CADENAS_GRANDES` en
+cada llamada, en dos pasadas (con y sin espacios), y
+`es_plataforma_excluir` recorría `PLATAFORMAS_EXCLUIR` con `any()`.
+
+Acá las dos listas se compilan una sola vez en un matcher multi-patrón
+(una regex de alternancia de literales) y se exponen:
+
+- `es_cadena_grande(titulo, dominio)` / `es_plataforma_excluir(url, dominio)`
+  para un negocio suelto
+- `clasificar_dataframe(df)` / `clasificar_negocios(items)` para
+  clasificar todos los negocios de una vez
+
+Nota: buscar la cadena "con espacios" en el texto normalizado implica
+encontrarla también "sin espacios" en el texto sin espacios, así que
+alcanza con una sola búsqueda sobre el texto sin espacios.
+"""
+
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List
+
+import pandas as pd
+
+# Cadenas grandes a excluir
+CADENAS_GRANDES = [
+    'starbucks', 'mcdonalds',
+    'cafe martinez', 'café martinez', 'cafemartinez',  # Todas las variantes
+    'havanna', 'burger king',
+    'bonafide', 'freddo', 'grido', 'subway', 'kentucky', 'kfc', 'pani',
+    'la panera rosa', 'mostaza', 'wendys', 'pizza hut', 'dominos',
+    'dunkin', 'costa coffee', 'le pain quotidien', 'papa johns'
+]
+
+# Plataformas a excluir
+PLATAFORMAS_EXCLUIR = [
+    'instagram.com', 'facebook.com', 'twitter.com', 'tiktok.com',
+    'pedidosya.com', 'rappi.com', 'ubereats.com', 'linktr.ee'
+]
+
+_ESPACIOS = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1)
+def _tabla_sin_marcas() -> Dict[int, None]:
+    """Tabla para str.translate que borra las marcas diacríticas (categoría Mn)"""
+    return {
+        cp: None for cp in range(sys.maxunicode + 1)
+        if unicodedata.category(chr(cp)) == 'Mn'
+    }
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin acentos y sin espacios (forma usada para matchear cadenas)"""
+    texto = unicodedata.normalize('NFD', texto.lower()).translate(_tabla_sin_marcas())
+    return _ESPACIOS.sub('', texto)
+
+
+def _compilar(literales: Iterable[str]) -> 're.Pattern':
+    unicos = sorted(set(literales), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(x) for x in unicos))
+
+
+_MATCHER_CADENAS = _compilar(normalizar(c) for c in CADENAS_GRANDES)
+_MATCHER_PLATAFORMAS = _compilar(PLATAFORMAS_EXCLUIR)
+
+
+# ==============================================================================
+# API ESCALAR
+# ==============================================================================
+
+def es_cadena_grande(titulo: str, dominio: str) -> bool:
+    """Verifica si es una cadena grande"""
+    return _MATCHER_CADENAS.search(normalizar(f"{titulo} {dominio}")) is not None
+
+
+def es_plataforma_excluir(url: str, dominio: str) -> bool:
+    """Verifica si es una plataforma a excluir"""
+    return _MATCHER_PLATAFORMAS.search(f"{url} {dominio}".lower()) is not None
+
+
+def clasificar_negocio(titulo: str, url: str, dominio: str) -> Dict[str, bool]:
+    """Clasificación de un único negocio (mismas claves que `clasificar_dataframe`)"""
+    return {
+        'es_cadena': es_cadena_grande(titulo, dominio),
+        'es_plataforma': es_plataforma_excluir(url, dominio),
+    }
+
+
+# ==============================================================================
+# API VECTORIZADA
+# ==============================================================================
+
+def _columna_texto(df: pd.DataFrame, columna: str) -> pd.Series:
+    if columna not in df:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[columna].fillna('').astype(str)
+
+
+def clasificar_dataframe(
+    df: pd.DataFrame,
+    col_titulo: str = 'title',
+    col_dominio: str = 'domain',
+    col_url: str = 'url'
+) -> pd.DataFrame:
+    """
+    Clasifica todos los negocios de un DataFrame en una pasada.
+
+    Devuelve un DataFrame con el mismo índice y las columnas booleanas
+    `es_cadena` y `es_plataforma`.
+    """
+    titulo = _columna_texto(df, col_titulo)
+    dominio = _columna_texto(df, col_dominio)
+    url = _columna_texto(df, col_url)
+
+    texto_cadena = (
+        (titulo + ' ' + dominio)
+        .str.lower()
+        .str.normalize('NFD')
+        .str.translate(_tabla_sin_marcas())
+        .str.replace(_ESPACIOS, '', regex=True)
+    )
+    texto_plataforma = (url + ' ' + dominio).str.lower()
+
+    return pd.DataFrame({
+        'es_cadena': texto_cadena.str.contains(_MATCHER_CADENAS, regex=True),
+        'es_plataforma': texto_plataforma.str.contains(_MATCHER_PLATAFORMAS, regex=True),
+    }, index=df.index)
+
+
+def clasificar_negocios(negocios: List[Dict[str, Any]]) -> List[Dict[str, bool]]:
+    """Clasifica una lista de items de DataForSEO; devuelve un dict por item, en orden"""
+    if not negocios:
+        return []
+    df = pd.DataFrame(
+        [(n.get('title', ''), n.get('domain', ''), n.get('url', '')) for n in negocios],
+        columns=['title', 'domain', 'url']
+    )
+    return clasificar_dataframe(df).to_dict('records')
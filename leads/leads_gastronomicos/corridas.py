@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CORRIDAS REANUDABLES
+====================
+Cada corrida de `pipeline_completo.py` o `extraer_emails_directamente.py`
+tiene un id (timestamp) y un directorio en `resultados/corridas/<id>/`:
+
+- `meta.json`      script, parámetros, estado ('en_curso' / 'completada')
+- `cola.ndjson`    los negocios a procesar, en orden (así reanudar no
+                   repite la búsqueda en DataForSEO)
+- `etapas.ndjson`  una línea por etapa terminada de cada negocio:
+                   {"clave": place_id, "etapa": "emails", "datos": [...]}
+
+Si la corrida se corta (Ctrl-C, error, la notebook se suspende), con
+`--resume <id>` se vuelve a abrir el diario y se saltean los negocios
+cuyas etapas ya están registradas.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from almacen_incremental import DiarioRegistros
+
+logger = logging.getLogger(__name__)
+
+DIR_CORRIDAS = Path(__file__).parent / "resultados" / "corridas"
+
+# Etapas registradas por negocio
+ETAPA_EMAILS = 'emails'
+ETAPA_REGISTRO = 'registro'
+
+
+def clave_negocio(negocio: Dict[str, Any]) -> str:
+    """Clave estable de un negocio: place_id, o cid, o título+dirección"""
+    return (
+        negocio.get('place_id')
+        or (f"cid:{negocio['cid']}" if negocio.get('cid') else '')
+        or f"{negocio.get('title', '')}|{negocio.get('address', '')}"
+    )
+
+
+class CorridaNoEncontrada(Exception):
+    """No existe el directorio de la corrida pedida con --resume"""
+
+
+class DiarioCorrida:
+    """
+    Diario de una corrida: qué etapas terminó cada negocio.
+
+        corrida = DiarioCorrida.nueva('pipeline', {'limite': 1000})
+        corrida = DiarioCorrida.reanudar('20251020_195343')
+    """
+
+    def __init__(self, run_id: str, directorio: Path = DIR_CORRIDAS):
+        self.run_id = run_id
+        self.directorio = Path(directorio) / run_id
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self._ruta_meta = self.directorio / "meta.json"
+        self._cola = DiarioRegistros(self.directorio / "cola.ndjson")
+        self._etapas = DiarioRegistros(self.directorio / "etapas.ndjson")
+        self._hechas: Dict[str, Dict[str, Any]] = {}
+        for linea in self._etapas.leer():
+            self._hechas.setdefault(linea['clave'], {})[linea['etapa']] = linea.get('datos')
+
+    @classmethod
+    def nueva(
+        cls,
+        script: str,
+        parametros: Optional[Dict[str, Any]] = None,
+        directorio: Path = DIR_CORRIDAS
+    ) -> 'DiarioCorrida':
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        corrida = cls(run_id, directorio)
+        corrida._guardar_meta({
+            'run_id': run_id,
+            'script': script,
+            'parametros': parametros or {},
+            'estado': 'en_curso',
+            'creada_en': time.time(),
+        })
+        logger.info(f"🆔 Corrida {run_id} (para reanudar: --resume {run_id})")
+        return corrida
+
+    @classmethod
+    def reanudar(cls, run_id: str, directorio: Path = DIR_CORRIDAS) -> 'DiarioCorrida':
+        if not (Path(directorio) / run_id / "meta.json").exists():
+            raise CorridaNoEncontrada(f"No existe la corrida {run_id} en {directorio}")
+        corrida = cls(run_id, directorio)
+        logger.info(
+            f"♻️  Reanudando corrida {run_id}: {len(corrida._hechas)} negocios con etapas registradas"
+        )
+        return corrida
+
+    # --------------------------------------------------------------------------
+    # Metadatos
+    # --------------------------------------------------------------------------
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        if not self._ruta_meta.exists():
+            return {}
+        with open(self._ruta_meta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _guardar_meta(self, meta: Dict[str, Any]) -> None:
+        temporal = self._ruta_meta.with_suffix('.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2, default=str)
+        temporal.replace(self._ruta_meta)
+
+    def marcar_completada(self) -> None:
+        meta = self.meta
+        meta['estado'] = 'completada'
+        meta['completada_en'] = time.time()
+        self._guardar_meta(meta)
+
+    # --------------------------------------------------------------------------
+    # Cola de negocios
+    # --------------------------------------------------------------------------
+
+    def guardar_cola(self, negocios: Iterable[Dict[str, Any]]) -> None:
+        self._cola.vaciar()
+        self._cola.agregar_varios(negocios)
+        self._cola.cerrar()
+
+    def cargar_cola(self) -> Optional[List[Dict[str, Any]]]:
+        """Negocios guardados por la corrida, o None si todavía no se guardaron"""
+        if not self._cola.ruta.exists():
+            return None
+        return self._cola.leer_todos()
+
+    # --------------------------------------------------------------------------
+    # Etapas por negocio
+    # --------------------------------------------------------------------------
+
+    def marcar(self, negocio: Dict[str, Any], etapa: str, datos: Any = None) -> None:
+        """Registra que `negocio` terminó `etapa` (con su resultado, si hace falta reanudar)"""
+        clave = clave_negocio(negocio)
+        self._etapas.agregar({'clave': clave, 'etapa': etapa, 'datos': datos})
+        self._hechas.setdefault(clave, {})[etapa] = datos
+
+    def completado(self, negocio: Dict[str, Any], etapa: str) -> bool:
+        return etapa in self._hechas.get(clave_negocio(negocio), {})
+
+    def datos(self, negocio: Dict[str, Any], etapa: str) -> Any:
+        return self._hechas.get(clave_negocio(negocio), {}).get(etapa)
+
+    def pendientes(self, negocios: Iterable[Dict[str, Any]], etapa: str) -> List[Dict[str, Any]]:
+        return [n for n in negocios if not self.completado(n, etapa)]
+
+    def cerrar(self) -> None:
+        self._cola.cerrar()
+        self._etapas.cerrar()
+
+    def __enter__(self) -> 'DiarioCorrida':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MOTOR DE DESCARGAS CONCURRENTE
+==============================
+Descarga muchas webs en paralelo con asyncio + aiohttp, reutilizando
+conexiones keep-alive y respetando dos límites:
+
+- concurrencia global: cuántas descargas hay en vuelo en total
+- límite por host (`limite_por_host`): token bucket + concurrencia AIMD
+  que arranca en `por_host`, sube con respuestas sanas y baja ante 429,
+  5xx o timeouts
+
+Las descargas simultáneas de una misma URL canónica (`urls_canonicas`) se
+hacen una sola vez, y las redirecciones ya vistas se saltean pidiendo
+directo la URL final. Con un `RegistroDominiosCaidos` (`dominios_caidos`)
+los dominios que no resuelven, rechazan la conexión o se cuelgan se
+saltean sin esperar al timeout. Con un `resolucion_dns.CacheDNS` los
+hosts ya pre-resueltos se conectan sin volver a consultar el DNS.
+
+Lo usan `pipeline_completo.py` y `extraer_emails_directamente.py` para
+reemplazar el loop secuencial de `requests.get` + `time.sleep(delay)`.
+
+Uso:
+    from descarga_concurrente import extraer_emails_de_urls
+    emails_por_url = extraer_emails_de_urls(urls, extraer_emails_de_html)
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from urllib.parse import urlparse
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+from cache_http import CacheHTTP
+from dominios_caidos import RegistroDominiosCaidos, clasificar_excepcion
+from limite_por_host import (
+    LimitadorPorHost, CONCURRENCIA_MAXIMA, ERROR, TIMEOUT,
+    clasificar_status, segundos_retry_after
+)
+from metricas import METRICAS
+from urls_canonicas import MemoRedirecciones, UnVuelo, clave_url
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+CONCURRENCIA_GLOBAL = 50
+CONCURRENCIA_POR_HOST = 2          # inicial; el límite adaptativo llega hasta CONCURRENCIA_MAXIMA
+TIMEOUT_SEGUNDOS = 10
+KEEPALIVE_SEGUNDOS = 30
+
+HEADERS_HTTP = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+
+
+@dataclass
+class Respuesta:
+    """Respuesta HTTP ya leída, independiente de la sesión de aiohttp"""
+    url: str
+    url_final: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)  # claves en minúsculas
+    texto: str = ''
+    desde_cache: bool = False
+    contenido: bytes = b''      # bytes crudos (vacío si vino de la cache)
+
+    @property
+    def es_html(self) -> bool:
+        return 'text/html' in self.headers.get('content-type', '').lower()
+
+
+def _host(url: str) -> str:
+    """Host en minúsculas de una URL (clave para el límite por host)"""
+    return (urlparse(url).hostname or '').lower()
+
+
+# ==============================================================================
+# MOTOR
+# ==============================================================================
+
+class MotorDescargas:
+    """
+    Cliente HTTP asíncrono con pool de conexiones compartido.
+
+    Se usa como context manager asíncrono:
+
+        async with MotorDescargas(concurrencia=50, por_host=2) as motor:
+            resultados = await motor.procesar_urls(urls, procesar)
+
+    `motor.limitador.metricas()` da el estado de cada host.
+    """
+
+    def __init__(
+        self,
+        concurrencia: int = CONCURRENCIA_GLOBAL,
+        por_host: int = CONCURRENCIA_POR_HOST,
+        timeout: int = TIMEOUT_SEGUNDOS,
+        headers: Optional[Dict[str, str]] = None,
+        cache: Optional[CacheHTTP] = None,
+        limitador: Optional[LimitadorPorHost] = None,
+        caidos: Optional[RegistroDominiosCaidos] = None,
+        resolver: Optional[AbstractResolver] = None
+    ):
+        self.concurrencia = max(1, concurrencia)
+        self.cache = cache
+        self.por_host = max(1, por_host)
+        self.timeout = timeout
+        self.headers = headers or HEADERS_HTTP
+        self.limitador = limitador or LimitadorPorHost(
+            concurrencia_inicial=self.por_host,
+            concurrencia_maxima=max(self.por_host, CONCURRENCIA_MAXIMA)
+        )
+        self.caidos = caidos
+        self.resolver = resolver
+        self.redirecciones = MemoRedirecciones()
+        self.saltos_evitados = 0
+        self._vuelos = UnVuelo()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._global: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> 'MotorDescargas':
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrencia,
+            limit_per_host=self.limitador.concurrencia_maxima,
+            keepalive_timeout=KEEPALIVE_SEGUNDOS,
+            resolver=self.resolver,
+            use_dns_cache=self.resolver is None,    # la CacheDNS ya respeta los TTL
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._global = asyncio.Semaphore(self.concurrencia)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        resumen = self.limitador.resumen()
+        METRICAS.contar('limite_retrocesos_total', resumen.get('retrocesos', 0))
+        METRICAS.contar('descargas_compartidas_total', self._vuelos.coalescidos)
+        if resumen.get('pedidos'):
+            logger.info(
+                f"🚦 Límite por host: {resumen['pedidos']} pedidos a {resumen['hosts']} hosts, "
+                f"{resumen['retrocesos']} retrocesos en {resumen['hosts_con_retroceso']} hosts "
+                f"(429: {resumen['limitado']}, 5xx: {resumen['error_servidor']}, timeouts: {resumen['timeout']}), "
+                f"{resumen['segundos_espera']:.1f}s de espera acumulada por tasa"
+            )
+        if self._vuelos.coalescidos or self.saltos_evitados:
+            logger.info(
+                f"🔗 Descargas compartidas: {self._vuelos.coalescidos}, "
+                f"redirecciones memorizadas: {len(self.redirecciones)} "
+                f"({self.saltos_evitados} saltos evitados)"
+            )
+
+    async def descargar(self, url: str) -> Optional[Respuesta]:
+        """
+        Descarga una URL; devuelve None ante cualquier error o status >= 400.
+
+        Con cache: una entrada fresca se devuelve sin tocar la red y una
+        vencida se revalida con headers condicionales (304 = reutilizar).
+        """
+        entrada = self.cache.obtener(url) if self.cache is not None else None
+        if entrada is not None and self.cache.es_fresca(entrada):
+            self.cache.hits_frescos += 1
+            METRICAS.contar('cache_http_total', resultado='fresco')
+            return self._respuesta_de_cache(url, entrada)
+
+        headers_extra = self.cache.headers_revalidacion(entrada) if entrada is not None else {}
+        return await self._vuelos.ejecutar(
+            clave_url(url), lambda: self._descargar_de_la_red(url, entrada, headers_extra)
+        )
+
+    async def _descargar_de_la_red(self, url: str, entrada, headers_extra: Dict[str, str]) -> Optional[Respuesta]:
+        destino = self.redirecciones.resolver(url)
+        if destino != url:
+            self.saltos_evitados += 1
+        if self.caidos is not None and self.caidos.bloqueado(destino):
+            logger.debug(f"Dominio caído, se saltea {url}")
+            return None
+
+        host = _host(destino)
+        limite_host = self.limitador.host(host)
+        await limite_host.adquirir()
+        resultado, retry_after, inicio = ERROR, None, None
+        try:
+            async with self._global:
+                inicio = time.monotonic()
+                async with self._session.get(destino, allow_redirects=True, headers=headers_extra) as resp:
+                    if self.caidos is not None:
+                        self.caidos.registrar_exito(destino)
+                    resultado = clasificar_status(resp.status)
+                    self.redirecciones.registrar(url, str(resp.url))
+                    retry_after = segundos_retry_after(resp.headers.get('Retry-After'))
+                    if resp.status == 304 and entrada is not None:
+                        self.cache.refrescar(url)
+                        METRICAS.contar('cache_http_total', resultado='revalidado')
+                        return self._respuesta_de_cache(url, entrada)
+                    resp.raise_for_status()
+                    headers = {k.lower(): v for k, v in resp.headers.items()}
+                    texto = ''
+                    contenido = b''
+                    if 'text/html' in headers.get('content-type', '').lower():
+                        contenido = await resp.read()
+                        METRICAS.contar('http_bytes_total', len(contenido), host=host)
+                        texto = await resp.text(errors='replace')
+                    respuesta = Respuesta(
+                        url=url,
+                        url_final=str(resp.url),
+                        status=resp.status,
+                        headers=headers,
+                        texto=texto,
+                        contenido=contenido
+                    )
+        except asyncio.TimeoutError as e:
+            resultado = TIMEOUT
+            logger.debug(f"Timeout obteniendo {url}")
+            self._registrar_falla(destino, e)
+            return None
+        except Exception as e:
+            logger.debug(f"Error obteniendo {url}: {str(e)[:50]}")
+            self._registrar_falla(destino, e)
+            return None
+        finally:
+            limite_host.liberar(resultado, retry_after)
+            if inicio is not None:
+                METRICAS.observar('http_segundos', time.monotonic() - inicio, host=host)
+                METRICAS.contar('http_respuestas_total', resultado=resultado)
+
+        if self.cache is not None:
+            METRICAS.contar('cache_http_total', resultado='descargado')
+            self.cache.guardar(url, respuesta.url_final, respuesta.status, respuesta.headers, respuesta.texto)
+        return respuesta
+
+    def _registrar_falla(self, url: str, error: BaseException) -> None:
+        if self.caidos is not None and not isinstance(error, aiohttp.ClientResponseError):
+            self.caidos.registrar_falla(url, clasificar_excepcion(error))
+
+    @staticmethod
+    def _respuesta_de_cache(url: str, entrada) -> Respuesta:
+        return Respuesta(
+            url=url,
+            url_final=entrada.url_final,
+            status=entrada.status,
+            headers=entrada.headers,
+            texto=entrada.cuerpo,
+            desde_cache=True
+        )
+
+    async def procesar_urls(
+        self,
+        urls: Iterable[str],
+        procesar: Callable[[str, Optional[Respuesta]], Any]
+    ) -> Dict[str, Any]:
+        """
+        Descarga todas las URLs (sin repetir) y aplica `procesar(url, respuesta)`
+        a cada una. Devuelve {url: resultado}.
+        """
+        unicas = list(dict.fromkeys(u for u in urls if u))
+        total = len(unicas)
+        resultados: Dict[str, Any] = {}
+        completadas = 0
+
+        async def _una(url: str) -> None:
+            nonlocal completadas
+            respuesta = await self.descargar(url)
+            try:
+                resultados[url] = procesar(url, respuesta)
+            except Exception as e:
+                logger.debug(f"Error procesando {url}: {str(e)[:50]}")
+                resultados[url] = procesar(url, None)
+            completadas += 1
+            if completadas % 100 == 0:
+                logger.info(f"   🌐 Descargadas {completadas}/{total} webs")
+
+        await asyncio.gather(*(_una(u) for u in unicas))
+        return resultados
+
+
+# ==============================================================================
+# API SÍNCRONA PARA LOS PIPELINES
+# ==============================================================================
+
+def emails_de_respuesta(
+    url: str,
+    respuesta: Optional[Respuesta],
+    extractor: Callable[[str], Set[str]],
+    cache: Optional[CacheHTTP] = None,
+    nombre_extractor: str = 'emails'
+) -> Set[str]:
+    """
+    Emails de una respuesta ya descargada. Si vino de la cache reutiliza
+    el resultado guardado bajo `nombre_extractor` sin parsear.
+    """
+    if respuesta is None or not respuesta.es_html:
+        return set()
+    if cache is not None and respuesta.desde_cache:
+        guardado = cache.resultado(url, nombre_extractor)
+        if guardado is not None:
+            return set(guardado)
+    emails = extractor(respuesta.texto)
+    if cache is not None:
+        cache.guardar_resultado(url, nombre_extractor, sorted(emails))
+    return emails
+
+
+def extraer_emails_de_urls(
+    urls: Iterable[str],
+    extractor: Callable[[str], Set[str]],
+    concurrencia: int = CONCURRENCIA_GLOBAL,
+    por_host: int = CONCURRENCIA_POR_HOST,
+    timeout: int = TIMEOUT_SEGUNDOS,
+    cache: Optional[CacheHTTP] = None,
+    nombre_extractor: str = 'emails',
+    caidos: Optional[RegistroDominiosCaidos] = None,
+    resolver: Optional[AbstractResolver] = None
+) -> Dict[str, Set[str]]:
+    """
+    Extrae emails de muchas URLs en paralelo.
+
+    `extractor` recibe el HTML y devuelve el Set[str] de emails, igual que
+    `extraer_emails_de_html` de cada pipeline. URLs que fallan o que no
+    son HTML devuelven un set vacío, igual que `extraer_emails_de_url`.
+
+    Con `cache`, las respuestas que vienen de la cache (fresca o 304)
+    reutilizan el resultado guardado bajo `nombre_extractor` sin parsear.
+    Con `caidos`, los dominios vetados devuelven un set vacío sin pedirse.
+    `resolver` (p. ej. una `CacheDNS` ya pre-resuelta) reemplaza el DNS de
+    aiohttp.
+    """
+    def procesar(url: str, respuesta: Optional[Respuesta]) -> Set[str]:
+        return emails_de_respuesta(url, respuesta, extractor, cache, nombre_extractor)
+
+    async def _correr() -> Dict[str, Set[str]]:
+        async with MotorDescargas(concurrencia, por_host, timeout, cache=cache,
+                                  caidos=caidos, resolver=resolver) as motor:
+            return await motor.procesar_urls(urls, procesar)
+
+    return asyncio.run(_correr())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+REGISTRO PERSISTENTE DE DOMINIOS CAÍDOS
+=======================================
+Los dominios que no resuelven DNS, rechazan la conexión o se cuelgan
+hasta el timeout (10-15s en las descargas, 30s en Playwright) se volvían
+a intentar en cada corrida, y cada intento quemaba el timeout completo.
+
+`RegistroDominiosCaidos` guarda en SQLite, por dominio, la clase de la
+última falla, cuántas corridas seguidas falló y hasta cuándo queda vetado:
+
+- TTL con backoff exponencial: `TTL_BASE_HORAS[clase] * 2^(fallas - 1)`,
+  hasta `TTL_MAXIMO_HORAS`. Vencido el veto se vuelve a probar una vez;
+  si responde se borra del registro, si falla el veto se duplica.
+- circuit breaker dentro de la corrida: tras `UMBRAL_CIRCUITO` fallas
+  seguidas (una sola si es DNS) el dominio se saltea al instante por el
+  resto de la corrida, sin esperar al timeout. Solo un circuito abierto
+  escribe el veto en el registro: una falla suelta (una respuesta lenta
+  en una corrida cargada) no saca al sitio de la próxima corrida.
+
+Cualquier respuesta HTTP (aunque sea 404 o 500) cuenta como dominio vivo:
+el registro es para sitios muertos, no para páginas con error.
+
+Lo comparten `descarga_concurrente.MotorDescargas` y
+`pool_playwright.PoolNavegadores`:
+
+    caidos = RegistroDominiosCaidos()
+    if not caidos.bloqueado(url):
+        try:
+            ...
+            caidos.registrar_exito(url)
+        except Exception as e:
+            caidos.registrar_falla(url, clasificar_excepcion(e))
+    caidos.cerrar()
+"""
+
+import asyncio
+import logging
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+RUTA_REGISTRO = Path(__file__).parent / "resultados" / "dominios_caidos.sqlite"
+
+# Clases de falla
+DNS = 'dns'                 # el nombre no resuelve
+CONEXION = 'conexion'       # conexión rechazada, reseteada, host inalcanzable, TLS
+TIMEOUT = 'timeout'
+
+TTL_BASE_HORAS = {DNS: 24.0, CONEXION: 12.0, TIMEOUT: 6.0}
+TTL_MAXIMO_HORAS = 24.0 * 30
+UMBRAL_CIRCUITO = 2         # fallas seguidas en la corrida para cortar el dominio
+
+# Cómo se reconoce cada clase: nombres de excepción (aiohttp, requests,
+# Playwright) y mensajes (errores de red de Chromium y del resolver)
+_MENSAJES_DNS = (
+    'ERR_NAME_NOT_RESOLVED', 'ERR_NAME_RESOLUTION_FAILED',
+    'Name or service not known', 'nodename nor servname', 'getaddrinfo failed',
+    'No address associated with hostname',
+)
+_EXCEPCIONES_TIMEOUT = {'TimeoutError', 'ConnectTimeout', 'ReadTimeout', 'Timeout'}
+_MENSAJES_TIMEOUT = ('ERR_CONNECTION_TIMED_OUT', 'ERR_TIMED_OUT')
+_EXCEPCIONES_CONEXION = {
+    'ClientConnectorError', 'ClientConnectorSSLError', 'ClientConnectorCertificateError',
+    'ServerDisconnectedError', 'SSLError', 'NewConnectionError',
+}
+_MENSAJES_CONEXION = (
+    'ERR_CONNECTION_REFUSED', 'ERR_CONNECTION_RESET', 'ERR_CONNECTION_CLOSED',
+    'ERR_ADDRESS_UNREACHABLE', 'ERR_SSL_PROTOCOL_ERROR', 'ERR_CERT_',
+)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS dominios (
+    dominio         TEXT PRIMARY KEY,
+    clase           TEXT,
+    fallas          INTEGER,
+    primera_falla   REAL,
+    ultima_falla    REAL,
+    bloqueado_hasta REAL
+);
+"""
+
+
+def dominio_de(url: str) -> str:
+    """Dominio de una URL en minúsculas y sin `www.` (clave del registro)"""
+    try:
+        host = (urlsplit(url.strip()).hostname or '').lower().rstrip('.')
+    except ValueError:
+        return ''
+    return host[4:] if host.startswith('www.') else host
+
+
+def _cadena(error: BaseException) -> List[BaseException]:
+    """La excepción y las que envuelve (`os_error` de aiohttp, `__cause__`, `__context__`)"""
+    cadena: List[BaseException] = []
+    pendientes = [error]
+    while pendientes and len(cadena) < 10:
+        actual = pendientes.pop()
+        if actual is None or any(actual is e for e in cadena):
+            continue
+        cadena.append(actual)
+        pendientes.extend((actual.__context__, actual.__cause__, getattr(actual, 'os_error', None)))
+    return cadena
+
+
+def clasificar_excepcion(error: BaseException) -> Optional[str]:
+    """
+    Clase de falla de red de una excepción de aiohttp, requests o
+    Playwright; None si no indica que el dominio esté caído.
+    """
+    cadena = _cadena(error)
+    nombres = {type(e).__name__ for e in cadena}
+    mensajes = ' | '.join(str(e) for e in cadena)
+
+    if any(isinstance(e, socket.gaierror) for e in cadena) or 'ClientConnectorDNSError' in nombres \
+            or any(p in mensajes for p in _MENSAJES_DNS):
+        return DNS
+    if any(isinstance(e, (asyncio.TimeoutError, TimeoutError, socket.timeout)) for e in cadena) \
+            or nombres & _EXCEPCIONES_TIMEOUT or any(p in mensajes for p in _MENSAJES_TIMEOUT):
+        return TIMEOUT
+    if any(isinstance(e, ConnectionError) for e in cadena) or nombres & _EXCEPCIONES_CONEXION \
+            or any(p in mensajes for p in _MENSAJES_CONEXION):
+        return CONEXION
+    return None
+
+
+def ttl_segundos(clase: str, fallas: int) -> float:
+    """Veto para la `fallas`-ésima corrida seguida con falla de `clase`"""
+    horas = TTL_BASE_HORAS.get(clase, TTL_BASE_HORAS[TIMEOUT]) * 2 ** max(0, fallas - 1)
+    return min(horas, TTL_MAXIMO_HORAS) * 3600
+
+
+# ==============================================================================
+# REGISTRO
+# ==============================================================================
+
+class RegistroDominiosCaidos:
+    """Vetos persistentes por dominio + circuit breaker de la corrida"""
+
+    def __init__(self, ruta: Path = RUTA_REGISTRO, umbral_circuito: int = UMBRAL_CIRCUITO):
+        self.ruta = Path(ruta)
+        self.umbral_circuito = max(1, umbral_circuito)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.ruta), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_ESQUEMA)
+
+        # Vetos vigentes de corridas anteriores: dominio -> (clase, bloqueado_hasta)
+        ahora = time.time()
+        self._vetados: Dict[str, Tuple[str, float]] = {
+            dominio: (clase, hasta)
+            for dominio, clase, hasta in self._conn.execute(
+                "SELECT dominio, clase, bloqueado_hasta FROM dominios WHERE bloqueado_hasta > ?", (ahora,)
+            )
+        }
+        self._en_registro: Set[str] = {fila[0] for fila in self._conn.execute("SELECT dominio FROM dominios")}
+        self._fallas_seguidas: Dict[str, int] = {}
+        self._cortados: Dict[str, str] = {}         # circuito abierto en esta corrida
+        self._registrados: Set[str] = set()         # fallas ya sumadas al registro en esta corrida
+
+        # Contadores
+        self.vetados_al_inicio = len(self._vetados)
+        self.saltados = 0
+        self.fallas: Dict[str, int] = {DNS: 0, CONEXION: 0, TIMEOUT: 0}
+        self.recuperados = 0
+
+    def bloqueado(self, url: str) -> Optional[str]:
+        """Clase de falla si el dominio de `url` está vetado o cortado; None si se puede intentar"""
+        dominio = dominio_de(url)
+        with self._lock:
+            clase = self._cortados.get(dominio)
+            if clase is None:
+                veto = self._vetados.get(dominio)
+                if veto is not None and veto[1] > time.time():
+                    clase = veto[0]
+            if clase is not None:
+                self.saltados += 1
+        if clase is not None:
+            METRICAS.contar('dominios_salteados_total', clase=clase)
+        return clase
+
+    def registrar_falla(self, url: str, clase: Optional[str]) -> None:
+        """
+        Anota una falla de red; `clase=None` (error que no es de red) no
+        cuenta. Al abrirse el circuito el dominio se veta en el registro.
+        """
+        dominio = dominio_de(url)
+        if not dominio or clase is None:
+            return
+        ahora = time.time()
+        with self._lock:
+            self.fallas[clase] = self.fallas.get(clase, 0) + 1
+            seguidas = self._fallas_seguidas.get(dominio, 0) + 1
+            self._fallas_seguidas[dominio] = seguidas
+            if clase != DNS and seguidas < self.umbral_circuito:
+                return
+            # Circuito abierto: recién ahí el veto pasa a las próximas corridas
+            self._cortados[dominio] = clase
+
+            if dominio in self._registrados:
+                return
+            self._registrados.add(dominio)
+            fila = self._conn.execute(
+                "SELECT fallas, primera_falla FROM dominios WHERE dominio = ?", (dominio,)
+            ).fetchone()
+            fallas, primera = (fila[0] + 1, fila[1]) if fila else (1, ahora)
+            self._en_registro.add(dominio)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO dominios VALUES (?, ?, ?, ?, ?, ?)",
+                    (dominio, clase, fallas, primera, ahora, ahora + ttl_segundos(clase, fallas))
+                )
+
+    def registrar_exito(self, url: str) -> None:
+        """El dominio respondió: se cierra el circuito y se borra del registro"""
+        dominio = dominio_de(url)
+        with self._lock:
+            self._fallas_seguidas.pop(dominio, None)
+            self._cortados.pop(dominio, None)
+            self._registrados.discard(dominio)
+            if dominio not in self._en_registro:
+                return
+            self._en_registro.discard(dominio)
+            with self._conn:
+                self._conn.execute("DELETE FROM dominios WHERE dominio = ?", (dominio,))
+            self.recuperados += 1
+
+    def cerrar(self) -> None:
+        if self.saltados or any(self.fallas.values()):
+            logger.info(
+                f"🪦 Dominios caídos: {self.saltados} intentos salteados "
+                f"({self.vetados_al_inicio} vetados de corridas anteriores, "
+                f"{len(self._cortados)} cortados en esta corrida); fallas nuevas: "
+                f"{self.fallas[DNS]} DNS, {self.fallas[CONEXION]} conexión, {self.fallas[TIMEOUT]} timeout; "
+                f"{self.recuperados} recuperados"
+            )
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ENRIQUECIMIENTO DE UNA WEB (UNA DESCARGA, VARIOS EXTRACTORES)
+=============================================================
+`procesar_negocio` bajaba la web con `requests` para los emails y otra
+vez (estático + Playwright) para el WhatsApp, y cada extractor volvía a
+parsear la página por su cuenta.
+
+Ahora cada URL se descarga una vez en un `Documento` compartido:
+- `contenido`: los bytes crudos de la respuesta
+- `texto`: el HTML decodificado (charset del Content-Type o UTF-8)
+- `dom`: árbol BeautifulSoup, armado recién cuando un extractor lo pide
+- `anclas`: (url absoluta, texto) de los <a>, calculadas una sola vez
+- `html_renderizado`: opcional, el DOM que dejó el navegador; si está,
+  `html` lo usa en lugar del estático
+
+Los extractores se registran por nombre (`registrar_extractor`) y reciben
+el `Documento`; su resultado tiene que ser serializable a JSON (va a la
+cache HTTP). Sumar un extractor nunca suma una descarga: `enriquecer`
+corre los que se pidan sobre el mismo documento.
+
+Registrados de fábrica:
+    emails_pipeline, emails_directo   emails (validador del pipeline / estricto)
+    whatsapp                          número de los enlaces wa.me o del texto
+    senal_js                          motivo para abrir un navegador (`whatsapp_escalonado`)
+    redes                             {red: url} de Instagram, Facebook, TikTok...
+    menu                              enlaces a la carta / menú
+
+Uso:
+    documento = descargar_documento(url)
+    resultados = enriquecer(documento, ['emails_pipeline', 'whatsapp', 'redes'])
+
+    @registrar_extractor('reservas', combinar='union')
+    def reservas(documento: Documento) -> List[str]: ...
+"""
+
+import html as html_lib
+import logging
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import requests
+from bs4 import BeautifulSoup
+
+from descarga_concurrente import HEADERS_HTTP, Respuesta
+from extraccion_rapida import extraer_emails_con_respaldo
+from extraccion_whatsapp import whatsapp_de_html
+from validacion_emails import EMAIL_REGEX, VALIDADOR_ESTRICTO, VALIDADOR_PIPELINE, ValidadorEmails
+from whatsapp_escalonado import senal_js
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+# Redes sociales: nombre -> dominios (sin 'www.')
+REDES = {
+    'instagram': ('instagram.com',),
+    'facebook': ('facebook.com', 'fb.com', 'fb.me'),
+    'tiktok': ('tiktok.com',),
+    'twitter': ('twitter.com', 'x.com'),
+    'youtube': ('youtube.com', 'youtu.be'),
+    'tripadvisor': ('tripadvisor.com', 'tripadvisor.com.ar', 'tripadvisor.es'),
+}
+# Primer segmento del path en enlaces de compartir / login, que no son el perfil del negocio
+PATHS_NO_PERFIL = frozenset({'sharer', 'share', 'intent', 'dialog', 'login', 'plugins', 'tr', 'hashtag'})
+
+PALABRAS_MENU = ('menu', 'menú', 'carta', 'nuestra-carta', 'platos')
+MAX_ENLACES_MENU = 5
+
+_CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+_ENLACE = re.compile(
+    r'''<a\b((?:[^>"']|"[^"]*"|'[^']*')*)>(.*?)</a\s*>''',
+    re.IGNORECASE | re.DOTALL
+)
+_HREF = re.compile(r'''\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+))''', re.IGNORECASE)
+_ETIQUETAS = re.compile(r'<[^>]*>')
+
+
+# ==============================================================================
+# DOCUMENTO
+# ==============================================================================
+
+def _sin_fragmento(url: str) -> str:
+    partes = urlsplit(url)
+    return urlunsplit((partes.scheme, partes.netloc, partes.path or '/', partes.query, ''))
+
+
+def anclas_de_html(html: str, url_base: str) -> List[Tuple[str, str]]:
+    """(url absoluta sin fragmento, texto) de los <a> con destino http(s)"""
+    salida = []
+    for m in _ENLACE.finditer(html):
+        href = _HREF.search(m.group(1))
+        if not href:
+            continue
+        destino = html_lib.unescape(href.group(1) or href.group(2) or href.group(3) or '').strip()
+        if not destino or destino.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+            continue
+        url = _sin_fragmento(urljoin(url_base, destino))
+        if urlsplit(url).scheme not in ('http', 'https'):
+            continue
+        salida.append((url, ' '.join(html_lib.unescape(_ETIQUETAS.sub(' ', m.group(2))).split())))
+    return salida
+
+
+class Documento:
+    """
+    Una página descargada una vez, compartida por todos los extractores.
+    `texto`, `dom` y `anclas` se calculan la primera vez que se piden.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        contenido: bytes = b'',
+        *,
+        texto: Optional[str] = None,
+        url_final: Optional[str] = None,
+        status: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        html_renderizado: Optional[str] = None
+    ):
+        self.url = url
+        self.url_final = url_final or url
+        self.status = status
+        self.headers = headers or {}            # claves en minúsculas
+        self.html_renderizado = html_renderizado
+        self._contenido = contenido
+        if texto is not None:
+            self.__dict__['texto'] = texto
+
+    @classmethod
+    def de_respuesta(cls, respuesta: Respuesta) -> 'Documento':
+        return cls(
+            respuesta.url, respuesta.contenido, texto=respuesta.texto, url_final=respuesta.url_final,
+            status=respuesta.status, headers=respuesta.headers
+        )
+
+    @property
+    def contenido(self) -> bytes:
+        """Bytes crudos (si el documento vino como texto, su UTF-8)"""
+        if not self._contenido and 'texto' in self.__dict__:
+            self._contenido = self.texto.encode('utf-8', errors='replace')
+        return self._contenido
+
+    @property
+    def es_html(self) -> bool:
+        return self.html_renderizado is not None or 'text/html' in self.headers.get('content-type', '').lower()
+
+    @cached_property
+    def texto(self) -> str:
+        m = _CHARSET.search(self.headers.get('content-type', ''))
+        try:
+            return self._contenido.decode(m.group(1) if m else 'utf-8', errors='replace')
+        except LookupError:
+            return self._contenido.decode('utf-8', errors='replace')
+
+    @property
+    def html(self) -> str:
+        """El DOM del navegador si lo hay; si no, el HTML estático"""
+        return self.html_renderizado if self.html_renderizado is not None else self.texto
+
+    @cached_property
+    def dom(self) -> BeautifulSoup:
+        return BeautifulSoup(self.html, 'html.parser')
+
+    @cached_property
+    def anclas(self) -> List[Tuple[str, str]]:
+        return anclas_de_html(self.html, self.url_final)
+
+    def renderizado(self, html: str, url_final: Optional[str] = None) -> 'Documento':
+        """Copia con el DOM que dejó el navegador (los cálculos perezosos se rehacen)"""
+        return Documento(
+            self.url, self._contenido, texto=self.__dict__.get('texto'), url_final=url_final or self.url_final,
+            status=self.status, headers=self.headers, html_renderizado=html
+        )
+
+
+def descargar_documento(url: str, timeout: int = 10) -> Optional[Documento]:
+    """Una descarga con `requests`; None si falla (ver `Documento.es_html`)"""
+    try:
+        response = requests.get(url, headers=HEADERS_HTTP, timeout=timeout, allow_redirects=True)
+        response.raise_for_status()
+    except Exception as e:
+        logger.debug(f"Error obteniendo {url}: {str(e)[:50]}")
+        return None
+    return Documento(
+        url, response.content, url_final=response.url, status=response.status_code,
+        headers={k.lower(): v for k, v in response.headers.items()}
+    )
+
+
+# ==============================================================================
+# REGISTRO DE EXTRACTORES
+# ==============================================================================
+
+@dataclass(frozen=True)
+class Extractor:
+    """
+    `funcion(documento)` devuelve un valor serializable a JSON (None = nada).
+    `combinar` dice cómo juntar los valores de varias páginas de un sitio:
+    'primero' (el primero no vacío) o 'union' (listas sin repetidos,
+    diccionarios sin pisar claves).
+    La función tiene que ser de nivel de módulo: el extractor viaja a los
+    workers de `PoolParseo`.
+    """
+    nombre: str
+    funcion: Callable[['Documento'], Any]
+    combinar: str = 'primero'
+
+
+EXTRACTORES: Dict[str, Extractor] = {}
+
+
+def registrar_extractor(nombre: str, combinar: str = 'primero'):
+    """Decorador: registra `funcion(documento)` bajo `nombre`"""
+    if combinar not in ('primero', 'union'):
+        raise ValueError(f"Modo de combinación desconocido: {combinar}")
+
+    def _registrar(funcion: Callable[[Documento], Any]) -> Callable[[Documento], Any]:
+        EXTRACTORES[nombre] = Extractor(nombre, funcion, combinar)
+        return funcion
+    return _registrar
+
+
+def extractores(nombres: Iterable[str]) -> Tuple[Extractor, ...]:
+    """Extractores registrados por nombre (KeyError si alguno no existe)"""
+    return tuple(EXTRACTORES[n] for n in nombres)
+
+
+def enriquecer(documento: Documento, nombres: Iterable[Any]) -> Dict[str, Any]:
+    """
+    Corre los extractores sobre el mismo documento. `nombres` acepta
+    nombres registrados o instancias de `Extractor`. Un extractor que
+    falla deja None y no corta a los demás.
+    """
+    resultados = {}
+    for extractor in nombres:
+        if not isinstance(extractor, Extractor):
+            extractor = EXTRACTORES[extractor]
+        try:
+            resultados[extractor.nombre] = extractor.funcion(documento)
+        except Exception as e:
+            logger.debug(f"Extractor {extractor.nombre} falló en {documento.url}: {str(e)[:50]}")
+            resultados[extractor.nombre] = None
+    return resultados
+
+
+def _vacio(valor: Any) -> bool:
+    return valor is None or valor == [] or valor == {} or valor == ''
+
+
+def combinar_resultados(
+    paginas: Sequence[Dict[str, Any]],
+    extractores_usados: Sequence[Extractor]
+) -> Dict[str, Any]:
+    """Junta los resultados de las páginas de un sitio (en orden de visita)"""
+    combinado: Dict[str, Any] = {}
+    for extractor in extractores_usados:
+        valores = [p[extractor.nombre] for p in paginas if not _vacio(p.get(extractor.nombre))]
+        if not valores:
+            combinado[extractor.nombre] = next(
+                (p[extractor.nombre] for p in paginas if extractor.nombre in p), None
+            )
+        elif extractor.combinar == 'primero':
+            combinado[extractor.nombre] = valores[0]
+        elif isinstance(valores[0], dict):
+            union: Dict[str, Any] = {}
+            for valor in valores:
+                for clave, v in valor.items():
+                    union.setdefault(clave, v)
+            combinado[extractor.nombre] = union
+        else:
+            combinado[extractor.nombre] = list(dict.fromkeys(v for valor in valores for v in valor))
+    return combinado
+
+
+# ==============================================================================
+# EXTRACTORES DE FÁBRICA
+# ==============================================================================
+
+def emails_de_dom(dom: BeautifulSoup, es_valido: ValidadorEmails) -> List[str]:
+    """Emails del texto visible y de los mailto: de un árbol ya armado"""
+    emails = set()
+    for email in EMAIL_REGEX.findall(dom.get_text()):
+        email = email.strip().lower()
+        if es_valido(email):
+            emails.add(email)
+    for enlace in dom.find_all('a', href=True):
+        href = enlace['href']
+        if href.startswith('mailto:'):
+            email = href.replace('mailto:', '').split('?')[0].strip().lower()
+            if es_valido(email):
+                emails.add(email)
+    return sorted(emails)
+
+
+def _emails(documento: Documento, es_valido: ValidadorEmails) -> List[str]:
+    # El árbol solo se arma si el camino rápido no puede decidir
+    return sorted(extraer_emails_con_respaldo(
+        documento.html, es_valido, lambda _: set(emails_de_dom(documento.dom, es_valido))
+    ))
+
+
+@registrar_extractor('emails_pipeline', combinar='union')
+def emails_pipeline(documento: Documento) -> List[str]:
+    return _emails(documento, VALIDADOR_PIPELINE)
+
+
+@registrar_extractor('emails_directo', combinar='union')
+def emails_directo(documento: Documento) -> List[str]:
+    return _emails(documento, VALIDADOR_ESTRICTO)
+
+
+@registrar_extractor('whatsapp')
+def whatsapp(documento: Documento) -> Optional[str]:
+    return whatsapp_de_html(documento.html)
+
+
+@registrar_extractor('senal_js')
+def senal_js_estatica(documento: Documento) -> Optional[str]:
+    # Sobre el DOM del navegador no tiene sentido: ya corrió el JavaScript
+    if documento.html_renderizado is not None:
+        return None
+    return senal_js(documento.texto)
+
+
+def _red(url: str) -> Optional[str]:
+    partes = urlsplit(url)
+    host = (partes.hostname or '').lower()
+    host = host[4:] if host.startswith('www.') else host
+    path = partes.path.lower().strip('/')
+    if not path or path.split('/')[0] in PATHS_NO_PERFIL:
+        return None
+    for red, dominios in REDES.items():
+        if any(host == d or host.endswith('.' + d) for d in dominios):
+            return red
+    return None
+
+
+@registrar_extractor('redes', combinar='union')
+def redes(documento: Documento) -> Dict[str, str]:
+    encontradas: Dict[str, str] = {}
+    for url, _ in documento.anclas:
+        red = _red(url)
+        if red is not None:
+            encontradas.setdefault(red, url)
+    return encontradas
+
+
+@registrar_extractor('menu', combinar='union')
+def menu(documento: Documento) -> List[str]:
+    sitio = (urlsplit(documento.url_final).hostname or '').lower()
+    enlaces = []
+    for url, texto in documento.anclas:
+        if _red(url) is not None:
+            continue
+        destino = (urlsplit(url).path + ' ' + texto).lower()
+        if any(p in destino for p in PALABRAS_MENU) and (
+            (urlsplit(url).hostname or '').lower() == sitio or url.lower().endswith('.pdf')
+        ):
+            enlaces.append(url)
+    return list(dict.fromkeys(enlaces))[:MAX_ENLACES_MENU]
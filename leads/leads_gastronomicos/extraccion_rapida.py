@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+EXTRACCIÓN RÁPIDA DE EMAILS (SIN PARSER)
+========================================
+`extraer_emails_de_html` armaba un árbol BeautifulSoup completo solo para
+correr una regex sobre `get_text()` y mirar los `mailto:`. Acá se hace lo
+mismo con regex sobre el HTML crudo:
+
+1. Si el documento no tiene ningún '@' (ni `&#64;`, `&commat;`, `%40`)
+   no puede tener emails: se devuelve vacío sin más trabajo.
+2. Se quitan comentarios, <script>, <style> y <template> (get_text
+   tampoco los incluye) y se leen los href `mailto:` de los <a>,
+   decodificando entidades HTML y percent-encoding.
+3. Se quitan las etiquetas, se decodifican entidades y se corre la regex
+   de emails sobre el texto resultante.
+
+Si después de quitar etiquetas queda algo con forma de etiqueta (HTML
+roto, comillas sin cerrar), el escaneo es ambiguo y se usa el extractor
+completo con BeautifulSoup.
+
+Verificación contra el extractor completo sobre páginas guardadas:
+    python3 extraccion_rapida.py --directorio paginas/
+    python3 extraccion_rapida.py --cache resultados/cache_http.sqlite
+"""
+
+import argparse
+import html as html_lib
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Set, Tuple, Union
+from urllib.parse import unquote
+
+from validacion_emails import EMAIL_REGEX
+
+# Formas en las que puede aparecer un '@' en el HTML
+_MARCAS_ARROBA = ('@', '&#64;', '&#x40;', '&#X40;', '&commat;', '%40')
+
+_BLOQUES_OCULTOS = re.compile(
+    r'<!--.*?-->'
+    r'|<script\b[^>]*>.*?</script\s*>'
+    r'|<style\b[^>]*>.*?</style\s*>'
+    r'|<template\b[^>]*>.*?</template\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+_CDATA = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
+_ETIQUETA = re.compile(r'''</?[A-Za-z](?:[^>"']|"[^"]*"|'[^']*')*>|<![^>]*>|<\?[^>]*>''')
+_RESTO_ETIQUETA = re.compile(r'</?[A-Za-z!?]')
+_ANCLA = re.compile(r'''<a\b(?:[^>"']|"[^"]*"|'[^']*')*>''', re.IGNORECASE)
+_HREF = re.compile(r'''\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+))''', re.IGNORECASE)
+
+
+def _a_texto(html: Union[str, bytes]) -> str:
+    if isinstance(html, bytes):
+        return html.decode('utf-8', errors='replace')
+    return html or ''
+
+
+def _emails_mailto(html: str, es_valido: Callable[[str], bool]) -> Set[str]:
+    """Emails de los href mailto: de las etiquetas <a>"""
+    emails = set()
+    if 'mailto' not in html.lower():
+        return emails
+    for ancla in _ANCLA.finditer(html):
+        m = _HREF.search(ancla.group(0))
+        if not m:
+            continue
+        href = html_lib.unescape(m.group(1) or m.group(2) or m.group(3) or '')
+        if href.startswith('mailto:'):
+            email = unquote(href.replace('mailto:', '').split('?')[0]).strip().lower()
+            if es_valido(email):
+                emails.add(email)
+    return emails
+
+
+def extraer_emails_rapido(
+    html: Union[str, bytes],
+    es_valido: Callable[[str], bool]
+) -> Optional[Set[str]]:
+    """
+    Extrae emails sin construir un árbol DOM.
+
+    Devuelve None si el escaneo es ambiguo y hace falta el parser completo.
+    """
+    html = _a_texto(html)
+    if not any(marca in html for marca in _MARCAS_ARROBA):
+        return set()
+
+    visible = _BLOQUES_OCULTOS.sub('', html)
+    visible = _CDATA.sub(lambda m: m.group(1), visible)
+
+    emails = _emails_mailto(visible, es_valido)
+
+    texto = _ETIQUETA.sub('', visible)
+    if _RESTO_ETIQUETA.search(texto):
+        return None
+    texto = html_lib.unescape(texto)
+
+    for email in EMAIL_REGEX.findall(texto):
+        email_limpio = email.strip().lower()
+        if es_valido(email_limpio):
+            emails.add(email_limpio)
+
+    return emails
+
+
+def extraer_emails_con_respaldo(
+    html: Union[str, bytes],
+    es_valido: Callable[[str], bool],
+    extractor_completo: Callable[[str], Set[str]]
+) -> Set[str]:
+    """Camino rápido; si es ambiguo, cae al extractor completo (BeautifulSoup)"""
+    emails = extraer_emails_rapido(html, es_valido)
+    if emails is None:
+        return extractor_completo(_a_texto(html))
+    return emails
+
+
+# ==============================================================================
+# VERIFICACIÓN CONTRA EL EXTRACTOR COMPLETO
+# ==============================================================================
+
+def _paginas_de_directorio(directorio: Path) -> Iterator[Tuple[str, str]]:
+    for ruta in sorted(directorio.rglob('*.htm*')):
+        yield str(ruta), ruta.read_text(encoding='utf-8', errors='replace')
+
+
+def _paginas_de_cache(ruta_cache: Path) -> Iterator[Tuple[str, str]]:
+    conn = sqlite3.connect(str(ruta_cache))
+    try:
+        for clave, cuerpo in conn.execute("SELECT clave, cuerpo FROM respuestas WHERE cuerpo != ''"):
+            yield clave, cuerpo
+    finally:
+        conn.close()
+
+
+def verificar(paginas: Iterator[Tuple[str, str]]) -> int:
+    """
+    Compara el camino rápido con el extractor BeautifulSoup página por página.
+
+    Falla si el camino rápido pierde algún email. Los emails de más se
+    listan pero no fallan: son `mailto:` con percent-encoding, que el
+    extractor completo no decodifica.
+    """
+    from extraer_emails_directamente import es_email_valido, extraer_emails_de_html_bs4
+
+    total = ambiguas = con_faltantes = con_extras = 0
+    t_rapido = t_completo = 0.0
+
+    for nombre, html in paginas:
+        total += 1
+
+        t0 = time.perf_counter()
+        rapido = extraer_emails_rapido(html, es_email_valido)
+        t1 = time.perf_counter()
+        completo = extraer_emails_de_html_bs4(html)
+        t2 = time.perf_counter()
+        t_rapido += t1 - t0
+        t_completo += t2 - t1
+
+        if rapido is None:
+            ambiguas += 1
+            continue
+        faltantes = completo - rapido
+        extras = rapido - completo
+        if faltantes:
+            con_faltantes += 1
+            print(f"✗ {nombre} — faltan: {sorted(faltantes)}")
+        if extras:
+            con_extras += 1
+            print(f"+ {nombre} — de más: {sorted(extras)}")
+
+    print(
+        f"\nPáginas: {total} | ambiguas (respaldo BS4): {ambiguas} | "
+        f"con faltantes: {con_faltantes} | con emails de más: {con_extras}"
+    )
+    if total:
+        print(f"Tiempo rápido:   {t_rapido:.2f}s ({t_rapido / total * 1000:.2f} ms/página)")
+        print(f"Tiempo completo: {t_completo:.2f}s ({t_completo / total * 1000:.2f} ms/página)")
+    return 1 if con_faltantes else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verificar la extracción rápida contra BeautifulSoup')
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument('--directorio', type=Path, help='Directorio con páginas .html guardadas')
+    grupo.add_argument('--cache', type=Path, help='Cache HTTP (cache_http.sqlite) como corpus')
+    args = parser.parse_args()
+
+    paginas = _paginas_de_directorio(args.directorio) if args.directorio else _paginas_de_cache(args.cache)
+    sys.exit(verificar(paginas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+EXTRACCIÓN DE WHATSAPP
+======================
+Patrones y helpers para encontrar un número de WhatsApp en una web.
+Los comparten `pipeline_completo.extraer_whatsapp_playwright` y el pool
+de navegadores (`pool_playwright.py`).
+
+Carga de páginas con Playwright: antes se esperaba `domcontentloaded` y
+después `time.sleep(3)` siempre, con imágenes, fuentes, videos y
+trackers cargándose. Ahora:
+
+- `bloquear_recursos(contexto)` aborta los tipos de recurso pesados
+  (`TIPOS_RECURSOS_BLOQUEADOS`) y los scripts de analítica/publicidad
+  de terceros (`DOMINIOS_RASTREO`); el HTML y el JS propio se cargan
+- `esperar_whatsapp(pagina, red)` vuelve apenas aparece un enlace de
+  WhatsApp (un `MutationObserver` en la página) o la red queda inactiva
+  (`ActividadRed`: sin pedidos en vuelo durante `INACTIVIDAD_RED_SEGUNDOS`),
+  con `PLAZO_ESPERA_SEGUNDOS` como tope
+"""
+
+import re
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from metricas import METRICAS
+
+# Recursos que no hacen falta para encontrar un WhatsApp
+TIPOS_RECURSOS_BLOQUEADOS = {'image', 'media', 'font', 'stylesheet', 'texttrack', 'manifest'}
+
+# Analítica y publicidad de terceros (se bloquea el host y sus subdominios)
+DOMINIOS_RASTREO = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'connect.facebook.net', 'hotjar.com', 'clarity.ms',
+    'analytics.tiktok.com', 'static.ads-twitter.com', 'snap.licdn.com', 'mc.yandex.ru',
+    'stats.wp.com', 'js-agent.newrelic.com', 'nr-data.net', 'cdn.segment.com', 'pixel.wp.com',
+)
+
+# Espera después de `domcontentloaded`
+PLAZO_ESPERA_SEGUNDOS = 3.0          # tope duro (lo que antes se dormía siempre)
+INACTIVIDAD_RED_SEGUNDOS = 0.5       # sin pedidos en vuelo durante este tiempo = red inactiva
+TRAMO_ESPERA_SEGUNDOS = 0.25         # cada cuánto se mira la red mientras se espera el enlace
+
+# Selector de enlaces de WhatsApp en la página
+SELECTOR_ENLACES_WHATSAPP = 'a[href*="wa.me"], a[href*="whatsapp"], a[href*="api.whatsapp.com"]'
+
+# Número dentro de un href (wa.me/549... o api.whatsapp.com/send?phone=549...)
+PATRON_HREF_WHATSAPP = re.compile(r'(?:wa\.me/|whatsapp\.com/send\?phone=)(\+?\d+)')
+
+# Números en el contenido de la página
+PATRONES_TEXTO_WHATSAPP = [
+    re.compile(r'whatsapp[:\s]+([+\d\s\-()]{10,20})', re.IGNORECASE),
+    re.compile(r'(\+54\s?9?\s?\d{2,4}\s?\d{3,4}\s?\d{3,4})', re.IGNORECASE),
+]
+
+
+def clean_phone_number(phone: str) -> Optional[str]:
+    """Limpia número de teléfono"""
+    if not phone:
+        return None
+
+    cleaned = re.sub(r'[\s\-()]', '', phone)
+    cleaned = re.sub(r'[^\d+]', '', cleaned)
+    digits = re.sub(r'[^\d]', '', cleaned)
+
+    if len(digits) < 10:
+        return None
+
+    return cleaned
+
+
+def whatsapp_de_href(href: str) -> Optional[str]:
+    """Extrae el número de un enlace wa.me / api.whatsapp.com"""
+    if not href:
+        return None
+    match = PATRON_HREF_WHATSAPP.search(href)
+    if match:
+        return clean_phone_number(match.group(1))
+    return None
+
+
+def whatsapp_de_contenido(content: str) -> Optional[str]:
+    """Busca un número de WhatsApp en el HTML/texto de la página"""
+    for pattern in PATRONES_TEXTO_WHATSAPP:
+        for match in pattern.findall(content or ''):
+            phone = clean_phone_number(match)
+            if phone:
+                return phone
+    return None
+
+
+def whatsapp_de_html(html: str) -> Optional[str]:
+    """
+    Lo mismo que `buscar_whatsapp_en_pagina` pero sobre el HTML estático:
+    primero los enlaces wa.me / api.whatsapp.com, después el contenido
+    """
+    for match in PATRON_HREF_WHATSAPP.finditer(html or ''):
+        phone = clean_phone_number(match.group(1))
+        if phone:
+            return phone
+    return whatsapp_de_contenido(html)
+
+
+def buscar_whatsapp_en_pagina(page) -> Optional[str]:
+    """Busca WhatsApp en una página ya cargada de Playwright"""
+    for link in page.query_selector_all(SELECTOR_ENLACES_WHATSAPP):
+        phone = whatsapp_de_href(link.get_attribute('href'))
+        if phone:
+            return phone
+
+    return whatsapp_de_contenido(page.content())
+
+
+# ==============================================================================
+# CARGA DE PÁGINAS CON PLAYWRIGHT
+# ==============================================================================
+
+_PATRON_RASTREO = re.compile(
+    r'(?:^|\.)(?:' + '|'.join(re.escape(d) for d in DOMINIOS_RASTREO) + r')$'
+)
+
+# Resuelve true apenas hay un enlace que matchea el selector, false al vencer `ms`
+_JS_ESPERAR_ENLACE = """([selector, ms]) => new Promise(resolver => {
+    if (document.querySelector(selector)) return resolver(true);
+    const observador = new MutationObserver(() => {
+        if (document.querySelector(selector)) { observador.disconnect(); resolver(true); }
+    });
+    observador.observe(document, {childList: true, subtree: true, attributes: true, attributeFilter: ['href']});
+    setTimeout(() => { observador.disconnect(); resolver(false); }, ms);
+})"""
+
+
+def es_rastreador(url: str) -> bool:
+    try:
+        host = (urlsplit(url).hostname or '').lower()
+    except ValueError:
+        return False
+    return _PATRON_RASTREO.search(host) is not None
+
+
+def _filtrar_pedido(route) -> None:
+    pedido = route.request
+    tipo = pedido.resource_type
+    try:
+        if tipo in TIPOS_RECURSOS_BLOQUEADOS or (tipo != 'document' and es_rastreador(pedido.url)):
+            route.abort('blockedbyclient')
+            METRICAS.contar('playwright_recursos_total', resultado='bloqueado', tipo=tipo)
+        else:
+            route.continue_()
+            METRICAS.contar('playwright_recursos_total', resultado='permitido', tipo=tipo)
+    except Exception:
+        pass        # la página se cerró o navegó mientras tanto
+
+
+def bloquear_recursos(contexto) -> None:
+    """Intercepta los pedidos del contexto y aborta imágenes, fuentes, media, CSS y trackers"""
+    contexto.route('**/*', _filtrar_pedido)
+
+
+class ActividadRed:
+    """Pedidos en vuelo de una página, para saber cuándo la red quedó inactiva"""
+
+    def __init__(self, pagina, inactividad: float = INACTIVIDAD_RED_SEGUNDOS):
+        self.inactividad = inactividad
+        self.en_vuelo = 0
+        self.ultima = time.monotonic()
+        pagina.on('request', self._empieza)
+        pagina.on('requestfinished', self._termina)
+        pagina.on('requestfailed', self._termina)
+        pagina.on('response', self._respuesta)
+
+    def reiniciar(self) -> None:
+        """Antes de cada navegación (la página se reutiliza entre URLs)"""
+        self.en_vuelo = 0
+        self.ultima = time.monotonic()
+
+    def _empieza(self, _pedido) -> None:
+        self.en_vuelo += 1
+        self.ultima = time.monotonic()
+
+    def _termina(self, _pedido) -> None:
+        self.en_vuelo = max(0, self.en_vuelo - 1)
+        self.ultima = time.monotonic()
+
+    @staticmethod
+    def _respuesta(respuesta) -> None:
+        largo = respuesta.headers.get('content-length')
+        if largo and largo.isdigit():
+            METRICAS.contar('playwright_bytes_total', int(largo))
+
+    def inactiva(self) -> bool:
+        return self.en_vuelo == 0 and time.monotonic() - self.ultima >= self.inactividad
+
+
+def esperar_whatsapp(pagina, red: ActividadRed, plazo: float = PLAZO_ESPERA_SEGUNDOS) -> str:
+    """
+    Espera, tras `domcontentloaded`, a que aparezca un enlace de WhatsApp
+    o a que la red quede inactiva, lo que pase primero, con `plazo` de tope.
+    Devuelve el motivo: 'enlace', 'red_inactiva' o 'plazo'.
+    """
+    fin = time.monotonic() + plazo
+    motivo = 'plazo'
+    while True:
+        restante = fin - time.monotonic()
+        if restante <= 0:
+            break
+        tramo_ms = int(min(TRAMO_ESPERA_SEGUNDOS, restante) * 1000)
+        try:
+            if pagina.evaluate(_JS_ESPERAR_ENLACE, [SELECTOR_ENLACES_WHATSAPP, max(1, tramo_ms)]):
+                motivo = 'enlace'
+                break
+        except Exception:
+            # La página navegó (redirección por JS): se espera al nuevo documento
+            try:
+                pagina.wait_for_load_state('domcontentloaded', timeout=max(1, int(restante * 1000)))
+            except Exception:
+                break
+            continue
+        if red.inactiva():
+            motivo = 'red_inactiva'
+            break
+    METRICAS.contar('playwright_esperas_total', motivo=motivo)
+    return motivo
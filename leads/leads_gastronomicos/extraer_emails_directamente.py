@@ -11,18 +11,28 @@ Uso:
 """
 
 import sys
-import json
-import time
-import re
+import argparse
+import heapq
 import logging
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Set, Optional
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+
+from rastreo_contactos import enriquecer_sitios
+from parseo_paralelo import PROCESOS_PARSEO, PROFUNDIDAD_COLA
+from ingesta_dataforseo import iterar_items
+from corridas import DiarioCorrida, CorridaNoEncontrada, ETAPA_EMAILS, ETAPA_REGISTRO
+from cache_http import CacheHTTP
+from dominios_caidos import RegistroDominiosCaidos, DNS
+from resolucion_dns import CacheDNS, host_de, prerresolver_urls
+from metricas import METRICAS
+from extraccion_rapida import extraer_emails_con_respaldo
+from clasificacion_negocios import clasificar_negocio, clasificar_negocios
+from resolucion_entidades import normalizar_titulo, resolver_entidades
+from validacion_emails import EMAIL_REGEX, VALIDADOR_ESTRICTO
+from enriquecimiento import descargar_documento, enriquecer
 
 # ==============================================================================
 # CONFIGURACIÓN
@@ -45,6 +55,24 @@ CSV_FINAL = OUTPUT_DIR / f"emails_extraidos_{TIMESTAMP}.csv"
 # Límite total de negocios a procesar
 LIMITE_TOTAL = 3000
 
+# Descargas simultáneas (en total y por dominio)
+CONCURRENCIA_GLOBAL = 50
+CONCURRENCIA_POR_HOST = 2
+
+# Cache HTTP en disco (compartida con pipeline_completo.py)
+USAR_CACHE = True
+TTL_CACHE_HORAS = 24 * 7
+
+# Saltear dominios que fallaron DNS, conexión o timeout (registro compartido con pipeline_completo.py)
+SALTEAR_CAIDOS = True
+
+# Parseo de HTML en procesos aparte de la red (workers y páginas en cola)
+PROCESOS = PROCESOS_PARSEO
+COLA_PARSEO = PROFUNDIDAD_COLA
+
+# Páginas por sitio al buscar emails (home + páginas de contacto; 1 = solo la home)
+PAGINAS_POR_DOMINIO = 4
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -56,193 +84,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# ==============================================================================
-# CONFIGURACIÓN DE EXTRACCIÓN DE EMAILS
-# ==============================================================================
-
-EMAIL_REGEX = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-
-# Emails genéricos a ignorar - VALIDACIÓN ESTRICTA (permite Gmail, Yahoo, etc para PyMEs)
-EMAILS_IGNORAR = {
-    'example@example.com', 'test@test.com', 'admin@admin.com',
-    'info@example.com', 'contact@example.com', 'noreply@',
-    'no-reply@', 'webmaster@', 'postmaster@', '@sentry.io',
-    '@placeholder', '@example', 'xxx@', 'email@',
-    'reservas@reservas', 'info@info', 'contact@contact',
-    'admin@', 'root@', 'user@', '@localhost', '@127.0.0.1'
-}
-
-# Extensiones de archivo a excluir
-EXTENSIONES_ARCHIVO = {
-    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico',
-    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.zip', '.rar',
-    '.mp4', '.mp3', '.avi', '.mov', '.css', '.js', '.json',
-    '.xml', '.txt', '.csv', '.html', '.htm', '.woff', '.ttf'
-}
-
-# Dominios sospechosos a excluir
-DOMINIOS_SOSPECHOSOS = {
-    '2x.png', '3x.png', '1x.png', 'x.png', 'x.jpg', 'x.svg',
-    'localhost', '127.0.0.1', 'test.com', 'example.com'
-}
-
-# Cadenas grandes a excluir
-CADENAS_GRANDES = [
-    'starbucks', 'mcdonalds', 
-    'cafe martinez', 'café martinez', 'cafemartinez',
-    'havanna', 'burger king',
-    'bonafide', 'freddo', 'grido', 'subway', 'kentucky', 'kfc', 'pani',
-    'la panera rosa', 'mostaza', 'wendys', 'pizza hut', 'dominos',
-    'dunkin', 'costa coffee', 'le pain quotidien', 'papa johns'
-]
-
-# Plataformas a excluir
-PLATAFORMAS_EXCLUIR = [
-    'instagram.com', 'facebook.com', 'twitter.com', 'tiktok.com',
-    'pedidosya.com', 'rappi.com', 'ubereats.com', 'linktr.ee'
-]
-
-HEADERS_HTTP = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-}
-
 # ==============================================================================
 # FUNCIONES DE VALIDACIÓN
 # ==============================================================================
 
 def es_email_valido(email: str) -> bool:
     """Valida que el email sea legítimo y no un falso positivo - PERMITE Gmail/Yahoo/etc para PyMEs"""
-    if not email:
-        return False
-    
-    email_lower = email.lower()
-    
-    # Verificar longitud
-    if len(email) < 6 or len(email) > 100:
-        return False
-    
-    # Verificar formato básico con regex
-    if not EMAIL_REGEX.match(email):
-        return False
-    
-    # Excluir emails genéricos
-    for ignorar in EMAILS_IGNORAR:
-        if ignorar in email_lower:
-            return False
-    
-    # Excluir si termina con extensión de archivo
-    for ext in EXTENSIONES_ARCHIVO:
-        if email_lower.endswith(ext):
-            return False
-    
-    # Excluir si el dominio es sospechoso
-    if '@' in email:
-        dominio = email.split('@')[1].lower()
-        for sospechoso in DOMINIOS_SOSPECHOSOS:
-            if sospechoso in dominio:
-                return False
-    
-    # VALIDACIONES ADICIONALES MUY ESTRICTAS
-    if '@' in email:
-        parte_local, parte_dominio = email.split('@')
-        
-        # 1. Verificar que tenga al menos un punto después del @
-        if '.' not in parte_dominio:
-            return False
-        
-        # 2. Verificar que la parte después del último punto tenga al menos 2 caracteres
-        tld = parte_dominio.split('.')[-1]
-        if len(tld) < 2:
-            return False
-        
-        # 3. [REMOVIDO] Permitir dominios personales (PyMEs los usan mucho)
-        # Las PyMEs usan gmail, yahoo, hotmail para sus negocios
-        
-        # 4. Verificar que el dominio no sea solo números
-        dominio_sin_tld = '.'.join(parte_dominio.split('.')[:-1])
-        if dominio_sin_tld.replace('.', '').isdigit():
-            return False
-        
-        # 5. Verificar que la parte local tenga contenido válido
-        if len(parte_local) < 2:
-            return False
-        
-        # 6. Excluir si la parte local es solo números
-        if parte_local.isdigit():
-            return False
-        
-        # 7. Excluir patrones sospechosos en parte local
-        patrones_sospechosos = [
-            r'^\d{4,}',  # Empieza con 4+ números
-            r'^[0-9.]{5,}$',  # Solo números y puntos
-            r'image\d+', r'img\d+', r'photo\d+', r'pic\d+',  # Nombres de imágenes
-            r'^[a-z]$', r'^[a-z]{1,2}\d+$',  # Una o dos letras seguidas de números
-        ]
-        
-        for patron in patrones_sospechosos:
-            if re.match(patron, parte_local):
-                return False
-        
-        # 8. Verificar que el dominio tenga al menos 4 caracteres antes del TLD
-        if len(dominio_sin_tld) < 4:
-            return False
-    
-    # Excluir emails que parecen ser rutas de archivos
-    if '/' in email or '\\' in email:
-        return False
-    
-    # Excluir emails con caracteres sospechosos múltiples
-    if email.count('@') != 1:
-        return False
-    
-    # Excluir emails con muchos números consecutivos
-    if re.search(r'\d{5,}', email):
-        return False
-    
-    # Solo aceptar si parece un email corporativo real
-    return True
-
-
-def es_cadena_grande(titulo: str, dominio: str) -> bool:
-    """Verifica si es una cadena grande"""
-    import unicodedata
-    
-    texto = f"{titulo} {dominio}".lower()
-    texto_normalizado = ''.join(
-        c for c in unicodedata.normalize('NFD', texto)
-        if unicodedata.category(c) != 'Mn'
-    )
-    
-    texto_normalizado = ' '.join(texto_normalizado.split())
-    
-    for cadena in CADENAS_GRANDES:
-        cadena_normalizada = ''.join(
-            c for c in unicodedata.normalize('NFD', cadena)
-            if unicodedata.category(c) != 'Mn'
-        )
-        
-        if cadena_normalizada in texto_normalizado:
-            return True
-        
-        cadena_sin_espacios = cadena_normalizada.replace(' ', '')
-        if cadena_sin_espacios in texto_normalizado.replace(' ', ''):
-            return True
-    
-    return False
-
+    return VALIDADOR_ESTRICTO(email)
 
-def es_plataforma_excluir(url: str, dominio: str) -> bool:
-    """Verifica si es una plataforma a excluir"""
-    texto = f"{url} {dominio}".lower()
-    return any(plat in texto for plat in PLATAFORMAS_EXCLUIR)
 
 # ==============================================================================
 # EXTRACCIÓN DE EMAILS
 # ==============================================================================
 
 def extraer_emails_de_html(html: str) -> Set[str]:
-    """Extrae emails de HTML"""
+    """Extrae emails de HTML (camino rápido sin parser, BeautifulSoup si es ambiguo)"""
+    return extraer_emails_con_respaldo(html, es_email_valido, extraer_emails_de_html_bs4)
+
+
+def extraer_emails_de_html_bs4(html: str) -> Set[str]:
+    """Extrae emails de HTML con BeautifulSoup"""
     emails = set()
     
     try:
@@ -271,75 +132,70 @@ def extraer_emails_de_html(html: str) -> Set[str]:
 
 
 def extraer_emails_de_url(url: str, timeout: int = 10) -> Set[str]:
-    """Extrae emails de una URL"""
-    emails = set()
-    
-    try:
-        response = requests.get(url, headers=HEADERS_HTTP, timeout=timeout, allow_redirects=True)
-        response.raise_for_status()
-        
-        if 'text/html' in response.headers.get('Content-Type', '').lower():
-            emails = extraer_emails_de_html(response.text)
-    
-    except Exception as e:
-        logger.debug(f"Error obteniendo {url}: {str(e)[:50]}")
-    
-    return emails
+    """Extrae emails de una URL (misma descarga y extractor que el rastreo)"""
+    documento = descargar_documento(url, timeout)
+    if documento is None or not documento.es_html:
+        return set()
+    return set(enriquecer(documento, ['emails_directo']).get('emails_directo') or ())
 
 # ==============================================================================
 # CARGA DE DATOS
 # ==============================================================================
 
-def cargar_todos_los_negocios() -> List[Dict[str, Any]]:
-    """Carga todos los negocios de los archivos JSON"""
+def _clave_orden(negocio: Dict[str, Any]):
+    """Rating y cantidad de reviews (mejores primero)"""
+    rating = negocio.get('rating') or {}
+    return (rating.get('value') or 0, rating.get('votes_count') or 0)
+
+
+def cargar_todos_los_negocios(limite: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Carga los negocios de los dumps de DataForSEO, ordenados por rating y
+    reviews. Los items se leen en streaming; con `limite` solo se guardan
+    en memoria los `limite` mejores.
+    """
     logger.info("📂 Cargando negocios de archivos JSON...")
     
-    todos_los_negocios = []
-    
-    for archivo in ARCHIVOS_JSON:
-        ruta_archivo = OUTPUT_DIR / archivo
-        if not ruta_archivo.exists():
-            logger.warning(f"   ⚠️  Archivo no encontrado: {archivo}")
-            continue
-        
-        logger.info(f"   📄 Cargando: {archivo}")
-        try:
-            with open(ruta_archivo, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+    def items_con_log():
+        for archivo in ARCHIVOS_JSON:
+            ruta_archivo = OUTPUT_DIR / archivo
+            if not ruta_archivo.exists():
+                logger.warning(f"   ⚠️  Archivo no encontrado: {archivo}")
+                continue
             
-            # Extraer items de los resultados de DataForSEO
-            items = []
-            if 'tasks' in data:
-                for task in data['tasks']:
-                    if 'result' in task and task['result']:
-                        items.extend(task['result'][0].get('items', []))
-            
-            logger.info(f"      ✅ {len(items)} negocios cargados")
-            todos_los_negocios.extend(items)
-            
-        except Exception as e:
-            logger.error(f"      ❌ Error cargando {archivo}: {str(e)}")
+            logger.info(f"   📄 Cargando: {archivo}")
+            cantidad = 0
+            try:
+                for item in iterar_items(ruta_archivo):
+                    cantidad += 1
+                    yield item
+            except Exception as e:
+                logger.error(f"      ❌ Error cargando {archivo}: {str(e)}")
+            logger.info(f"      ✅ {cantidad} negocios cargados")
+    
+    if limite is None:
+        todos_los_negocios = sorted(items_con_log(), key=_clave_orden, reverse=True)
+    else:
+        todos_los_negocios = heapq.nlargest(limite, items_con_log(), key=_clave_orden)
     
     logger.info(f"📊 Total negocios cargados: {len(todos_los_negocios)}")
     
-    # Ordenar por rating y cantidad de reviews (mejores primero)
-    todos_los_negocios.sort(
-        key=lambda x: (
-            x.get('rating', {}).get('value', 0),
-            x.get('rating', {}).get('votes_count', 0)
-        ),
-        reverse=True
-    )
-    
     return todos_los_negocios
 
 
-def procesar_negocio_para_email(negocio: Dict[str, Any]) -> Dict[str, Any]:
+def procesar_negocio_para_email(
+    negocio: Dict[str, Any],
+    emails_precalculados: Optional[Set[str]] = None,
+    clasificacion: Optional[Dict[str, bool]] = None
+) -> Dict[str, Any]:
     """Procesa un negocio específicamente para extracción de emails"""
     titulo = negocio.get('title', '')
     url = negocio.get('url', '')
     dominio = negocio.get('domain', '')
     
+    if clasificacion is None:
+        clasificacion = clasificar_negocio(titulo, url, dominio)
+    
     # Crear registro base
     registro = {
         'titulo': titulo,
@@ -353,8 +209,8 @@ def procesar_negocio_para_email(negocio: Dict[str, Any]) -> Dict[str, Any]:
         'dominio': dominio,
         'place_id': negocio.get('place_id', ''),
         'emails': '',
-        'tiene_web_propia': bool(url and not es_plataforma_excluir(url, dominio)),
-        'es_cadena': es_cadena_grande(titulo, dominio),
+        'tiene_web_propia': bool(url and not clasificacion['es_plataforma']),
+        'es_cadena': clasificacion['es_cadena'],
         'fecha_extraccion': datetime.now().isoformat(),
     }
     
@@ -367,7 +223,10 @@ def procesar_negocio_para_email(negocio: Dict[str, Any]) -> Dict[str, Any]:
     if url and registro['tiene_web_propia']:
         logger.info(f"📧 Extrayendo emails: {titulo}")
         try:
-            emails = extraer_emails_de_url(url, timeout=15)
+            if emails_precalculados is not None:
+                emails = emails_precalculados
+            else:
+                emails = extraer_emails_de_url(url, timeout=15)
             if emails:
                 registro['emails'] = ', '.join(sorted(emails))
                 logger.info(f"   ✅ {len(emails)} email(s): {registro['emails']}")
@@ -399,25 +258,6 @@ def eliminar_duplicados_y_guardar(registros: List[Dict[str, Any]]) -> None:
     
     logger.info(f"📊 Total registros antes de limpiar: {len(df)}")
     
-    import unicodedata
-    
-    def normalizar_titulo(titulo):
-        """Normalizar título de forma agresiva para detectar duplicados"""
-        if pd.isna(titulo):
-            return ""
-        # Remover acentos
-        titulo_norm = ''.join(
-            c for c in unicodedata.normalize('NFD', str(titulo).lower())
-            if unicodedata.category(c) != 'Mn'
-        )
-        # Remover caracteres especiales, números, y palabras comunes
-        titulo_norm = re.sub(r'[^\w\s]', '', titulo_norm)
-        titulo_norm = re.sub(r'\d+', '', titulo_norm)  # Remover números
-        titulo_norm = re.sub(r'\b(sucursal|local|branch|store|tienda|restaurant|bar|cafe|coffee|parrilla|grill)\b', '', titulo_norm)
-        titulo_norm = re.sub(r'\b(palermo|belgrano|recoleta|san telmo|puerto madero|villa crespo|barracas)\b', '', titulo_norm)  # Remover barrios
-        titulo_norm = ' '.join(titulo_norm.split())
-        return titulo_norm.strip()
-    
     def normalizar_email(email):
         """Normalizar email para detectar duplicados"""
         if pd.isna(email) or not email:
@@ -427,7 +267,7 @@ def eliminar_duplicados_y_guardar(registros: List[Dict[str, Any]]) -> None:
         return primer_email
     
     # Crear columnas normalizadas
-    df['titulo_normalizado'] = df['titulo'].apply(normalizar_titulo)
+    df['titulo_normalizado'] = df['titulo'].apply(normalizar_titulo, agresivo=True)
     df['email_principal'] = df['emails'].apply(normalizar_email)
     
     # 1. Eliminar duplicados por place_id
@@ -474,24 +314,20 @@ def eliminar_duplicados_y_guardar(registros: List[Dict[str, Any]]) -> None:
     
     df = pd.concat([df_con_titulo, df_sin_titulo], ignore_index=True)
     
-    # 4. Eliminar duplicados por título normalizado + teléfono (para casos edge)
-    antes = len(df)
-    df['_dup_id'] = (
-        df['titulo_normalizado'].fillna('') + '|' + 
-        df['telefono'].fillna('') + '|' +
-        df['dominio'].fillna('')
-    )
-    
-    # Ordenar por rating antes de eliminar duplicados finales
-    df = df.sort_values(
-        by=['rating', 'cantidad_reviews'],
-        ascending=[False, False]
-    )
-    
-    df = df.drop_duplicates(subset=['_dup_id'], keep='first')
-    dup_final = antes - len(df)
-    if dup_final > 0:
-        logger.info(f"   🗑️  Eliminados {dup_final} duplicados finales por combinación múltiple")
+    # 4. Resolución de entidades: mismo negocio con otro nombre o place_id
+    # (teléfono, dominio, cercanía o título+dirección parecidos)
+    with METRICAS.etapa('resolucion_entidades'):
+        resolucion = resolver_entidades(
+            df.drop(columns=['titulo_normalizado', 'email_principal']), agresivo=True
+        )
+    df = resolucion.canonicos
+    if resolucion.fusionados > 0:
+        ruta_auditoria = OUTPUT_DIR / f"auditoria_duplicados_{TIMESTAMP}.csv"
+        resolucion.auditoria.to_csv(ruta_auditoria, index=False, encoding='utf-8')
+        logger.info(
+            f"   🗑️  Fusionados {resolucion.fusionados} duplicados en {len(resolucion.auditoria)} negocios "
+            f"(auditoría: {ruta_auditoria.name})"
+        )
     
     # 5. FILTRO FINAL: Solo mantener registros con email válido
     antes = len(df)
@@ -501,7 +337,7 @@ def eliminar_duplicados_y_guardar(registros: List[Dict[str, Any]]) -> None:
         logger.info(f"   🗑️  Eliminados {sin_email} registros sin email (solo queremos con email)")
     
     # Limpiar columnas temporales
-    df = df.drop(columns=['titulo_normalizado', 'email_principal', '_dup_id'], errors='ignore')
+    df = df.drop(columns=['titulo_normalizado', 'email_principal'], errors='ignore')
     
     # Ordenar resultado final por rating
     df = df.sort_values(
@@ -594,6 +430,11 @@ def eliminar_duplicados_y_guardar(registros: List[Dict[str, Any]]) -> None:
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description='Extracción directa de emails de los JSON de DataForSEO')
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help='Reanudar una corrida interrumpida (id en resultados/corridas/)')
+    args = parser.parse_args()
+    
     logger.info("\n" + "="*80)
     logger.info("🚀 EXTRACCIÓN DIRECTA DE EMAILS - 3000 RESTAURANTES")
     logger.info("="*80)
@@ -601,51 +442,134 @@ def main():
     logger.info(f"   Archivo de salida: {CSV_FINAL}")
     logger.info("="*80 + "\n")
     
-    # 1. Cargar todos los negocios de los JSON
-    negocios = cargar_todos_los_negocios()
+    METRICAS.reiniciar()
+    try:
+        corrida = (
+            DiarioCorrida.reanudar(args.resume) if args.resume
+            else DiarioCorrida.nueva('extraer_emails_directamente', {'limite_total': LIMITE_TOTAL})
+        )
+    except CorridaNoEncontrada as e:
+        logger.error(f"❌ {e}")
+        return
+    
+    # 1. Cargar todos los negocios de los JSON (o retomar la cola de la corrida)
+    negocios = corrida.cargar_cola()
+    if negocios is None:
+        # 2. Quedarse con los LIMITE_TOTAL mejores mientras se leen
+        with METRICAS.etapa('carga_negocios'):
+            negocios = cargar_todos_los_negocios(limite=LIMITE_TOTAL)
+        if len(negocios) == LIMITE_TOTAL:
+            logger.info(f"🔢 Limitando a {LIMITE_TOTAL} mejores negocios (por rating)")
+        corrida.guardar_cola(negocios)
     
     if not negocios:
         logger.error("❌ No se encontraron negocios en los archivos JSON")
+        corrida.cerrar()
         return
     
-    # 2. Limitar a LIMITE_TOTAL
-    if len(negocios) > LIMITE_TOTAL:
-        negocios = negocios[:LIMITE_TOTAL]
-        logger.info(f"🔢 Limitando a {LIMITE_TOTAL} mejores negocios (por rating)")
+    pendientes = corrida.pendientes(negocios, ETAPA_REGISTRO)
+    if len(pendientes) < len(negocios):
+        logger.info(f"⏭️  {len(negocios) - len(pendientes)} negocios ya procesados en la corrida, quedan {len(pendientes)}")
     
-    # 3. Procesar cada negocio para extraer emails
-    logger.info(f"\n🔄 Procesando {len(negocios)} negocios para extraer emails...\n")
+    # 3. Clasificar los pendientes en una pasada y descargar en paralelo las webs propias
+    clasificaciones = clasificar_negocios(pendientes)
+    emails_por_url: Dict[str, Set[str]] = {}
+    por_url: Dict[str, List[Dict[str, Any]]] = {}
+    for n, c in zip(pendientes, clasificaciones):
+        if not n.get('url') or c['es_plataforma'] or c['es_cadena']:
+            continue
+        if corrida.completado(n, ETAPA_EMAILS):
+            emails_por_url[n['url']] = set(corrida.datos(n, ETAPA_EMAILS) or [])
+        else:
+            por_url.setdefault(n['url'], []).append(n)
     
-    registros = []
-    procesados_con_web = 0
-    emails_encontrados = 0
+    def registrar_emails(url: str, emails: Set[str]) -> None:
+        for n in por_url[url]:
+            corrida.marcar(n, ETAPA_EMAILS, sorted(emails))
     
-    for i, negocio in enumerate(negocios, 1):
-        titulo = negocio.get('title', 'Sin título')
-        logger.info(f"\n[{i}/{len(negocios)}] Procesando: {titulo}")
-        
-        registro = procesar_negocio_para_email(negocio)
-        registros.append(registro)
-        
-        # Contar estadísticas
-        if registro['tiene_web_propia']:
-            procesados_con_web += 1
-        if registro['emails']:
-            emails_encontrados += 1
-        
-        # Mostrar progreso cada 50
-        if i % 50 == 0:
-            logger.info(f"\n📊 Progreso [{i}/{len(negocios)}]:")
-            logger.info(f"   Con web propia: {procesados_con_web}")
-            logger.info(f"   Con emails: {emails_encontrados}")
-            logger.info(f"   % éxito: {emails_encontrados/procesados_con_web*100 if procesados_con_web > 0 else 0:.1f}%")
+    def registrar_web(url: str, datos: Dict[str, Any]) -> None:
+        registrar_emails(url, set(datos.get('emails_directo') or ()))
+    
+    cache = CacheHTTP(ttl_horas=TTL_CACHE_HORAS) if USAR_CACHE else None
+    caidos = RegistroDominiosCaidos() if SALTEAR_CAIDOS else None
+    dns = CacheDNS()
+    try:
+        # Resolver el DNS de todas las webs de una vez y no rastrear las que no existen
+        inexistentes = prerresolver_urls(por_url, dns) if por_url else set()
+        for url in [u for u in por_url if host_de(u) in inexistentes]:
+            emails_por_url[url] = set()
+            registrar_emails(url, set())
+            if caidos is not None:
+                caidos.registrar_falla(url, DNS)
+            del por_url[url]
         
-        # Delay entre requests (más conservador)
-        if i < len(negocios):
-            time.sleep(1.5)
+        logger.info(f"\n🌐 Rastreando {len(por_url)} webs en paralelo "
+                    f"({CONCURRENCIA_GLOBAL} simultáneas, {CONCURRENCIA_POR_HOST} por host)...")
+        with METRICAS.etapa('rastreo_emails'):
+            # El extractor registrado corre en los workers de parseo: una función
+            # de este script no se puede mandar a un proceso forkserver/spawn
+            datos_web = enriquecer_sitios(
+                list(por_url), ['emails_directo'], criterio='emails_directo',
+                concurrencia=CONCURRENCIA_GLOBAL, por_host=CONCURRENCIA_POR_HOST, timeout=15,
+                cache=cache,
+                paginas_por_dominio=PAGINAS_POR_DOMINIO,
+                al_completar=registrar_web,
+                procesos_parseo=PROCESOS,
+                profundidad_cola=COLA_PARSEO,
+                caidos=caidos,
+                resolver=dns
+            )
+        emails_por_url.update(
+            (url, set(datos.get('emails_directo') or ())) for url, datos in datos_web.items()
+        )
+    finally:
+        if cache is not None:
+            cache.cerrar()
+        if caidos is not None:
+            caidos.cerrar()
+        dns.cerrar()
     
-    # 4. Eliminar duplicados y guardar
-    eliminar_duplicados_y_guardar(registros)
+    # 4. Procesar cada negocio para extraer emails (cada registro queda en el diario de la corrida)
+    logger.info(f"\n🔄 Procesando {len(pendientes)} negocios para extraer emails...\n")
+    
+    procesados_con_web = 0
+    emails_encontrados = 0
+    
+    try:
+        for i, (negocio, clasificacion) in enumerate(zip(pendientes, clasificaciones), 1):
+            titulo = negocio.get('title', 'Sin título')
+            logger.info(f"\n[{i}/{len(pendientes)}] Procesando: {titulo}")
+            
+            registro = procesar_negocio_para_email(
+                negocio,
+                emails_precalculados=emails_por_url.get(negocio.get('url', '')),
+                clasificacion=clasificacion
+            )
+            corrida.marcar(negocio, ETAPA_REGISTRO, registro)
+            
+            # Contar estadísticas
+            if registro['tiene_web_propia']:
+                procesados_con_web += 1
+            if registro['emails']:
+                emails_encontrados += 1
+            METRICAS.contar('negocios_total', resultado='procesado')
+            METRICAS.contar('negocios_total', bool(registro['emails']), resultado='con_email')
+            
+            # Mostrar progreso cada 50
+            if i % 50 == 0:
+                logger.info(f"\n📊 Progreso [{i}/{len(pendientes)}]:")
+                logger.info(f"   Con web propia: {procesados_con_web}")
+                logger.info(f"   Con emails: {emails_encontrados}")
+                logger.info(f"   % éxito: {emails_encontrados/procesados_con_web*100 if procesados_con_web > 0 else 0:.1f}%")
+    finally:
+        corrida.cerrar()
+    
+    # 5. Eliminar duplicados y guardar (todos los registros de la corrida, también los de antes de reanudar)
+    registros = [corrida.datos(n, ETAPA_REGISTRO) for n in negocios]
+    with METRICAS.etapa('consolidacion'):
+        eliminar_duplicados_y_guardar([r for r in registros if r is not None])
+    corrida.marcar_completada()
+    METRICAS.exportar('extraer_emails_directamente', corrida.run_id)
     
     logger.info("\n" + "="*80)
     logger.info("✅ EXTRACCIÓN COMPLETADA")
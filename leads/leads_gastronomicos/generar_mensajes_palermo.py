@@ -5,11 +5,13 @@ Procesa restaurantes, cafeterías y bares más relevantes de Palermo
 Genera mensajes listos para enviar
 """
 
-import json
 import pandas as pd
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from barrios_caba import IndiceBarrios, clave_barrio, filas_por_barrio
+from ingesta_dataforseo import FiltroItems, iterar_items
+
 # ============================================================================
 # CONFIGURACIÓN
 # ============================================================================
@@ -20,6 +22,11 @@ PALERMO_KEYWORDS = [
     'C1414', 'C1425', 'C1426', 'C1427', 'C1428'  # Códigos postales Palermo
 ]
 
+# Barrio a seleccionar. Con `datos/barrios_caba.geojson` se decide por
+# polígono (latitude/longitude); sin el archivo o sin coordenadas, por la
+# dirección (PALERMO_KEYWORDS)
+BARRIO_OBJETIVO = 'Palermo'
+
 MIN_REVIEWS = 100  # Mínimo de reviews para ser relevante
 MIN_RATING = 4.0   # Rating mínimo
 MAX_RATING = 4.85  # Rating máximo (los muy altos no tienen pain)
@@ -80,7 +87,7 @@ def clean_phone_number(phone: str) -> Optional[str]:
 
 
 def es_palermo(negocio: Dict) -> bool:
-    """Verifica si el negocio está en Palermo"""
+    """Verifica si el negocio está en Palermo (por la dirección; ver `seleccionar_barrio`)"""
     
     # Verificar en dirección
     direccion = negocio.get('address', '')
@@ -101,6 +108,52 @@ def es_palermo(negocio: Dict) -> bool:
     return False
 
 
+_indice_barrios = None
+
+
+def indice_barrios() -> Optional[IndiceBarrios]:
+    """Índice de polígonos de barrios (se carga una vez; None si no está el GeoJSON)"""
+    global _indice_barrios
+    if _indice_barrios is None:
+        _indice_barrios = IndiceBarrios.cargar() or False
+    return _indice_barrios or None
+
+
+def asignar_barrios(items: List[Dict]) -> List[str]:
+    """Barrio de cada item por sus coordenadas, en una sola pasada ('' si no se pudo)"""
+    indice = indice_barrios()
+    if indice is None or not items:
+        return [''] * len(items)
+    return list(indice.asignar(
+        [item.get('latitude') if item.get('latitude') is not None else float('nan') for item in items],
+        [item.get('longitude') if item.get('longitude') is not None else float('nan') for item in items]
+    ))
+
+
+def seleccionar_barrio(items: List[Dict], barrio_objetivo: str = BARRIO_OBJETIVO) -> List[Dict]:
+    """
+    Items del barrio pedido. Los que tienen barrio por polígono salen del
+    índice barrio -> filas; los que no, se deciden por la dirección.
+    """
+    barrios = asignar_barrios(items)
+    clave = clave_barrio(barrio_objetivo)
+    seleccion = set(filas_por_barrio(barrios).get(clave, []))
+    
+    for i, (item, barrio) in enumerate(zip(items, barrios)):
+        item['barrio'] = barrio
+        if barrio:
+            continue
+        if clave == 'palermo':
+            en_barrio = es_palermo(item)
+        else:
+            borough = (item.get('address_info') or {}).get('borough', '')
+            en_barrio = clave in clave_barrio(f"{item.get('address', '')} {borough}")
+        if en_barrio:
+            seleccion.add(i)
+    
+    return [items[i] for i in sorted(seleccion)]
+
+
 def tiene_place_topics_validos(topics: Dict) -> bool:
     """Verifica que tenga place_topics válidos"""
     if not topics or len(topics) == 0:
@@ -250,33 +303,22 @@ def procesar_json(json_path: str) -> List[Dict]:
     
     print(f"\n📂 Procesando {json_path}...")
     
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Rating y reviews se filtran mientras se lee el dump (en streaming)
+    filtro = FiltroItems(min_rating=MIN_RATING, max_rating=MAX_RATING, min_votos=MIN_REVIEWS)
     
-    items = data['tasks'][0]['result'][0]['items']
+    # Verificar place_topics
+    candidatos = [
+        item for item in iterar_items(json_path, filtro)
+        if tiene_place_topics_validos(item.get('place_topics'))
+    ]
     
+    # Verificar si es Palermo (todos los candidatos de una vez)
     negocios_palermo = []
     
-    for item in items:
-        # Extraer rating
-        rating_obj = item.get('rating')
-        if not rating_obj:
-            continue
-        
-        rating = rating_obj.get('value')
-        votes_count = rating_obj.get('votes_count', 0)
-        
-        if not rating or rating < MIN_RATING or rating > MAX_RATING or votes_count < MIN_REVIEWS:
-            continue
-        
-        # Verificar si es Palermo
-        if not es_palermo(item):
-            continue
-        
-        # Verificar place_topics
+    for item in seleccionar_barrio(candidatos):
+        rating = item['rating']['value']
+        votes_count = item['rating'].get('votes_count') or 0
         place_topics = item.get('place_topics')
-        if not tiene_place_topics_validos(place_topics):
-            continue
         
         negocio = {
             'title': item.get('title'),
@@ -287,6 +329,7 @@ def procesar_json(json_path: str) -> List[Dict]:
             'url': item.get('url'),
             'place_id': item.get('place_id'),
             'place_topics': place_topics,
+            'barrio': item['barrio'] or BARRIO_OBJETIVO,
             'tipo': json_path.split('/')[-1].split('_')[0]  # restaurantes/cafeterias/bares
         }
         
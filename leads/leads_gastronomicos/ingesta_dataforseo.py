@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LECTURA EN STREAMING DE DUMPS DE DATAFORSEO
+===========================================
+`cargar_todos_los_negocios` y `generar_mensajes_palermo.procesar_json`
+hacían `json.load` del dump completo (`*_raw_caba_*.json`) y después
+recorrían `tasks[].result[].items`: la memoria crecía con el tamaño del
+dump.
+
+`iterar_items(ruta)` devuelve los items de a uno sin armar el documento:
+
+- `.json`: respuesta cruda de DataForSEO. Con `ijson` instalado se usa
+  ese parser incremental; si no, se lee por bloques y cada item se
+  decodifica con `json.JSONDecoder.raw_decode`.
+- `.ndjson` / `.jsonl`: una línea por item (o una respuesta cruda por línea).
+
+Los filtros baratos (rating, votos, código postal) se aplican durante el
+stream, así los items descartados nunca se acumulan:
+
+    filtro = FiltroItems(min_rating=4.0, min_votos=100, codigos_postales={'1414'})
+    for item in iterar_items('resultados/bares_raw_caba_20251015_171909.json', filtro):
+        ...
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, TextIO, Union
+
+try:
+    import ijson
+except ImportError:  # opcional: sin ijson se usa el lector por bloques
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+TAM_BLOQUE = 1 << 16
+PREFIJO_IJSON = 'tasks.item.result.item.items.item'
+EXTENSIONES_NDJSON = ('.ndjson', '.jsonl')
+
+_CLAVE_ITEMS = re.compile(r'"items"\s*:\s*\[')
+_CODIGO_POSTAL = re.compile(r'\d{4}')
+
+
+# ==============================================================================
+# FILTROS
+# ==============================================================================
+
+def codigo_postal(valor: Any) -> str:
+    """Los 4 dígitos de un código postal ('C1414ABC', 'C1414', '1414' -> '1414')"""
+    m = _CODIGO_POSTAL.search(str(valor or ''))
+    return m.group(0) if m else ''
+
+
+@dataclass
+class FiltroItems:
+    """Filtros que se evalúan sobre cada item mientras se lee el dump"""
+    min_rating: Optional[float] = None
+    max_rating: Optional[float] = None
+    min_votos: Optional[int] = None
+    codigos_postales: Optional[Set[str]] = None
+
+    def __post_init__(self):
+        if self.codigos_postales is not None:
+            self.codigos_postales = {codigo_postal(c) for c in self.codigos_postales}
+
+    def acepta(self, item: Dict[str, Any]) -> bool:
+        if self.min_rating is not None or self.max_rating is not None or self.min_votos is not None:
+            rating_obj = item.get('rating') or {}
+            rating = rating_obj.get('value')
+            if not rating:
+                return False
+            if self.min_rating is not None and rating < self.min_rating:
+                return False
+            if self.max_rating is not None and rating > self.max_rating:
+                return False
+            if self.min_votos is not None and (rating_obj.get('votes_count') or 0) < self.min_votos:
+                return False
+        if self.codigos_postales is not None:
+            zip_item = codigo_postal((item.get('address_info') or {}).get('zip'))
+            if zip_item not in self.codigos_postales:
+                return False
+        return True
+
+
+# ==============================================================================
+# LECTORES
+# ==============================================================================
+
+def _items_ijson(ruta: Path) -> Iterator[Dict[str, Any]]:
+    with open(ruta, 'rb') as f:
+        yield from ijson.items(f, PREFIJO_IJSON, use_float=True)
+
+
+def _items_por_bloques(archivo: TextIO, tam_bloque: int = TAM_BLOQUE) -> Iterator[Dict[str, Any]]:
+    """
+    Busca cada array `"items": [` y decodifica sus elementos de a uno con
+    `raw_decode`, leyendo el archivo por bloques. Solo queda en memoria el
+    bloque actual y el item que se está decodificando.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    fin = False
+    dentro = False
+
+    def rellenar() -> None:
+        nonlocal buffer, pos, fin
+        bloque = archivo.read(tam_bloque)
+        if not bloque:
+            fin = True
+        buffer = buffer[pos:] + bloque
+        pos = 0
+
+    while True:
+        if not dentro:
+            m = _CLAVE_ITEMS.search(buffer, pos)
+            if m:
+                pos = m.end()
+                dentro = True
+                continue
+            if fin:
+                return
+            pos = max(pos, len(buffer) - 32)   # por si la clave quedó cortada entre bloques
+            rellenar()
+            continue
+
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buffer):
+            if fin:
+                raise ValueError("Dump truncado dentro de un array de items")
+            rellenar()
+            continue
+        if buffer[pos] == ']':
+            pos += 1
+            dentro = False
+            continue
+        try:
+            item, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if fin:
+                raise
+            rellenar()
+            continue
+        yield item
+
+
+def _items_ndjson(archivo: TextIO) -> Iterator[Dict[str, Any]]:
+    for n, linea in enumerate(archivo, 1):
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            objeto = json.loads(linea)
+        except json.JSONDecodeError:
+            logger.warning(f"⚠️  Línea {n} corrupta, se ignora")
+            continue
+        if 'tasks' in objeto:
+            for task in objeto.get('tasks') or []:
+                for resultado in task.get('result') or []:
+                    yield from resultado.get('items') or []
+        else:
+            yield objeto
+
+
+def iterar_items(
+    ruta: Union[str, Path],
+    filtro: Optional[FiltroItems] = None,
+    usar_ijson: Optional[bool] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Itera los items de un dump de DataForSEO (JSON crudo o NDJSON) sin
+    cargarlo entero, aplicando `filtro` durante la lectura.
+
+    `usar_ijson=None` usa ijson si está instalado.
+    """
+    ruta = Path(ruta)
+    if ruta.suffix.lower() in EXTENSIONES_NDJSON:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            items = _items_ndjson(f)
+            yield from (i for i in items if filtro is None or filtro.acepta(i))
+        return
+
+    if usar_ijson is None:
+        usar_ijson = ijson is not None
+    if usar_ijson:
+        items = _items_ijson(ruta)
+        yield from (i for i in items if filtro is None or filtro.acepta(i))
+        return
+
+    with open(ruta, 'r', encoding='utf-8') as f:
+        items = _items_por_bloques(f)
+        yield from (i for i in items if filtro is None or filtro.acepta(i))
+
+
+def iterar_items_de_archivos(
+    rutas: Iterable[Union[str, Path]],
+    filtro: Optional[FiltroItems] = None
+) -> Iterator[Dict[str, Any]]:
+    """Items de varios dumps seguidos; los archivos que no existen se saltean"""
+    for ruta in rutas:
+        ruta = Path(ruta)
+        if not ruta.exists():
+            logger.warning(f"   ⚠️  Archivo no encontrado: {ruta.name}")
+            continue
+        yield from iterar_items(ruta, filtro)
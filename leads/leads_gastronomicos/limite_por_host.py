@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LÍMITE ADAPTATIVO POR HOST
+==========================
+`MotorDescargas` limitaba cada host con un semáforo fijo (`por_host`): lo
+mismo para un sitio sano que para uno que devuelve 429 o se cuelga.
+
+`LimitadorPorHost` mantiene por host:
+
+- un token bucket (`tasa` pedidos/segundo, ráfaga de `rafaga`): la cortesía
+  se aplica al host, no como pausa global entre negocios
+- un límite de concurrencia AIMD: +1 por cada `limite` respuestas sanas
+  (suma), ×0.5 ante 429, 5xx o timeout (multiplica); la tasa se ajusta
+  igual. Un `Retry-After` pausa el host hasta esa hora.
+
+Los retrocesos de un mismo host se agrupan en una `VENTANA_RETROCESO`, así
+una tanda de errores simultáneos solo divide una vez.
+
+    limitador = LimitadorPorHost()
+    host = limitador.host('example.com')
+    await host.adquirir()
+    try:
+        ...
+    finally:
+        host.liberar(clasificar_status(status), retry_after)
+
+    limitador.metricas()   # estado y contadores por host
+"""
+
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+CONCURRENCIA_INICIAL = 2
+CONCURRENCIA_MAXIMA = 6
+TASA_INICIAL = 4.0               # pedidos por segundo por host
+TASA_MINIMA = 0.2
+TASA_MAXIMA = 20.0
+RAFAGA = 4
+INCREMENTO_TASA = 1.0            # por respuesta sana
+FACTOR_RETROCESO = 0.5
+VENTANA_RETROCESO = 2.0          # segundos
+MAX_RETRY_AFTER = 60.0
+
+# Resultados de un pedido
+OK = 'ok'
+LIMITADO = 'limitado'            # 429
+ERROR_SERVIDOR = 'error_servidor'  # 5xx
+TIMEOUT = 'timeout'
+ERROR = 'error'                  # 4xx, DNS, conexión rechazada: no ajusta nada
+
+RETROCEDEN = (LIMITADO, ERROR_SERVIDOR, TIMEOUT)
+
+
+def clasificar_status(status: int) -> str:
+    if status == 429:
+        return LIMITADO
+    if status >= 500:
+        return ERROR_SERVIDOR
+    if status >= 400:
+        return ERROR
+    return OK
+
+
+def segundos_retry_after(valor: Optional[str]) -> Optional[float]:
+    """Header Retry-After en segundos (acepta segundos o fecha HTTP)"""
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# ==============================================================================
+# LIMITADOR DE UN HOST
+# ==============================================================================
+
+class LimitadorHost:
+    """Token bucket + concurrencia AIMD de un host"""
+
+    def __init__(
+        self,
+        host: str,
+        concurrencia_inicial: int = CONCURRENCIA_INICIAL,
+        concurrencia_maxima: int = CONCURRENCIA_MAXIMA,
+        tasa_inicial: float = TASA_INICIAL,
+        tasa_maxima: float = TASA_MAXIMA,
+        rafaga: int = RAFAGA
+    ):
+        self.host = host
+        self.concurrencia_maxima = max(1, concurrencia_maxima)
+        self.limite = float(min(max(1, concurrencia_inicial), self.concurrencia_maxima))
+        self.tasa_maxima = tasa_maxima
+        self.tasa = min(tasa_inicial, tasa_maxima)
+        self.rafaga = max(1, rafaga)
+        self.tokens = float(self.rafaga)
+        self.en_vuelo = 0
+        self.pausa_hasta = 0.0
+        self._ultima_recarga = time.monotonic()
+        self._ultimo_retroceso = float('-inf')
+        self._esperando: List[asyncio.Future] = []
+
+        # Contadores
+        self.pedidos = 0
+        self.resultados: Dict[str, int] = {r: 0 for r in (OK, LIMITADO, ERROR_SERVIDOR, TIMEOUT, ERROR)}
+        self.retrocesos = 0
+        self.esperas = 0
+        self.segundos_espera = 0.0
+
+    def _recargar(self, ahora: float) -> None:
+        self.tokens = min(self.rafaga, self.tokens + (ahora - self._ultima_recarga) * self.tasa)
+        self._ultima_recarga = ahora
+
+    def _hay_lugar(self) -> bool:
+        return self.en_vuelo < max(1, int(self.limite))
+
+    def _despertar(self) -> None:
+        for futuro in self._esperando:
+            if not futuro.done():
+                futuro.set_result(None)
+        self._esperando.clear()
+
+    async def adquirir(self) -> None:
+        """Espera un lugar de concurrencia y un token (y que pase un Retry-After)"""
+        while not self._hay_lugar():
+            futuro = asyncio.get_running_loop().create_future()
+            self._esperando.append(futuro)
+            await futuro
+        self.en_vuelo += 1
+
+        try:
+            while True:
+                ahora = time.monotonic()
+                self._recargar(ahora)
+                espera = max(0.0, self.pausa_hasta - ahora)
+                if espera == 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                espera = max(espera, (1 - self.tokens) / self.tasa)
+                self.esperas += 1
+                self.segundos_espera += espera
+                await asyncio.sleep(espera)
+        except BaseException:
+            self.en_vuelo -= 1
+            self._despertar()
+            raise
+        self.pedidos += 1
+
+    def liberar(self, resultado: str, retry_after: Optional[float] = None) -> None:
+        """Devuelve el lugar y ajusta límite y tasa según `resultado`"""
+        self.en_vuelo -= 1
+        self.resultados[resultado] = self.resultados.get(resultado, 0) + 1
+        ahora = time.monotonic()
+        if resultado == OK:
+            self.limite = min(self.concurrencia_maxima, self.limite + 1 / self.limite)
+            self.tasa = min(self.tasa_maxima, self.tasa + INCREMENTO_TASA)
+        elif resultado in RETROCEDEN:
+            if ahora - self._ultimo_retroceso >= VENTANA_RETROCESO:
+                self._ultimo_retroceso = ahora
+                self.retrocesos += 1
+                self.limite = max(1.0, self.limite * FACTOR_RETROCESO)
+                self.tasa = max(TASA_MINIMA, self.tasa * FACTOR_RETROCESO)
+            if retry_after:
+                self.pausa_hasta = max(self.pausa_hasta, ahora + min(retry_after, MAX_RETRY_AFTER))
+        self._despertar()
+
+    def metricas(self) -> Dict[str, Any]:
+        return {
+            'limite': round(self.limite, 2),
+            'tasa': round(self.tasa, 2),
+            'en_vuelo': self.en_vuelo,
+            'pedidos': self.pedidos,
+            **self.resultados,
+            'retrocesos': self.retrocesos,
+            'esperas': self.esperas,
+            'segundos_espera': round(self.segundos_espera, 3),
+        }
+
+
+# ==============================================================================
+# REGISTRO DE HOSTS
+# ==============================================================================
+
+class LimitadorPorHost:
+    """Un `LimitadorHost` por host, creado la primera vez que se lo pide"""
+
+    def __init__(
+        self,
+        concurrencia_inicial: int = CONCURRENCIA_INICIAL,
+        concurrencia_maxima: int = CONCURRENCIA_MAXIMA,
+        tasa_inicial: float = TASA_INICIAL,
+        tasa_maxima: float = TASA_MAXIMA,
+        rafaga: int = RAFAGA
+    ):
+        self.concurrencia_inicial = concurrencia_inicial
+        self.concurrencia_maxima = max(concurrencia_inicial, concurrencia_maxima)
+        self.tasa_inicial = tasa_inicial
+        self.tasa_maxima = tasa_maxima
+        self.rafaga = rafaga
+        self._hosts: Dict[str, LimitadorHost] = {}
+
+    def host(self, host: str) -> LimitadorHost:
+        limitador = self._hosts.get(host)
+        if limitador is None:
+            limitador = self._hosts[host] = LimitadorHost(
+                host, self.concurrencia_inicial, self.concurrencia_maxima,
+                self.tasa_inicial, self.tasa_maxima, self.rafaga
+            )
+        return limitador
+
+    def metricas(self) -> Dict[str, Dict[str, Any]]:
+        """Estado y contadores de cada host"""
+        return {host: limitador.metricas() for host, limitador in self._hosts.items()}
+
+    def resumen(self) -> Dict[str, Any]:
+        """Totales de todos los hosts"""
+        totales: Dict[str, Any] = {'hosts': len(self._hosts)}
+        for metricas in self.metricas().values():
+            for clave in ('pedidos', OK, LIMITADO, ERROR_SERVIDOR, TIMEOUT, ERROR, 'retrocesos', 'esperas', 'segundos_espera'):
+                totales[clave] = totales.get(clave, 0) + metricas[clave]
+        totales['hosts_con_retroceso'] = sum(1 for l in self._hosts.values() if l.retrocesos)
+        return totales
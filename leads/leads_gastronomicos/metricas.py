@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MÉTRICAS POR ETAPA CON EXPORTACIÓN PROMETHEUS Y JSON
+====================================================
+La única instrumentación eran los logs con emojis: no había forma de
+saber si una corrida lenta se iba en la búsqueda de DataForSEO, en las
+descargas, en el parseo, en Playwright o en `consolidar_y_guardar`.
+
+`METRICAS` es un registro en memoria, compartido por todo el proceso, con:
+
+- contadores (`contar`): respuestas por resultado, bytes, hits de cache,
+  dominios salteados...
+- histogramas de latencia con buckets fijos (`observar`, `etapa`): por
+  etapa del pipeline, por host en las descargas, por visita de Playwright
+
+Cada operación es un bisect y una suma bajo un lock, así que queda
+prendido siempre. Al final de la corrida `exportar` escribe:
+
+- `resultados/metricas/<nombre>.prom`: formato de texto de Prometheus
+  (para el textfile collector de node_exporter), reemplazado en cada corrida
+- `resultados/metricas/<nombre>_<run_id>.json`: resumen con p50/p95 por
+  etapa, hosts más lentos y tasas de éxito
+
+    with METRICAS.etapa('rastreo_emails'):
+        ...
+    METRICAS.contar('http_respuestas_total', resultado='ok')
+    METRICAS.observar('http_segundos', 0.35, host='resto.com')
+    METRICAS.exportar('pipeline_completo', corrida.run_id)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+DIRECTORIO_METRICAS = Path(__file__).parent / "resultados" / "metricas"
+PREFIJO = 'leads_'
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0, 120.0)
+HOSTS_EN_RESUMEN = 10
+
+AYUDA = {
+    'etapa_segundos': 'Duración de cada etapa del pipeline',
+    'dataforseo_segundos': 'Latencia de cada búsqueda en DataForSEO',
+    'http_segundos': 'Latencia de cada descarga HTTP, por host',
+    'http_respuestas_total': 'Descargas HTTP por resultado (ok, limitado, error_servidor, timeout, error)',
+    'http_bytes_total': 'Bytes de HTML descargados, por host',
+    'cache_http_total': 'Consultas a la cache HTTP por resultado (fresco, revalidado, descargado)',
+    'extractor_cache_total': 'Resultados de extractores reutilizados de la cache',
+    'parseo_segundos': 'Espera + parseo de cada página en el pool de procesos',
+    'playwright_segundos': 'Duración de cada visita de Playwright',
+    'playwright_visitas_total': 'Visitas de Playwright por resultado',
+    'playwright_recursos_total': 'Pedidos de las páginas de Playwright bloqueados o permitidos, por tipo',
+    'playwright_bytes_total': 'Bytes recibidos por Playwright (según Content-Length)',
+    'playwright_esperas_total': 'Fin de la espera tras cargar la página (enlace, red_inactiva, plazo)',
+    'dns_consultas_total': 'Consultas DNS por resultado (ok, nxdomain, fallo)',
+    'dominios_salteados_total': 'Pedidos salteados por dominio caído, por clase de falla',
+    'descargas_compartidas_total': 'Descargas coalescidas con otra de la misma URL canónica',
+    'limite_retrocesos_total': 'Retrocesos del límite adaptativo por host',
+    'negocios_total': 'Negocios procesados por resultado',
+}
+
+Etiquetas = Tuple[Tuple[str, str], ...]
+
+
+def _etiquetas(etiquetas: Dict[str, Any]) -> Etiquetas:
+    return tuple(sorted((k, str(v)) for k, v in etiquetas.items()))
+
+
+def _formatear_etiquetas(etiquetas: Etiquetas, extra: Etiquetas = ()) -> str:
+    todas = etiquetas + extra
+    if not todas:
+        return ''
+    partes = []
+    for k, v in todas:
+        v = v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{k}="{v}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+# ==============================================================================
+# HISTOGRAMA
+# ==============================================================================
+
+class Histograma:
+    """Buckets acumulables al estilo Prometheus (`le` = menor o igual)"""
+
+    __slots__ = ('limites', 'cuentas', 'suma', 'total', 'minimo', 'maximo')
+
+    def __init__(self, limites: Tuple[float, ...] = BUCKETS_SEGUNDOS):
+        self.limites = limites
+        self.cuentas = [0] * (len(limites) + 1)      # el último es +Inf
+        self.suma = 0.0
+        self.total = 0
+        self.minimo = float('inf')
+        self.maximo = 0.0
+
+    def observar(self, valor: float) -> None:
+        self.cuentas[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def sumar(self, otro: 'Histograma') -> None:
+        for i, cuenta in enumerate(otro.cuentas):
+            self.cuentas[i] += cuenta
+        self.suma += otro.suma
+        self.total += otro.total
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+
+    def percentil(self, q: float) -> float:
+        """Estimación por interpolación lineal dentro del bucket, acotada al mínimo y máximo vistos"""
+        if self.total == 0:
+            return 0.0
+        objetivo = q * self.total
+        acumulado = 0
+        estimado = self.maximo
+        for i, cuenta in enumerate(self.cuentas):
+            if cuenta and acumulado + cuenta >= objetivo:
+                inferior = self.limites[i - 1] if i > 0 else 0.0
+                superior = self.limites[i] if i < len(self.limites) else self.maximo
+                estimado = inferior + (superior - inferior) * (objetivo - acumulado) / cuenta
+                break
+            acumulado += cuenta
+        return min(max(estimado, self.minimo), self.maximo)
+
+    def resumen(self) -> Dict[str, float]:
+        return {
+            'cantidad': self.total,
+            'total_segundos': round(self.suma, 3),
+            'promedio': round(self.suma / self.total, 4) if self.total else 0.0,
+            'p50': round(self.percentil(0.5), 4),
+            'p95': round(self.percentil(0.95), 4),
+            'p99': round(self.percentil(0.99), 4),
+            'maximo': round(self.maximo, 4),
+        }
+
+
+# ==============================================================================
+# REGISTRO
+# ==============================================================================
+
+class RegistroMetricas:
+    """Contadores e histogramas con etiquetas; seguro entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contadores: Dict[Tuple[str, Etiquetas], float] = {}
+        self._histogramas: Dict[Tuple[str, Etiquetas], Histograma] = {}
+        self.inicio = time.time()
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+            self.inicio = time.time()
+
+    def contar(self, nombre: str, valor: float = 1, **etiquetas: Any) -> None:
+        if not valor:
+            return
+        clave = (nombre, _etiquetas(etiquetas))
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    def observar(self, nombre: str, valor: float, **etiquetas: Any) -> None:
+        clave = (nombre, _etiquetas(etiquetas))
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = Histograma()
+            histograma.observar(valor)
+
+    @contextmanager
+    def etapa(self, nombre: str) -> Iterator[None]:
+        """Mide la duración de una etapa del pipeline (aunque termine con error)"""
+        inicio = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observar('etapa_segundos', time.monotonic() - inicio, etapa=nombre)
+
+    # --------------------------------------------------------------------------
+    # Lectura
+    # --------------------------------------------------------------------------
+
+    def contador(self, nombre: str, **etiquetas: Any) -> float:
+        """Valor de un contador; sin etiquetas suma todas las series del nombre"""
+        with self._lock:
+            if etiquetas:
+                return self._contadores.get((nombre, _etiquetas(etiquetas)), 0)
+            return sum(v for (n, _), v in self._contadores.items() if n == nombre)
+
+    def histograma(self, nombre: str) -> Histograma:
+        """Copia de un histograma con todas sus series sumadas (p. ej. `http_segundos` de todos los hosts)"""
+        with self._lock:
+            return self._combinado(nombre)
+
+    def _por_etiqueta(self, nombre: str, etiqueta: str) -> Dict[str, float]:
+        valores: Dict[str, float] = {}
+        for (n, etiquetas), valor in self._contadores.items():
+            if n == nombre:
+                clave = dict(etiquetas).get(etiqueta, '')
+                valores[clave] = valores.get(clave, 0) + valor
+        return valores
+
+    def _histogramas_de(self, nombre: str) -> List[Tuple[Dict[str, str], Histograma]]:
+        return [(dict(e), h) for (n, e), h in self._histogramas.items() if n == nombre]
+
+    def _combinado(self, nombre: str) -> Histograma:
+        combinado = Histograma()
+        for _, histograma in self._histogramas_de(nombre):
+            combinado.sumar(histograma)
+        return combinado
+
+    # --------------------------------------------------------------------------
+    # Exportación
+    # --------------------------------------------------------------------------
+
+    def texto_prometheus(self) -> str:
+        """Todas las series en el formato de texto de Prometheus"""
+        lineas: List[str] = []
+        with self._lock:
+            nombres_contadores = sorted({n for n, _ in self._contadores})
+            for nombre in nombres_contadores:
+                metrica = PREFIJO + nombre
+                lineas.append(f"# HELP {metrica} {AYUDA.get(nombre, nombre)}")
+                lineas.append(f"# TYPE {metrica} counter")
+                for (n, etiquetas), valor in sorted(self._contadores.items()):
+                    if n == nombre:
+                        lineas.append(f"{metrica}{_formatear_etiquetas(etiquetas)} {_numero(valor)}")
+
+            nombres_histogramas = sorted({n for n, _ in self._histogramas})
+            for nombre in nombres_histogramas:
+                metrica = PREFIJO + nombre
+                lineas.append(f"# HELP {metrica} {AYUDA.get(nombre, nombre)}")
+                lineas.append(f"# TYPE {metrica} histogram")
+                for (n, etiquetas), h in sorted(self._histogramas.items(), key=lambda x: x[0]):
+                    if n != nombre:
+                        continue
+                    acumulado = 0
+                    for limite, cuenta in zip(h.limites + (float('inf'),), h.cuentas):
+                        acumulado += cuenta
+                        le = '+Inf' if limite == float('inf') else _numero(limite)
+                        lineas.append(f"{metrica}_bucket{_formatear_etiquetas(etiquetas, (('le', le),))} {acumulado}")
+                    lineas.append(f"{metrica}_sum{_formatear_etiquetas(etiquetas)} {_numero(h.suma)}")
+                    lineas.append(f"{metrica}_count{_formatear_etiquetas(etiquetas)} {h.total}")
+
+            lineas.append(f"# HELP {PREFIJO}ultima_corrida_timestamp_segundos Fin de la última corrida")
+            lineas.append(f"# TYPE {PREFIJO}ultima_corrida_timestamp_segundos gauge")
+            lineas.append(f"{PREFIJO}ultima_corrida_timestamp_segundos {_numero(round(time.time(), 3))}")
+        return '\n'.join(lineas) + '\n'
+
+    def resumen(self) -> Dict[str, Any]:
+        """Resumen legible: etapas, latencias, hosts más lentos, contadores y tasas de éxito"""
+        with self._lock:
+            etapas = {
+                e.get('etapa', ''): h.resumen()
+                for e, h in self._histogramas_de('etapa_segundos')
+            }
+            latencias = {
+                nombre: self._combinado(nombre).resumen()
+                for nombre in ('dataforseo_segundos', 'http_segundos', 'parseo_segundos', 'playwright_segundos')
+                if self._histogramas_de(nombre)
+            }
+            bytes_por_host = self._por_etiqueta('http_bytes_total', 'host')
+            hosts = sorted(self._histogramas_de('http_segundos'), key=lambda x: x[1].suma, reverse=True)
+            hosts_lentos = [
+                {'host': e.get('host', ''), **h.resumen(), 'bytes': int(bytes_por_host.get(e.get('host', ''), 0))}
+                for e, h in hosts[:HOSTS_EN_RESUMEN]
+            ]
+            contadores: Dict[str, Any] = {}
+            for (nombre, etiquetas), valor in sorted(self._contadores.items()):
+                if nombre == 'http_bytes_total':
+                    continue
+                destino = contadores.setdefault(nombre, {})
+                destino[','.join(f"{k}={v}" for k, v in etiquetas) or 'total'] = valor
+            respuestas = self._por_etiqueta('http_respuestas_total', 'resultado')
+            visitas = self._por_etiqueta('playwright_visitas_total', 'resultado')
+            cache = self._por_etiqueta('cache_http_total', 'resultado')
+
+        def tasa(parte: float, total: float) -> Optional[float]:
+            return round(parte / total, 4) if total else None
+
+        return {
+            'inicio': datetime.fromtimestamp(self.inicio).isoformat(),
+            'duracion_segundos': round(time.time() - self.inicio, 3),
+            'etapas': etapas,
+            'latencias': latencias,
+            'hosts_mas_lentos': hosts_lentos,
+            'bytes_descargados': int(sum(bytes_por_host.values())),
+            'contadores': contadores,
+            'tasas_de_exito': {
+                'http': tasa(respuestas.get('ok', 0), sum(respuestas.values())),
+                'playwright': tasa(visitas.get('ok', 0), sum(visitas.values())),
+                'cache_http': tasa(cache.get('fresco', 0) + cache.get('revalidado', 0), sum(cache.values())),
+            },
+        }
+
+    def exportar(
+        self,
+        nombre: str,
+        run_id: Optional[str] = None,
+        directorio: Path = DIRECTORIO_METRICAS
+    ) -> Tuple[Path, Path]:
+        """Escribe `<nombre>.prom` (reemplazo atómico) y `<nombre>_<run_id>.json`"""
+        directorio = Path(directorio)
+        directorio.mkdir(parents=True, exist_ok=True)
+        run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        ruta_prom = directorio / f"{nombre}.prom"
+        temporal = ruta_prom.with_suffix('.prom.tmp')
+        temporal.write_text(self.texto_prometheus(), encoding='utf-8')
+        os.replace(temporal, ruta_prom)
+
+        ruta_json = directorio / f"{nombre}_{run_id}.json"
+        resumen = {'nombre': nombre, 'run_id': run_id, **self.resumen()}
+        with open(ruta_json, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, ensure_ascii=False, indent=2)
+
+        etapas = ', '.join(f"{e} {r['total_segundos']:.1f}s" for e, r in resumen['etapas'].items())
+        logger.info(f"📊 Métricas: {etapas or 'sin etapas'} -> {ruta_prom.name}, {ruta_json.name}")
+        return ruta_prom, ruta_json
+
+
+# Registro del proceso: lo comparten el motor de descargas, el pool de
+# navegadores, el resolver DNS y los pipelines
+METRICAS = RegistroMetricas()
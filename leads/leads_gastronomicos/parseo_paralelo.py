@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PARSEO EN PROCESOS SEPARADOS DE LA RED
+======================================
+Hasta ahora cada HTML se parseaba dentro del event loop de las descargas:
+una página grande frenaba las siguientes requests y el parseo nunca usaba
+más de un núcleo.
+
+`PoolParseo` separa las dos cosas en productor/consumidor:
+
+- las corrutinas de red (productores) ponen el HTML crudo en una cola
+  acotada y esperan el resultado; si la cola está llena, esperan, así que
+  la red no se adelanta más de `profundidad_cola` páginas al parseo
+- una tarea consumidora por worker saca de la cola y manda el trabajo a
+  un `ProcessPoolExecutor` de `procesos` workers, que devuelven el resultado
+
+Red (concurrencia / por host) y CPU (procesos) se configuran por separado.
+Con `procesos=0` se parsea en un thread aparte del mismo proceso.
+
+Los workers arrancan con `forkserver` (o `spawn` donde no existe), no con
+`fork`: cuando se abre el pool ya corren los hilos del DNS y el loop de
+aiohttp, y un hijo forkeado puede heredar un lock tomado. Por eso la
+función que se manda a los workers tiene que ser de nivel de módulo en un
+módulo importable (no del script que se está corriendo, `__main__`), como
+los extractores de `enriquecimiento`.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+PROCESOS_PARSEO = max(1, (os.cpu_count() or 2) - 1)
+PROFUNDIDAD_COLA = 64
+METODO_INICIO = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class PoolParseo:
+    """
+    Cola acotada + pool de procesos para parsear fuera del event loop.
+
+        async with PoolParseo(procesos=4, profundidad_cola=64) as parseo:
+            resultado = await parseo.ejecutar(funcion, html, ...)
+    """
+
+    def __init__(
+        self,
+        procesos: int = PROCESOS_PARSEO,
+        profundidad_cola: int = PROFUNDIDAD_COLA
+    ):
+        self.procesos = max(0, procesos)
+        self.profundidad_cola = max(1, profundidad_cola)
+        self._executor: Optional[Executor] = None
+        self._cola: Optional[asyncio.Queue] = None
+        self._consumidores = []
+        self.trabajos = 0
+        self.errores = 0
+        self.esperas_cola_llena = 0
+
+    async def __aenter__(self) -> 'PoolParseo':
+        if self.procesos > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.procesos,
+                mp_context=multiprocessing.get_context(METODO_INICIO)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._cola = asyncio.Queue(maxsize=self.profundidad_cola)
+        self._consumidores = [
+            asyncio.create_task(self._consumir())
+            for _ in range(max(1, self.procesos))
+        ]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        for tarea in self._consumidores:
+            tarea.cancel()
+        await asyncio.gather(*self._consumidores, return_exceptions=True)
+        self._consumidores = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        workers = f"{self.procesos} procesos" if self.procesos else "un thread"
+        logger.info(
+            f"🧮 Parseo: {self.trabajos} páginas en {workers}, {self.errores} errores, "
+            f"{self.esperas_cola_llena} esperas por cola llena"
+        )
+
+    async def _consumir(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            funcion, args, futuro = await self._cola.get()
+            try:
+                resultado = await loop.run_in_executor(self._executor, funcion, *args)
+            except Exception as e:
+                self.errores += 1
+                if not futuro.done():
+                    futuro.set_exception(e)
+            else:
+                if not futuro.done():
+                    futuro.set_result(resultado)
+            finally:
+                self.trabajos += 1
+                self._cola.task_done()
+
+    async def ejecutar(self, funcion: Callable[..., Any], *args: Any) -> Any:
+        """Encola `funcion(*args)` y espera el resultado (bloquea si la cola está llena)"""
+        futuro = asyncio.get_running_loop().create_future()
+        if self._cola.full():
+            self.esperas_cola_llena += 1
+        await self._cola.put((funcion, args, futuro))
+        return await futuro
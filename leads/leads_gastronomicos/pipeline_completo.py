@@ -13,14 +13,13 @@ Uso:
     python3 pipeline_completo.py --categorias bares restaurantes cafeterias
     python3 pipeline_completo.py --limite 500 --min-rating 4.0
     python3 pipeline_completo.py --skip-emails  # Solo búsqueda y WhatsApp
+    python3 pipeline_completo.py --compactar    # Solo volcar el diario a la base
 """
 
 import sys
-import json
 import time
 import base64
 import argparse
-import re
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -30,13 +29,35 @@ from collections import defaultdict
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright
 
 # Importar config del directorio padre
 sys.path.append(str(Path(__file__).parent.parent))
 from config import DATAFORSEO_LOGIN, DATAFORSEO_PASSWORD, DATAFORSEO_BASE_URL
 
+from descarga_concurrente import CONCURRENCIA_GLOBAL, CONCURRENCIA_POR_HOST
+from rastreo_contactos import enriquecer_sitios, PAGINAS_POR_DOMINIO
+from parseo_paralelo import PROCESOS_PARSEO, PROFUNDIDAD_COLA
+from extraccion_whatsapp import (
+    buscar_whatsapp_en_pagina, ActividadRed, bloquear_recursos, esperar_whatsapp
+)
+from whatsapp_escalonado import DeteccionWhatsapp, contar_deteccion
+from enriquecimiento import descargar_documento, enriquecer
+from pool_playwright import PoolNavegadores, PAGINAS_CONCURRENTES, PAGINAS_POR_NAVEGADOR
+from busqueda_teselada import buscar_teselado
+from almacen_incremental import DiarioRegistros
+from almacen_parquet import AlmacenParquet, normalizar as normalizar_registros
+from barrios_caba import IndiceBarrios
+from corridas import DiarioCorrida, CorridaNoEncontrada, ETAPA_EMAILS, ETAPA_REGISTRO
+from cache_http import CacheHTTP, TTL_HORAS
+from dominios_caidos import RegistroDominiosCaidos, DNS
+from resolucion_dns import CacheDNS, host_de, prerresolver_urls
+from metricas import METRICAS
+from extraccion_rapida import extraer_emails_con_respaldo
+from clasificacion_negocios import clasificar_negocio, clasificar_negocios
+from resolucion_entidades import normalizar_titulo, resolver_entidades
+from validacion_emails import EMAIL_REGEX, VALIDADOR_PIPELINE
+
 # ==============================================================================
 # CONFIGURACIÓN GLOBAL
 # ==============================================================================
@@ -44,8 +65,17 @@ from config import DATAFORSEO_LOGIN, DATAFORSEO_PASSWORD, DATAFORSEO_BASE_URL
 OUTPUT_DIR = Path(__file__).parent / "resultados"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+DB_PARQUET = OUTPUT_DIR / "base_datos_gastronomica_consolidada.parquet"
+# Exportaciones (solo con --exportar; el almacén de trabajo es el Parquet)
 DB_CONSOLIDADA = OUTPUT_DIR / "base_datos_gastronomica_consolidada.csv"
 DB_JSON = OUTPUT_DIR / "base_datos_gastronomica_consolidada.json"
+EXPORTACIONES = {'csv': DB_CONSOLIDADA, 'json': DB_JSON}
+DB_DIARIO = OUTPUT_DIR / "base_datos_gastronomica_diario.ndjson"
+
+# Extractores de `enriquecimiento` que corren sobre cada web (una descarga)
+# y sobre el DOM del navegador cuando una web se abre en Playwright
+EXTRACTORES_WEB = ('emails_pipeline', 'whatsapp', 'senal_js', 'redes', 'menu')
+EXTRACTORES_NAVEGADOR = ('whatsapp', 'emails_pipeline', 'redes', 'menu')
 
 # Coordenadas GPS de CABA
 CABA_LAT = -34.6037
@@ -59,22 +89,6 @@ CATEGORIAS_DISPONIBLES = {
     "cafeterias": ["cafe", "coffee_shop"]
 }
 
-# Cadenas grandes a excluir
-CADENAS_GRANDES = [
-    'starbucks', 'mcdonalds', 
-    'cafe martinez', 'café martinez', 'cafemartinez',  # Todas las variantes
-    'havanna', 'burger king',
-    'bonafide', 'freddo', 'grido', 'subway', 'kentucky', 'kfc', 'pani',
-    'la panera rosa', 'mostaza', 'wendys', 'pizza hut', 'dominos',
-    'dunkin', 'costa coffee', 'le pain quotidien', 'papa johns'
-]
-
-# Plataformas a excluir
-PLATAFORMAS_EXCLUIR = [
-    'instagram.com', 'facebook.com', 'twitter.com', 'tiktok.com',
-    'pedidosya.com', 'rappi.com', 'ubereats.com', 'linktr.ee'
-]
-
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -100,20 +114,16 @@ def _get_auth_header() -> Dict[str, str]:
     }
 
 
-def buscar_negocios_dataforseo(
+def _buscar_en_circulo(
     categorias: List[str],
-    limite: int = 1000,
-    min_rating: float = 3.0
+    lat: float,
+    lon: float,
+    radio_km: float,
+    limite: int,
+    min_rating: float
 ) -> List[Dict[str, Any]]:
-    """
-    Buscar negocios en DataForSEO.
-    """
-    logger.info(f"🔍 Buscando negocios en DataForSEO...")
-    logger.info(f"   Categorías: {', '.join(categorias)}")
-    logger.info(f"   Límite: {limite}")
-    logger.info(f"   Rating mínimo: {min_rating}")
-    
-    location_coord = f"{CABA_LAT},{CABA_LON},{CABA_RADIUS_KM}"
+    """Hace una única búsqueda en DataForSEO sobre un círculo"""
+    location_coord = f"{lat},{lon},{radio_km}"
     
     payload = [{
         "location_coordinate": location_coord,
@@ -127,23 +137,53 @@ def buscar_negocios_dataforseo(
     headers = _get_auth_header()
     url = f"{DATAFORSEO_BASE_URL}/v3/business_data/business_listings/search/live"
     
+    inicio = time.monotonic()
+    resp = requests.post(url, headers=headers, json=payload, timeout=120)
+    METRICAS.observar('dataforseo_segundos', time.monotonic() - inicio)
+    resp.raise_for_status()
+    data = resp.json()
+    
+    if data.get("status_code") != 20000:
+        raise RuntimeError(data.get('status_message'))
+    
+    items = []
+    for task in data.get("tasks", []):
+        result = task.get("result", [])
+        if result:
+            items.extend(result[0].get("items") or [])
+    return items
+
+
+def buscar_negocios_dataforseo(
+    categorias: List[str],
+    limite: int = 1000,
+    min_rating: float = 3.0,
+    teselar: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Buscar negocios en DataForSEO.
+
+    Con `teselar`, el círculo de CABA se cubre con un quadtree adaptativo
+    (ver `busqueda_teselada`): cada tesela que vuelve con `limite` items se
+    subdivide, así no se pierde nada por el tope de 1000 de la API.
+    """
+    logger.info(f"🔍 Buscando negocios en DataForSEO...")
+    logger.info(f"   Categorías: {', '.join(categorias)}")
+    logger.info(f"   Límite: {limite}{' por tesela' if teselar else ''}")
+    logger.info(f"   Rating mínimo: {min_rating}")
+    
     try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=120)
-        resp.raise_for_status()
-        data = resp.json()
-        
-        if data.get("status_code") == 20000:
-            items = []
-            for task in data.get("tasks", []):
-                result = task.get("result", [])
-                if result:
-                    items.extend(result[0].get("items", []))
-            
-            logger.info(f"✅ Encontrados {len(items)} negocios")
-            return items
+        if teselar:
+            items = buscar_teselado(
+                lambda lat, lon, radio: _buscar_en_circulo(categorias, lat, lon, radio, limite, min_rating),
+                CABA_LAT, CABA_LON, CABA_RADIUS_KM,
+                limite=min(limite, 1000)
+            )
         else:
-            logger.error(f"❌ Error: {data.get('status_message')}")
-            return []
+            items = _buscar_en_circulo(categorias, CABA_LAT, CABA_LON, CABA_RADIUS_KM, limite, min_rating)
+        
+        logger.info(f"✅ Encontrados {len(items)} negocios")
+        return items
             
     except Exception as e:
         logger.error(f"❌ Error en búsqueda: {str(e)}")
@@ -154,132 +194,18 @@ def buscar_negocios_dataforseo(
 # 2. EXTRACCIÓN DE EMAILS
 # ==============================================================================
 
-EMAIL_REGEX = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-
-# Emails genéricos a ignorar
-EMAILS_IGNORAR = {
-    'example@example.com', 'test@test.com', 'admin@admin.com',
-    'info@example.com', 'contact@example.com', 'noreply@',
-    'no-reply@', 'webmaster@', 'postmaster@', '@sentry.io',
-    '@placeholder', '@example', 'xxx@', 'email@'
-}
-
-# Extensiones de archivo a excluir (no son emails)
-EXTENSIONES_ARCHIVO = {
-    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico',
-    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.zip', '.rar',
-    '.mp4', '.mp3', '.avi', '.mov', '.css', '.js', '.json',
-    '.xml', '.txt', '.csv', '.html', '.htm', '.woff', '.ttf'
-}
-
-# Dominios sospechosos a excluir
-DOMINIOS_SOSPECHOSOS = {
-    '2x.png', '3x.png', '1x.png', 'x.png', 'x.jpg', 'x.svg',
-    'localhost', '127.0.0.1', 'test.com', 'example.com'
-}
-
-HEADERS_HTTP = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-}
-
-
 def es_email_valido(email: str) -> bool:
     """Valida que el email sea legítimo y no un falso positivo"""
-    if not email:
-        return False
-    
-    email_lower = email.lower()
-    
-    # Verificar longitud
-    if len(email) < 6 or len(email) > 100:
-        return False
-    
-    # Verificar formato básico con regex
-    if not EMAIL_REGEX.match(email):
-        return False
-    
-    # Excluir emails genéricos
-    for ignorar in EMAILS_IGNORAR:
-        if ignorar in email_lower:
-            return False
-    
-    # Excluir si termina con extensión de archivo
-    for ext in EXTENSIONES_ARCHIVO:
-        if email_lower.endswith(ext):
-            return False
-    
-    # Excluir si el dominio es sospechoso
-    if '@' in email:
-        dominio = email.split('@')[1].lower()
-        for sospechoso in DOMINIOS_SOSPECHOSOS:
-            if sospechoso in dominio:
-                return False
-    
-    # Verificar que tenga al menos un punto después del @
-    if '@' in email:
-        parte_dominio = email.split('@')[1]
-        if '.' not in parte_dominio:
-            return False
-        
-        # Verificar que la parte después del último punto tenga al menos 2 caracteres
-        # (dominios válidos como .com, .ar, etc)
-        tld = parte_dominio.split('.')[-1]
-        if len(tld) < 2:
-            return False
-    
-    # Excluir emails que parecen ser rutas de archivos
-    if '/' in email or '\\' in email:
-        return False
-    
-    # Excluir emails con caracteres sospechosos múltiples
-    if email.count('@') != 1:
-        return False
-    
-    # Verificar que no sea un número puro antes del @
-    parte_local = email.split('@')[0]
-    if parte_local.isdigit():
-        return False
-    
-    # Excluir si tiene números extraños tipo "9075@2x.png"
-    if re.match(r'^\d+@\d+x\.(png|jpg|gif|svg)', email_lower):
-        return False
-    
-    # Verificar concatenaciones raras al final del dominio
-    # Ej: info@domain.comarav (NO incluir .com.ar que es válido)
-    if '@' in email:
-        dominio = email.split('@')[1].lower()
-        
-        # TLDs combinados válidos (no son concatenaciones)
-        tlds_combinados_validos = [
-            '.com.ar', '.gob.ar', '.org.ar', '.net.ar', '.edu.ar',
-            '.co.uk', '.co.nz', '.com.mx', '.com.br', '.com.au'
-        ]
-        
-        # Si tiene un TLD combinado válido, verificar que no haya más texto pegado
-        tiene_tld_combinado = any(tld in dominio for tld in tlds_combinados_validos)
-        
-        if not tiene_tld_combinado:
-            # Si después de .com, .net, .org hay texto pegado sin punto, es concatenación
-            if re.search(r'\.(com|net|org)[a-z]{2,}', dominio):
-                return False
-    
-    # Verificar números raros al inicio tipo "4131.8028reservas@"
-    if '@' in email:
-        parte_local = email.split('@')[0]
-        # Si empieza con muchos números seguidos de punto y más números
-        if re.match(r'^\d{4,}\.\d+', parte_local):
-            return False
-        
-        # Si empieza con números de 4+ dígitos directamente
-        if re.match(r'^\d{4,}[a-z]', parte_local.lower()):
-            return False
-    
-    return True
+    return VALIDADOR_PIPELINE(email)
 
 
 def extraer_emails_de_html(html: str) -> Set[str]:
-    """Extrae emails de HTML"""
+    """Extrae emails de HTML (camino rápido sin parser, BeautifulSoup si es ambiguo)"""
+    return extraer_emails_con_respaldo(html, es_email_valido, extraer_emails_de_html_bs4)
+
+
+def extraer_emails_de_html_bs4(html: str) -> Set[str]:
+    """Extrae emails de HTML con BeautifulSoup"""
     emails = set()
     
     try:
@@ -307,42 +233,29 @@ def extraer_emails_de_html(html: str) -> Set[str]:
     return emails
 
 
+def enriquecer_url(url: str, timeout: int = 10, extractores=EXTRACTORES_WEB) -> Dict[str, Any]:
+    """
+    Descarga la web una sola vez y corre todos los `extractores` sobre el
+    mismo documento. {} si la descarga falló; None en cada extractor si
+    la respuesta no es HTML.
+    """
+    documento = descargar_documento(url, timeout)
+    if documento is None:
+        return {}
+    if not documento.es_html:
+        return dict.fromkeys(extractores)
+    return enriquecer(documento, extractores)
+
+
 def extraer_emails_de_url(url: str, timeout: int = 10) -> Set[str]:
     """Extrae emails de una URL"""
-    emails = set()
-    
-    try:
-        response = requests.get(url, headers=HEADERS_HTTP, timeout=timeout, allow_redirects=True)
-        response.raise_for_status()
-        
-        if 'text/html' in response.headers.get('Content-Type', '').lower():
-            emails = extraer_emails_de_html(response.text)
-    
-    except Exception as e:
-        logger.debug(f"Error obteniendo {url}: {str(e)[:50]}")
-    
-    return emails
+    return set(enriquecer_url(url, timeout, ['emails_pipeline']).get('emails_pipeline') or ())
 
 
 # ==============================================================================
 # 3. EXTRACCIÓN DE WHATSAPP
 # ==============================================================================
 
-def clean_phone_number(phone: str) -> Optional[str]:
-    """Limpia número de teléfono"""
-    if not phone:
-        return None
-    
-    cleaned = re.sub(r'[\s\-()]', '', phone)
-    cleaned = re.sub(r'[^\d+]', '', cleaned)
-    digits = re.sub(r'[^\d]', '', cleaned)
-    
-    if len(digits) < 10:
-        return None
-    
-    return cleaned
-
-
 def extraer_whatsapp_playwright(url: str, timeout: int = 45) -> Optional[str]:
     """Extrae número de WhatsApp usando Playwright"""
     try:
@@ -352,40 +265,18 @@ def extraer_whatsapp_playwright(url: str, timeout: int = 45) -> Optional[str]:
                 user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
                 viewport={'width': 1920, 'height': 1080}
             )
+            bloquear_recursos(context)
             page = context.new_page()
+            red = ActividadRed(page)
             
             page.goto(url, timeout=timeout * 1000, wait_until='domcontentloaded')
-            time.sleep(3)
-            
-            # Buscar enlaces de WhatsApp
-            whatsapp_links = page.query_selector_all('a[href*="wa.me"], a[href*="whatsapp"], a[href*="api.whatsapp.com"]')
-            
-            for link in whatsapp_links:
-                href = link.get_attribute('href')
-                if href:
-                    match = re.search(r'(?:wa\.me/|whatsapp\.com/send\?phone=)(\+?\d+)', href)
-                    if match:
-                        phone = clean_phone_number(match.group(1))
-                        if phone:
-                            browser.close()
-                            return phone
-            
-            # Buscar en el contenido de la página
-            content = page.content()
-            patterns = [
-                r'whatsapp[:\s]+([+\d\s\-()]{10,20})',
-                r'(\+54\s?9?\s?\d{2,4}\s?\d{3,4}\s?\d{3,4})',
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    phone = clean_phone_number(match)
-                    if phone:
-                        browser.close()
-                        return phone
+            esperar_whatsapp(page, red)
             
+            # Buscar enlaces de WhatsApp y, si no hay, en el contenido
+            phone = buscar_whatsapp_en_pagina(page)
             browser.close()
+            if phone:
+                return phone
             
     except Exception as e:
         logger.debug(f"Error extrayendo WhatsApp de {url}: {str(e)[:50]}")
@@ -393,53 +284,43 @@ def extraer_whatsapp_playwright(url: str, timeout: int = 45) -> Optional[str]:
     return None
 
 
+def extraer_whatsapp_de_url(url: str, timeout: int = 10) -> Optional[str]:
+    """WhatsApp del HTML estático; abre Playwright solo si la página depende de JavaScript"""
+    deteccion = DeteccionWhatsapp.de_resultados(enriquecer_url(url, timeout, ['whatsapp', 'senal_js']))
+    if deteccion.escalar:
+        return extraer_whatsapp_playwright(url, timeout=30)
+    return deteccion.numero
+
+
 # ==============================================================================
 # 4. PROCESAMIENTO Y CONSOLIDACIÓN
 # ==============================================================================
 
-def es_cadena_grande(titulo: str, dominio: str) -> bool:
-    """Verifica si es una cadena grande"""
-    # Normalizar texto: remover acentos y espacios extra
-    import unicodedata
-    
-    texto = f"{titulo} {dominio}".lower()
-    texto_normalizado = ''.join(
-        c for c in unicodedata.normalize('NFD', texto)
-        if unicodedata.category(c) != 'Mn'
-    )
-    
-    # Remover espacios múltiples
-    texto_normalizado = ' '.join(texto_normalizado.split())
-    
-    # Buscar coincidencias
-    for cadena in CADENAS_GRANDES:
-        # Normalizar cadena también
-        cadena_normalizada = ''.join(
-            c for c in unicodedata.normalize('NFD', cadena)
-            if unicodedata.category(c) != 'Mn'
-        )
-        
-        # Verificar con y sin espacios
-        if cadena_normalizada in texto_normalizado:
-            return True
-        
-        # Verificar versión sin espacios (ej: cafemartinez)
-        cadena_sin_espacios = cadena_normalizada.replace(' ', '')
-        if cadena_sin_espacios in texto_normalizado.replace(' ', ''):
-            return True
-    
-    return False
-
-
-def es_plataforma_excluir(url: str, dominio: str) -> bool:
-    """Verifica si es una plataforma a excluir"""
-    texto = f"{url} {dominio}".lower()
-    return any(plat in texto for plat in PLATAFORMAS_EXCLUIR)
-
-
-def procesar_negocio(negocio: Dict[str, Any], extraer_emails: bool = True, extraer_wpp: bool = True) -> Dict[str, Any]:
+def procesar_negocio(
+    negocio: Dict[str, Any],
+    extraer_emails: bool = True,
+    extraer_wpp: bool = True,
+    emails_precalculados: Optional[Set[str]] = None,
+    pool: Optional[PoolNavegadores] = None,
+    clasificacion: Optional[Dict[str, bool]] = None,
+    deteccion_whatsapp: Optional[DeteccionWhatsapp] = None,
+    datos_web: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Procesa un negocio extrayendo toda la información.
+
+    `datos_web` son los resultados de `enriquecimiento` para la web,
+    calculados en bloque por `rastreo_contactos.enriquecer_sitios`; de ahí
+    salen `emails_precalculados` y `deteccion_whatsapp`. Si falta alguno,
+    la web se descarga una sola vez (`enriquecer_url`) y todos los
+    extractores corren sobre ese documento.
+
+    WhatsApp se busca primero en el HTML estático y solo si la página
+    depende de JS se abre el navegador: el `pool` si se pasa (que además
+    completa emails, redes y carta con el DOM renderizado), si no un
+    Chromium nuevo.
+    `clasificacion` es la fila de `clasificar_negocios` para este negocio
+    (si no se pasa, se calcula acá).
     """
     # Datos básicos de DataForSEO
     titulo = negocio.get('title', '')
@@ -447,6 +328,9 @@ def procesar_negocio(negocio: Dict[str, Any], extraer_emails: bool = True, extra
     dominio = negocio.get('domain', '')
     telefono = negocio.get('phone', '')
     
+    if clasificacion is None:
+        clasificacion = clasificar_negocio(titulo, url, dominio)
+    
     # Crear registro base
     registro = {
         'titulo': titulo,
@@ -467,8 +351,10 @@ def procesar_negocio(negocio: Dict[str, Any], extraer_emails: bool = True, extra
         'verificado': negocio.get('is_claimed', False),
         'emails': '',
         'whatsapp': telefono if telefono else '',  # Por defecto usar el teléfono de Google
-        'tiene_web_propia': bool(url and not es_plataforma_excluir(url, dominio)),
-        'es_cadena': es_cadena_grande(titulo, dominio),
+        'redes': '',
+        'url_menu': '',
+        'tiene_web_propia': bool(url and not clasificacion['es_plataforma']),
+        'es_cadena': clasificacion['es_cadena'],
         'fecha_extraccion': datetime.now().isoformat(),
     }
     
@@ -477,11 +363,23 @@ def procesar_negocio(negocio: Dict[str, Any], extraer_emails: bool = True, extra
         logger.debug(f"⏭️  Saltando cadena: {titulo}")
         return registro
     
+    # Una sola descarga para lo que no vino calculado en bloque
+    web_propia = bool(url and registro['tiene_web_propia'])
+    faltan_emails = extraer_emails and web_propia and emails_precalculados is None
+    falta_wpp = extraer_wpp and web_propia and not registro['whatsapp'] and deteccion_whatsapp is None
+    if faltan_emails or falta_wpp:
+        datos_web = enriquecer_url(url, timeout=10)
+        if faltan_emails:
+            emails_precalculados = set(datos_web.get('emails_pipeline') or ())
+        if falta_wpp:
+            deteccion_whatsapp = DeteccionWhatsapp.de_resultados(datos_web)
+    datos_web = datos_web or {}
+    
     # Extraer emails si tiene web propia
-    if extraer_emails and url and registro['tiene_web_propia']:
+    if extraer_emails and web_propia:
         logger.info(f"📧 Extrayendo emails: {titulo}")
         try:
-            emails = extraer_emails_de_url(url, timeout=10)
+            emails = emails_precalculados
             if emails:
                 registro['emails'] = ', '.join(sorted(emails))
                 logger.info(f"   ✅ {len(emails)} email(s): {registro['emails']}")
@@ -491,10 +389,22 @@ def procesar_negocio(negocio: Dict[str, Any], extraer_emails: bool = True, extra
             logger.warning(f"   ⚠️  Error: {str(e)[:50]}")
     
     # Extraer WhatsApp si tiene web propia
-    if extraer_wpp and url and registro['tiene_web_propia'] and not registro['whatsapp']:
+    if extraer_wpp and web_propia and not registro['whatsapp']:
         logger.info(f"📱 Extrayendo WhatsApp: {titulo}")
         try:
-            wpp = extraer_whatsapp_playwright(url, timeout=30)
+            if not deteccion_whatsapp.escalar:
+                wpp = deteccion_whatsapp.numero
+            elif pool is not None:
+                # La misma visita completa lo que el HTML estático no mostraba
+                renderizado = pool.enriquecer(url) or {}
+                wpp = renderizado.get('whatsapp')
+                datos_web = {**renderizado, **{k: v for k, v in datos_web.items() if v}}
+                emails_js = set(renderizado.get('emails_pipeline') or ())
+                if extraer_emails and emails_js and not registro['emails']:
+                    registro['emails'] = ', '.join(sorted(emails_js))
+                    logger.info(f"   ✅ {len(emails_js)} email(s) en el DOM renderizado: {registro['emails']}")
+            else:
+                wpp = extraer_whatsapp_playwright(url, timeout=30)
             if wpp:
                 registro['whatsapp'] = wpp
                 logger.info(f"   ✅ WhatsApp: {wpp}")
@@ -503,14 +413,20 @@ def procesar_negocio(negocio: Dict[str, Any], extraer_emails: bool = True, extra
         except Exception as e:
             logger.warning(f"   ⚠️  Error: {str(e)[:50]}")
     
+    # Redes y carta: del mismo documento, sin otra descarga
+    registro['redes'] = ', '.join((datos_web.get('redes') or {}).values())
+    registro['url_menu'] = next(iter(datos_web.get('menu') or []), '')
+    
     return registro
 
 
 def cargar_base_datos_existente() -> pd.DataFrame:
-    """Carga la base de datos consolidada si existe"""
-    if DB_CONSOLIDADA.exists():
-        logger.info(f"📂 Cargando base de datos existente: {DB_CONSOLIDADA}")
-        df = pd.read_csv(DB_CONSOLIDADA)
+    """Carga la base de datos consolidada (Parquet) si existe"""
+    almacen = AlmacenParquet(DB_PARQUET)
+    almacen.migrar_desde_csv(DB_CONSOLIDADA)
+    if almacen.existe():
+        logger.info(f"📂 Cargando base de datos existente: {DB_PARQUET}")
+        df = almacen.leer()
         logger.info(f"   {len(df)} registros existentes")
         return df
     else:
@@ -526,8 +442,8 @@ def consolidar_y_guardar(registros: List[Dict[str, Any]], db_existente: pd.DataF
     logger.info("💾 CONSOLIDANDO Y GUARDANDO")
     logger.info("="*80)
     
-    # Crear DataFrame de nuevos registros
-    df_nuevos = pd.DataFrame(registros)
+    # Crear DataFrame de nuevos registros (con los tipos del esquema)
+    df_nuevos = normalizar_registros(pd.DataFrame(registros))
     
     if len(df_nuevos) == 0:
         logger.warning("⚠️  No hay nuevos registros para guardar")
@@ -550,23 +466,6 @@ def consolidar_y_guardar(registros: List[Dict[str, Any]], db_existente: pd.DataF
         logger.info(f"   Eliminados {dup_place_id} duplicados por place_id")
     
     # 2. Eliminar duplicados de cadenas de forma agresiva
-    import unicodedata
-    
-    def normalizar_titulo(titulo):
-        if pd.isna(titulo):
-            return ""
-        # Remover acentos
-        titulo_norm = ''.join(
-            c for c in unicodedata.normalize('NFD', str(titulo).lower())
-            if unicodedata.category(c) != 'Mn'
-        )
-        # Remover caracteres especiales, números, espacios extra
-        titulo_norm = re.sub(r'[^\w\s]', '', titulo_norm)
-        titulo_norm = re.sub(r'\d+', '', titulo_norm)  # Remover números
-        titulo_norm = re.sub(r'\b(sucursal|local|branch|store|tienda)\b', '', titulo_norm)  # Remover palabras comunes
-        titulo_norm = ' '.join(titulo_norm.split())
-        return titulo_norm.strip()
-    
     df_completo['titulo_normalizado'] = df_completo['titulo'].apply(normalizar_titulo)
     
     # Separar cadenas de negocios independientes
@@ -596,38 +495,20 @@ def consolidar_y_guardar(registros: List[Dict[str, Any]], db_existente: pd.DataF
     # 3. Combinar de nuevo
     df_completo = pd.concat([df_no_cadenas, df_cadenas], ignore_index=True)
     
-    # 4. Eliminar duplicados por teléfono (mismo negocio con distinto place_id)
-    # Solo si tienen el mismo título normalizado Y teléfono
-    df_con_telefono = df_completo[
-        df_completo['telefono'].notna() & 
-        (df_completo['telefono'] != '')
-    ].copy()
-    
-    if len(df_con_telefono) > 0:
-        antes = len(df_completo)
-        
-        # Crear identificador compuesto
-        df_completo['_dup_check'] = (
-            df_completo['titulo_normalizado'].fillna('') + '|' + 
-            df_completo['telefono'].fillna('')
-        )
-        
-        # Ordenar por rating antes de eliminar duplicados
-        df_completo = df_completo.sort_values(
-            by=['rating', 'cantidad_reviews'],
-            ascending=[False, False]
+    df_completo = df_completo.drop(columns=['titulo_normalizado'])
+    
+    # 4. Resolución de entidades: mismo negocio con distinto place_id
+    # (teléfono, dominio, cercanía o título+dirección parecidos)
+    with METRICAS.etapa('resolucion_entidades'):
+        resolucion = resolver_entidades(df_completo)
+    df_completo = resolucion.canonicos
+    if resolucion.fusionados > 0:
+        ruta_auditoria = OUTPUT_DIR / f"auditoria_duplicados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        resolucion.auditoria.to_csv(ruta_auditoria, index=False, encoding='utf-8')
+        logger.info(
+            f"   Fusionados {resolucion.fusionados} duplicados en {len(resolucion.auditoria)} negocios "
+            f"(auditoría: {ruta_auditoria.name})"
         )
-        
-        # Eliminar duplicados por título+teléfono
-        df_completo = df_completo.drop_duplicates(subset=['_dup_check'], keep='first')
-        df_completo = df_completo.drop(columns=['_dup_check'])
-        
-        dup_telefono = antes - len(df_completo)
-        if dup_telefono > 0:
-            logger.info(f"   Eliminados {dup_telefono} duplicados por título+teléfono")
-    
-    # Eliminar columna temporal
-    df_completo = df_completo.drop(columns=['titulo_normalizado'], errors='ignore')
     
     duplicados_total = antes_total - len(df_completo)
     logger.info(f"   ✅ Total duplicados eliminados: {duplicados_total}\n")
@@ -638,14 +519,15 @@ def consolidar_y_guardar(registros: List[Dict[str, Any]], db_existente: pd.DataF
         ascending=[False, False]
     ).reset_index(drop=True)
     
-    # Guardar CSV
-    df_completo.to_csv(DB_CONSOLIDADA, index=False, encoding='utf-8')
-    logger.info(f"✅ CSV guardado: {DB_CONSOLIDADA}")
-    logger.info(f"   Total registros: {len(df_completo)}")
+    # Barrio de cada negocio por polígono (si está el GeoJSON de barrios)
+    indice = IndiceBarrios.cargar()
+    if indice is not None:
+        df_completo['barrio'] = indice.asignar(df_completo['latitud'], df_completo['longitud'])
     
-    # Guardar JSON
-    df_completo.to_json(DB_JSON, orient='records', indent=2, force_ascii=False)
-    logger.info(f"✅ JSON guardado: {DB_JSON}")
+    # Guardar Parquet
+    AlmacenParquet(DB_PARQUET).guardar(df_completo)
+    logger.info(f"✅ Parquet guardado: {DB_PARQUET}")
+    logger.info(f"   Total registros: {len(df_completo)}")
     
     # Estadísticas
     logger.info("\n" + "="*80)
@@ -660,6 +542,35 @@ def consolidar_y_guardar(registros: List[Dict[str, Any]], db_existente: pd.DataF
     logger.info("="*80)
 
 
+def compactar_base_datos() -> None:
+    """
+    Vuelca el diario incremental en la base consolidada: une con la base
+    existente, deduplica, ordena y guarda el Parquet una sola vez.
+    """
+    diario = DiarioRegistros(DB_DIARIO)
+    registros = diario.leer_todos()
+    
+    if not registros:
+        logger.info("📓 Diario vacío, nada para compactar")
+        return
+    
+    logger.info(f"📓 Compactando {len(registros)} registros del diario: {DB_DIARIO}")
+    consolidar_y_guardar(registros, cargar_base_datos_existente())
+    diario.vaciar()
+
+
+def exportar_base_datos(formatos: List[str]) -> None:
+    """Exporta la base consolidada a CSV y/o JSON"""
+    almacen = AlmacenParquet(DB_PARQUET)
+    almacen.migrar_desde_csv(DB_CONSOLIDADA)
+    if not almacen.existe():
+        logger.warning("⚠️  No hay base consolidada para exportar")
+        return
+    for formato in formatos:
+        filas = almacen.exportar(EXPORTACIONES[formato], formato)
+        logger.info(f"📤 {formato.upper()} exportado: {EXPORTACIONES[formato]} ({filas} registros)")
+
+
 # ==============================================================================
 # 5. PIPELINE PRINCIPAL
 # ==============================================================================
@@ -670,10 +581,46 @@ def ejecutar_pipeline(
     min_rating: float = 3.0,
     extraer_emails: bool = True,
     extraer_wpp: bool = True,
-    delay: int = 2
+    delay: float = 0,
+    concurrencia: int = CONCURRENCIA_GLOBAL,
+    por_host: int = CONCURRENCIA_POR_HOST,
+    paginas_wpp: int = PAGINAS_CONCURRENTES,
+    paginas_por_navegador: int = PAGINAS_POR_NAVEGADOR,
+    teselar: bool = True,
+    usar_cache: bool = True,
+    ttl_cache_horas: float = TTL_HORAS,
+    paginas_por_dominio: int = PAGINAS_POR_DOMINIO,
+    reanudar: Optional[str] = None,
+    procesos_parseo: int = PROCESOS_PARSEO,
+    cola_parseo: int = PROFUNDIDAD_COLA,
+    exportar: Optional[List[str]] = None,
+    saltear_caidos: bool = True
 ):
     """
     Ejecuta el pipeline completo.
+
+    Las webs se descargan primero en paralelo, una sola vez cada una
+    (`concurrencia` descargas en total, `por_host` por dominio al
+    arrancar, adaptativo: ver `limite_por_host`), y sobre cada página
+    corren todos los `EXTRACTORES_WEB` (emails, WhatsApp, señales de
+    JavaScript, redes, carta); si la home no tiene emails se siguen hasta
+    `paginas_por_dominio` páginas de contacto. El HTML se parsea en
+    `procesos_parseo` procesos con una cola de `cola_parseo` páginas,
+    aparte de la red. Solo las webs sin WhatsApp en el HTML estático que
+    dependen de JavaScript van a un pool de `paginas_wpp` páginas
+    Playwright persistentes; `delay` es la pausa de cada página entre una
+    URL y la siguiente.
+
+    Con `saltear_caidos`, los dominios que fallaron DNS, conexión o
+    timeout en corridas anteriores (o dos veces en esta) no se piden ni
+    se abren en el navegador: ver `dominios_caidos`.
+
+    Cada etapa terminada de cada negocio queda en el diario de la
+    corrida; con `reanudar=<run-id>` se retoma la cola guardada y se
+    saltean los negocios ya procesados.
+
+    La base queda en Parquet; `exportar` (['csv', 'json']) genera además
+    esas exportaciones al final.
     """
     logger.info("\n" + "="*80)
     logger.info("🚀 INICIANDO PIPELINE COMPLETO DE LEADS GASTRONÓMICOS")
@@ -683,47 +630,190 @@ def ejecutar_pipeline(
     logger.info(f"   Rating mínimo: {min_rating}")
     logger.info(f"   Extraer emails: {extraer_emails}")
     logger.info(f"   Extraer WhatsApp: {extraer_wpp}")
+    logger.info(f"   Concurrencia: {concurrencia} global / {por_host} por host (inicial, adaptativa)")
+    logger.info(f"   Parseo: {procesos_parseo} procesos (cola de {cola_parseo} páginas)")
+    logger.info(f"   Páginas WhatsApp: {paginas_wpp} (reinicio cada {paginas_por_navegador})")
     logger.info("="*80 + "\n")
     
-    # 1. Cargar base existente
-    db_existente = cargar_base_datos_existente()
+    METRICAS.reiniciar()
     
-    # 2. Buscar negocios en DataForSEO
-    negocios = buscar_negocios_dataforseo(categorias, limite, min_rating)
+    # 1. Compactar lo que haya quedado de una corrida anterior
+    with METRICAS.etapa('compactacion_previa'):
+        compactar_base_datos()
+    
+    if reanudar:
+        corrida = DiarioCorrida.reanudar(reanudar)
+    else:
+        corrida = DiarioCorrida.nueva('pipeline_completo', {
+            'categorias': categorias, 'limite': limite, 'min_rating': min_rating,
+            'extraer_emails': extraer_emails, 'extraer_wpp': extraer_wpp, 'teselar': teselar
+        })
+    
+    # 2. Buscar negocios en DataForSEO (o retomar la cola de la corrida)
+    negocios = corrida.cargar_cola()
+    if negocios is None:
+        with METRICAS.etapa('busqueda_dataforseo'):
+            negocios = buscar_negocios_dataforseo(categorias, limite, min_rating, teselar=teselar)
+        corrida.guardar_cola(negocios)
     
     if not negocios:
         logger.error("❌ No se encontraron negocios")
+        corrida.cerrar()
         return
     
-    # 3. Procesar cada negocio
-    logger.info(f"\n🔄 Procesando {len(negocios)} negocios...\n")
+    pendientes = corrida.pendientes(negocios, ETAPA_REGISTRO)
+    if len(pendientes) < len(negocios):
+        logger.info(f"⏭️  {len(negocios) - len(pendientes)} negocios ya procesados en la corrida, quedan {len(pendientes)}")
     
-    registros = []
-    for i, negocio in enumerate(negocios, 1):
-        logger.info(f"\n[{i}/{len(negocios)}] Procesando: {negocio.get('title', 'Sin título')}")
-        
-        registro = procesar_negocio(negocio, extraer_emails, extraer_wpp)
-        registros.append(registro)
+    # Clasificar cadenas y plataformas de los negocios pendientes en una pasada
+    clasificaciones = clasificar_negocios(pendientes)
+    con_web_propia = [
+        n for n, c in zip(pendientes, clasificaciones)
+        if n.get('url') and not c['es_plataforma'] and not c['es_cadena']
+    ]
+    
+    # Registro de dominios caídos, compartido por las descargas y el navegador
+    caidos = RegistroDominiosCaidos() if saltear_caidos else None
+    
+    # Resolver el DNS de todas las webs de una vez: las que no existen
+    # (NXDOMAIN) no se descargan ni se abren en el navegador
+    dns = CacheDNS()
+    sin_dns: Set[str] = set()
+    if (extraer_emails or extraer_wpp) and con_web_propia:
+        inexistentes = prerresolver_urls((n['url'] for n in con_web_propia), dns)
+        sin_dns = {n['url'] for n in con_web_propia if host_de(n['url']) in inexistentes}
+        if sin_dns:
+            logger.info(f"   🚫 {len(sin_dns)} webs descartadas: el dominio no existe")
+            for url in sin_dns:
+                if caidos is not None:
+                    caidos.registrar_falla(url, DNS)
+            con_web_propia = [n for n in con_web_propia if n['url'] not in sin_dns]
+    
+    # 3. Descargar en paralelo las webs propias una sola vez: emails,
+    # WhatsApp estático, señales de JavaScript, redes y carta salen del
+    # mismo documento (ver `enriquecimiento`)
+    emails_por_url: Dict[str, Set[str]] = {url: set() for url in sin_dns}
+    datos_web: Dict[str, Dict[str, Any]] = {}
+    if extraer_emails or extraer_wpp:
+        cache = CacheHTTP(ttl_horas=ttl_cache_horas) if usar_cache else None
+        por_url: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for n in con_web_propia:
+            if extraer_emails and corrida.completado(n, ETAPA_EMAILS):
+                datos = corrida.datos(n, ETAPA_EMAILS)
+                # Corridas viejas guardaban solo la lista de emails
+                datos_web[n['url']] = datos if isinstance(datos, dict) else {'emails_pipeline': datos or []}
+            elif extraer_emails or not n.get('phone'):
+                por_url[n['url']].append(n)
         
-        # Guardar progreso cada 10
-        if i % 10 == 0:
-            consolidar_y_guardar(registros, db_existente)
-            db_existente = cargar_base_datos_existente()
-            registros = []
+        def registrar_web(url: str, datos: Dict[str, Any]) -> None:
+            if extraer_emails:
+                for n in por_url[url]:
+                    corrida.marcar(n, ETAPA_EMAILS, datos)
         
-        # Delay entre requests
-        if i < len(negocios):
-            time.sleep(delay)
+        extractores = [e for e in EXTRACTORES_WEB if extraer_emails or e != 'emails_pipeline']
+        paginas = paginas_por_dominio if extraer_emails else 1
+        logger.info(f"\n🌐 Rastreando {len(por_url)} webs en paralelo "
+                    f"(hasta {paginas} páginas por sitio; {', '.join(extractores)})...")
+        with METRICAS.etapa('rastreo_web'):
+            try:
+                datos_web.update(enriquecer_sitios(
+                    list(por_url), extractores,
+                    criterio='emails_pipeline' if extraer_emails else None,
+                    concurrencia=concurrencia, por_host=por_host, timeout=10,
+                    cache=cache,
+                    paginas_por_dominio=paginas,
+                    al_completar=registrar_web,
+                    procesos_parseo=procesos_parseo,
+                    profundidad_cola=cola_parseo,
+                    caidos=caidos,
+                    resolver=dns
+                ))
+            finally:
+                if cache is not None:
+                    cache.cerrar()
+        if extraer_emails:
+            emails_por_url.update(
+                (url, set(datos.get('emails_pipeline') or ())) for url, datos in datos_web.items()
+            )
     
-    # 4. Guardar registros finales
-    if registros:
-        consolidar_y_guardar(registros, db_existente)
+    # 4. WhatsApp de las webs sin teléfono de Google: ya salió del HTML
+    # estático del rastreo; al pool de navegadores van solo las que
+    # dependen de JavaScript
+    pool = None
+    detecciones_wpp: Dict[str, DeteccionWhatsapp] = {}
+    if extraer_wpp:
+        for n in con_web_propia:
+            datos = datos_web.get(n['url'])
+            # Sin 'whatsapp' (corrida vieja): procesar_negocio descarga la web
+            if not n.get('phone') and datos is not None and (not datos or 'whatsapp' in datos):
+                detecciones_wpp[n['url']] = contar_deteccion(DeteccionWhatsapp.de_resultados(datos))
+        encontrados = sum(1 for d in detecciones_wpp.values() if d.numero)
+        a_navegador = [url for url, d in detecciones_wpp.items() if d.escalar]
+        logger.info(
+            f"📱 WhatsApp en HTML estático: {encontrados}/{len(detecciones_wpp)} webs resueltas, "
+            f"{len(a_navegador)} necesitan navegador"
+        )
+        if a_navegador:
+            pool = PoolNavegadores(
+                paginas=paginas_wpp,
+                paginas_por_navegador=paginas_por_navegador,
+                pausa=delay,
+                caidos=caidos,
+                extractores=EXTRACTORES_NAVEGADOR
+            ).iniciar()
+            for url in a_navegador:
+                pool.enviar(url)
+    
+    # 5. Procesar cada negocio pendiente
+    logger.info(f"\n🔄 Procesando {len(pendientes)} negocios...\n")
+    
+    diario = DiarioRegistros(DB_DIARIO)
+    try:
+        with METRICAS.etapa('procesamiento'):
+            for i, (negocio, clasificacion) in enumerate(zip(pendientes, clasificaciones), 1):
+                logger.info(f"\n[{i}/{len(pendientes)}] Procesando: {negocio.get('title', 'Sin título')}")
+            
+                registro = procesar_negocio(
+                    negocio, extraer_emails, extraer_wpp and negocio.get('url') not in sin_dns,
+                    emails_precalculados=emails_por_url.get(negocio.get('url', '')),
+                    pool=pool,
+                    clasificacion=clasificacion,
+                    deteccion_whatsapp=detecciones_wpp.get(negocio.get('url', '')),
+                    datos_web=datos_web.get(negocio.get('url', ''))
+                )
+            
+                # Guardar progreso: O(1) por registro, sin reescribir la base
+                diario.agregar(registro)
+                corrida.marcar(negocio, ETAPA_REGISTRO)
+                METRICAS.contar('negocios_total', resultado='procesado')
+                METRICAS.contar('negocios_total', bool(registro['emails']), resultado='con_email')
+                METRICAS.contar('negocios_total', bool(registro['whatsapp']), resultado='con_whatsapp')
+    finally:
+        diario.cerrar()
+        corrida.cerrar()
+        if pool is not None:
+            pool.cerrar()
+        if caidos is not None:
+            caidos.cerrar()
+        dns.cerrar()
+    
+    corrida.marcar_completada()
+    
+    # 6. Deduplicar y guardar una sola vez
+    with METRICAS.etapa('consolidacion'):
+        compactar_base_datos()
+    if exportar:
+        with METRICAS.etapa('exportacion'):
+            exportar_base_datos(exportar)
+    METRICAS.exportar('pipeline_completo', corrida.run_id)
     
     logger.info("\n" + "="*80)
     logger.info("✅ PIPELINE COMPLETADO")
     logger.info("="*80)
-    logger.info(f"\n📁 Base de datos consolidada: {DB_CONSOLIDADA}")
-    logger.info(f"📁 Archivo JSON: {DB_JSON}\n")
+    logger.info(f"\n📁 Base de datos consolidada: {DB_PARQUET}")
+    for formato in exportar or []:
+        logger.info(f"📁 Exportación {formato.upper()}: {EXPORTACIONES[formato]}")
+    logger.info("")
 
 
 # ==============================================================================
@@ -732,36 +822,86 @@ def ejecutar_pipeline(
 
 def main():
     parser = argparse.ArgumentParser(description='Pipeline completo de extracción de leads gastronómicos')
+    parser.add_argument('--compactar', action='store_true',
+                        help='Solo compactar el diario en la base consolidada y salir')
+    parser.add_argument('--exportar', nargs='+', choices=sorted(EXPORTACIONES), default=[],
+                        help='Exportar la base consolidada a CSV y/o JSON')
     parser.add_argument('--categorias', nargs='+', choices=['bares', 'restaurantes', 'cafeterias'],
                         default=['bares', 'restaurantes', 'cafeterias'],
                         help='Categorías a buscar')
     parser.add_argument('--limite', type=int, default=1000,
-                        help='Límite de resultados por categoría')
+                        help='Límite de resultados por consulta (por tesela si se tesela)')
     parser.add_argument('--min-rating', type=float, default=3.0,
                         help='Rating mínimo')
     parser.add_argument('--skip-emails', action='store_true',
                         help='No extraer emails')
     parser.add_argument('--skip-whatsapp', action='store_true',
                         help='No extraer WhatsApp')
-    parser.add_argument('--delay', type=int, default=2,
-                        help='Delay entre requests en segundos')
+    parser.add_argument('--sin-teselar', action='store_true',
+                        help='Una sola búsqueda sobre todo CABA (trunca en 1000)')
+    parser.add_argument('--delay', type=float, default=0,
+                        help='Pausa de cada página Playwright entre URLs, en segundos')
+    parser.add_argument('--concurrencia', type=int, default=CONCURRENCIA_GLOBAL,
+                        help='Descargas simultáneas en total')
+    parser.add_argument('--por-host', type=int, default=CONCURRENCIA_POR_HOST,
+                        help='Descargas simultáneas iniciales por dominio (se adapta según 429/5xx/timeouts)')
+    parser.add_argument('--sin-cache', action='store_true',
+                        help='No usar la cache HTTP en disco')
+    parser.add_argument('--sin-registro-caidos', action='store_true',
+                        help='No saltear ni registrar dominios caídos (DNS, conexión, timeout)')
+    parser.add_argument('--ttl-cache-horas', type=float, default=TTL_HORAS,
+                        help='Horas que una web cacheada se usa sin revalidar')
+    parser.add_argument('--paginas-wpp', type=int, default=PAGINAS_CONCURRENTES,
+                        help='Páginas Playwright concurrentes para WhatsApp')
+    parser.add_argument('--paginas-por-navegador', type=int, default=PAGINAS_POR_NAVEGADOR,
+                        help='Reiniciar cada navegador tras esta cantidad de páginas')
+    parser.add_argument('--paginas-por-dominio', type=int, default=PAGINAS_POR_DOMINIO,
+                        help='Páginas por sitio al buscar emails (1 = solo la home)')
+    parser.add_argument('--procesos-parseo', type=int, default=PROCESOS_PARSEO,
+                        help='Procesos que parsean HTML (0 = un thread del mismo proceso)')
+    parser.add_argument('--cola-parseo', type=int, default=PROFUNDIDAD_COLA,
+                        help='Páginas descargadas que pueden esperar parseo')
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help='Reanudar una corrida interrumpida (id en resultados/corridas/)')
     
     args = parser.parse_args()
     
+    if args.compactar:
+        compactar_base_datos()
+        if args.exportar:
+            exportar_base_datos(args.exportar)
+        return
+    
     # Expandir categorías
     categorias_expandidas = []
     for cat in args.categorias:
         categorias_expandidas.extend(CATEGORIAS_DISPONIBLES.get(cat, []))
     
     # Ejecutar pipeline
-    ejecutar_pipeline(
-        categorias=categorias_expandidas,
-        limite=args.limite,
-        min_rating=args.min_rating,
-        extraer_emails=not args.skip_emails,
-        extraer_wpp=not args.skip_whatsapp,
-        delay=args.delay
-    )
+    try:
+        ejecutar_pipeline(
+            categorias=categorias_expandidas,
+            limite=args.limite,
+            min_rating=args.min_rating,
+            extraer_emails=not args.skip_emails,
+            extraer_wpp=not args.skip_whatsapp,
+            delay=args.delay,
+            concurrencia=args.concurrencia,
+            por_host=args.por_host,
+            paginas_wpp=args.paginas_wpp,
+            paginas_por_navegador=args.paginas_por_navegador,
+            teselar=not args.sin_teselar,
+            usar_cache=not args.sin_cache,
+            ttl_cache_horas=args.ttl_cache_horas,
+            paginas_por_dominio=args.paginas_por_dominio,
+            reanudar=args.resume,
+            procesos_parseo=args.procesos_parseo,
+            cola_parseo=args.cola_parseo,
+            exportar=args.exportar,
+            saltear_caidos=not args.sin_registro_caidos
+        )
+    except CorridaNoEncontrada as e:
+        logger.error(f"❌ {e}")
 
 
 if __name__ == "__main__":
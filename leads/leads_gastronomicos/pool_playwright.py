@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+POOL PERSISTENTE DE NAVEGADORES PLAYWRIGHT
+==========================================
+Mantiene N navegadores Chromium vivos (uno por hilo trabajador, porque la
+API síncrona de Playwright no se puede compartir entre hilos). Cada
+trabajador reutiliza su contexto y su página entre URLs, y reinicia el
+navegador cada K páginas o cuando se cae.
+
+Así el costo por URL es solo la navegación, no el arranque de Chromium.
+Las páginas no bajan imágenes, fuentes, CSS ni trackers y, en vez de
+dormir 3s, esperan a que aparezca un enlace de WhatsApp o a que la red
+quede inactiva (`extraccion_whatsapp.esperar_whatsapp`).
+Sobre el DOM renderizado corren los extractores de `enriquecimiento` que
+se pidan (por defecto solo `whatsapp`), así una visita sirve también para
+los emails que arma JavaScript.
+Con un `RegistroDominiosCaidos` las URLs de dominios vetados o cortados
+se resuelven al instante (sin WhatsApp) en vez de esperar el timeout de
+30s, y un error de red de la página no reinicia el navegador. Un timeout
+de navegación no cuenta como dominio caído: la página existe, solo tarda.
+
+Uso:
+    with PoolNavegadores(paginas=4) as pool:
+        for url in urls:
+            pool.enviar(url)                   # encola sin bloquear
+        telefono = pool.extraer_whatsapp(url)  # espera el resultado
+        datos = pool.enriquecer(url)           # {extractor: valor}, None si falló
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Sequence
+
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+
+from dominios_caidos import RegistroDominiosCaidos, clasificar_excepcion
+from enriquecimiento import Documento, enriquecer
+from extraccion_whatsapp import ActividadRed, bloquear_recursos, esperar_whatsapp
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+PAGINAS_CONCURRENTES = 4
+PAGINAS_POR_NAVEGADOR = 50
+TIMEOUT_SEGUNDOS = 30
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+VIEWPORT = {'width': 1920, 'height': 1080}
+
+
+class PoolNavegadores:
+    """Pool de navegadores con páginas recicladas para extraer WhatsApp"""
+
+    def __init__(
+        self,
+        paginas: int = PAGINAS_CONCURRENTES,
+        paginas_por_navegador: int = PAGINAS_POR_NAVEGADOR,
+        timeout: int = TIMEOUT_SEGUNDOS,
+        pausa: float = 0.0,
+        caidos: Optional[RegistroDominiosCaidos] = None,
+        extractores: Sequence[str] = ('whatsapp',)
+    ):
+        self.paginas = max(1, paginas)
+        self.paginas_por_navegador = max(1, paginas_por_navegador)
+        self.timeout = timeout
+        self.pausa = pausa
+        self.caidos = caidos
+        self.extractores = tuple(extractores)
+        self._cola: 'queue.Queue' = queue.Queue()
+        self._futuros: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._hilos = []
+        self.reinicios = 0
+
+    # --------------------------------------------------------------------------
+    # Ciclo de vida
+    # --------------------------------------------------------------------------
+
+    def iniciar(self) -> 'PoolNavegadores':
+        for n in range(self.paginas):
+            hilo = threading.Thread(
+                target=self._trabajador, name=f'playwright-{n}', daemon=True
+            )
+            hilo.start()
+            self._hilos.append(hilo)
+        logger.info(f"🧭 Pool Playwright iniciado: {self.paginas} páginas concurrentes")
+        return self
+
+    def cerrar(self) -> None:
+        for _ in self._hilos:
+            self._cola.put(None)
+        for hilo in self._hilos:
+            hilo.join()
+        self._hilos = []
+        logger.info(f"🧭 Pool Playwright cerrado ({self.reinicios} reinicios de navegador)")
+
+    def __enter__(self) -> 'PoolNavegadores':
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+    # --------------------------------------------------------------------------
+    # API
+    # --------------------------------------------------------------------------
+
+    def enviar(self, url: str) -> Future:
+        """Encola una URL (una sola vez por URL) y devuelve su Future"""
+        with self._lock:
+            futuro = self._futuros.get(url)
+            if futuro is None:
+                futuro = Future()
+                self._futuros[url] = futuro
+                self._cola.put((url, futuro))
+            return futuro
+
+    def enriquecer(self, url: str) -> Optional[Dict[str, Any]]:
+        """Encola la URL si hace falta y espera los resultados de los extractores"""
+        return self.enviar(url).result()
+
+    def extraer_whatsapp(self, url: str) -> Optional[str]:
+        """Encola la URL si hace falta y espera el teléfono encontrado"""
+        return (self.enriquecer(url) or {}).get('whatsapp')
+
+    # --------------------------------------------------------------------------
+    # Trabajadores
+    # --------------------------------------------------------------------------
+
+    def _abrir_navegador(self, p):
+        navegador = p.chromium.launch(headless=True)
+        contexto = navegador.new_context(user_agent=USER_AGENT, viewport=VIEWPORT)
+        bloquear_recursos(contexto)
+        pagina = contexto.new_page()
+        return navegador, pagina, ActividadRed(pagina)
+
+    @staticmethod
+    def _cerrar_navegador(navegador) -> None:
+        if navegador is None:
+            return
+        try:
+            navegador.close()
+        except Exception:
+            pass
+
+    def _visitar(self, pagina, red: ActividadRed, url: str) -> Dict[str, Any]:
+        red.reiniciar()
+        pagina.goto(url, timeout=self.timeout * 1000, wait_until='domcontentloaded')
+        esperar_whatsapp(pagina, red)
+        documento = Documento(url, url_final=pagina.url, html_renderizado=pagina.content())
+        return enriquecer(documento, self.extractores)
+
+    def _trabajador(self) -> None:
+        try:
+            p = sync_playwright().start()
+        except Exception as e:
+            logger.error(f"❌ No se pudo iniciar Playwright: {str(e)[:80]}")
+            p = None
+
+        navegador = None
+        pagina = None
+        red = None
+        usadas = 0
+
+        while True:
+            item = self._cola.get()
+            if item is None:
+                break
+            url, futuro = item
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            if p is None or (self.caidos is not None and self.caidos.bloqueado(url)):
+                METRICAS.contar('playwright_visitas_total', resultado='salteado')
+                futuro.set_result(None)
+                continue
+
+            inicio = None
+            try:
+                if pagina is None or usadas >= self.paginas_por_navegador or not navegador.is_connected():
+                    if navegador is not None:
+                        self.reinicios += 1
+                    self._cerrar_navegador(navegador)
+                    navegador, pagina, red = self._abrir_navegador(p)
+                    usadas = 0
+                usadas += 1
+                inicio = time.monotonic()
+                resultados = self._visitar(pagina, red, url)
+                METRICAS.contar('playwright_visitas_total', resultado='ok')
+                if self.caidos is not None:
+                    self.caidos.registrar_exito(url)
+                futuro.set_result(resultados)
+            except PlaywrightTimeoutError:
+                # Una página pesada que no llega a domcontentloaded sigue viva
+                # (la descarga estática acaba de responder): no va al registro
+                logger.debug(f"Timeout extrayendo WhatsApp de {url}")
+                METRICAS.contar('playwright_visitas_total', resultado='timeout')
+                futuro.set_result(None)
+            except Exception as e:
+                if not futuro.done():
+                    futuro.set_result(None)
+                if 'net::ERR_' in str(e):
+                    # El sitio no responde (DNS, conexión, TLS): el navegador está sano
+                    METRICAS.contar('playwright_visitas_total', resultado='caido')
+                    logger.debug(f"Sitio caído extrayendo WhatsApp de {url}: {str(e)[:50]}")
+                    if self.caidos is not None:
+                        self.caidos.registrar_falla(url, clasificar_excepcion(e))
+                else:
+                    # Navegador o página caídos: se reinicia en la próxima URL
+                    METRICAS.contar('playwright_visitas_total', resultado='error')
+                    logger.debug(f"Error extrayendo WhatsApp de {url}: {str(e)[:50]}")
+                    if navegador is not None:
+                        self.reinicios += 1
+                    self._cerrar_navegador(navegador)
+                    navegador, pagina, red = None, None, None
+
+            if inicio is not None:
+                METRICAS.observar('playwright_segundos', time.monotonic() - inicio)
+            if self.pausa:
+                time.sleep(self.pausa)
+
+        self._cerrar_navegador(navegador)
+        if p is not None:
+            p.stop()
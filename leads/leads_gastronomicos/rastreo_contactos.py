@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RASTREO DE CONTACTO POR SITIO (CON PRESUPUESTO)
+===============================================
+`extraer_emails_de_url` solo mira la home, así que los emails que están
+en /contacto, /reservas o en páginas enlazadas desde el footer se pierden.
+
+Acá cada sitio se rastrea con un presupuesto fijo:
+
+1. Se descarga la home; si ya tiene emails, se corta ahí.
+2. Los enlaces internos se puntúan según qué tan probable es que sean de
+   contacto (path + texto del enlace) y van a una frontera con prioridad.
+   Enlaces sin puntaje no se siguen.
+3. Se visitan los mejores de la frontera hasta encontrar un email o
+   agotar el presupuesto de páginas / bytes del dominio.
+
+Todos los sitios se rastrean a la vez sobre un mismo `MotorDescargas`,
+así que los límites de concurrencia global y por host siguen valiendo.
+El parseo corre aparte, en un `PoolParseo`: cada página se lee una vez en
+un `enriquecimiento.Documento` y sobre él corren todos los extractores
+pedidos (emails, WhatsApp, redes...) más la búsqueda de enlaces. El
+rastreo sigue mientras el extractor `criterio` no encuentre nada.
+
+Cada sitio se rastrea una sola vez por corrida: las URLs se agrupan por
+clave canónica (`urls_canonicas.clave_url`) y, si dos homes distintas
+redirigen a la misma URL final, el segundo rastreo espera al primero. El
+resultado se reparte a todas las URLs (y negocios) que apuntaban ahí.
+
+Uso:
+    from rastreo_contactos import enriquecer_sitios, extraer_emails_de_sitios
+    emails_por_url = extraer_emails_de_sitios(urls, extraer_emails_de_html)
+    datos_por_url = enriquecer_sitios(urls, ['emails_pipeline', 'whatsapp'], criterio='emails_pipeline')
+"""
+
+import asyncio
+import heapq
+import logging
+import re
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
+
+from cache_http import CacheHTTP
+from descarga_concurrente import (
+    MotorDescargas, Respuesta,
+    CONCURRENCIA_GLOBAL, CONCURRENCIA_POR_HOST, TIMEOUT_SEGUNDOS
+)
+from dominios_caidos import RegistroDominiosCaidos
+from enriquecimiento import (
+    Documento, Extractor, EXTRACTORES, anclas_de_html, combinar_resultados, enriquecer
+)
+from metricas import METRICAS
+from parseo_paralelo import PoolParseo, PROCESOS_PARSEO, PROFUNDIDAD_COLA
+from resolucion_dns import CacheDNS
+from urls_canonicas import UnVuelo, clave_url
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+# Presupuesto por dominio (la home cuenta como una página)
+PAGINAS_POR_DOMINIO = 4
+BYTES_POR_DOMINIO = 2 * 1024 * 1024
+
+# Enlaces candidatos que se guardan por sitio
+MAX_FRONTERA = 30
+
+# Palabras en el path o en el texto del enlace -> puntaje
+PALABRAS_CONTACTO = {
+    'contacto': 10, 'contactanos': 10, 'contáctanos': 10, 'contact': 10, 'contacts': 10,
+    'reservas': 7, 'reserva': 7, 'reservar': 7, 'reservations': 7, 'booking': 6,
+    'eventos': 4, 'events': 4, 'franquicias': 4,
+    'nosotros': 3, 'quienes-somos': 3, 'quienessomos': 3, 'about': 3, 'about-us': 3,
+    'ubicacion': 3, 'ubicación': 3, 'sucursales': 3, 'locales': 3, 'donde-estamos': 3,
+    'trabaja-con-nosotros': 2, 'legal': 1, 'privacidad': 1, 'privacy': 1,
+}
+
+# Extensiones que nunca son páginas HTML
+EXTENSIONES_NO_HTML = (
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico', '.pdf',
+    '.zip', '.rar', '.mp4', '.mp3', '.css', '.js', '.json', '.xml', '.woff', '.ttf'
+)
+
+_PALABRAS = re.compile(r'[a-záéíóúñ]+')
+_COMPUESTAS = re.compile(r'[a-záéíóúñ]+(?:-[a-záéíóúñ]+)+')
+
+
+def _sitio(url: str) -> str:
+    """Host sin 'www.' (dos URLs del mismo sitio comparten este valor)"""
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def _sin_fragmento(url: str) -> str:
+    partes = urlsplit(url)
+    return urlunsplit((partes.scheme, partes.netloc, partes.path or '/', partes.query, ''))
+
+
+def puntuar_enlace(url: str, texto: str = '') -> int:
+    """Puntaje de contacto de un enlace; 0 = no vale la pena seguirlo"""
+    path = urlsplit(url).path.lower()
+    if path.endswith(EXTENSIONES_NO_HTML):
+        return 0
+    palabras = set()
+    for fuente in (path, texto.lower()):
+        palabras.update(_PALABRAS.findall(fuente))
+        palabras.update(_COMPUESTAS.findall(fuente))
+    return max((PALABRAS_CONTACTO.get(p, 0) for p in palabras), default=0)
+
+
+def enlaces_internos(html: str, url_base: str) -> List[Tuple[int, str]]:
+    """(puntaje, url) de los enlaces del mismo sitio con puntaje > 0"""
+    return enlaces_de_contacto(anclas_de_html(html, url_base), url_base)
+
+
+def enlaces_de_contacto(anclas: Iterable[Tuple[str, str]], url_base: str) -> List[Tuple[int, str]]:
+    """Igual que `enlaces_internos`, sobre las anclas ya extraídas de un `Documento`"""
+    sitio = _sitio(url_base)
+    enlaces = []
+    for url, texto in anclas:
+        if _sitio(url) != sitio:
+            continue
+        puntaje = puntuar_enlace(url, texto)
+        if puntaje > 0:
+            enlaces.append((puntaje, url))
+    return enlaces
+
+
+# ==============================================================================
+# RASTREO
+# ==============================================================================
+
+@dataclass
+class EstadisticasRastreo:
+    """Contadores de una corrida de rastreo"""
+    sitios: int = 0
+    paginas: int = 0
+    bytes: int = 0
+    sitios_con_email: int = 0
+    emails_fuera_de_home: int = 0
+    sin_presupuesto: int = 0
+
+
+def analizar_pagina(
+    extractores: Sequence[Extractor],
+    criterio: Optional[str],
+    html: str,
+    url_base: str
+) -> Tuple[Dict[str, Any], List[Tuple[int, str]]]:
+    """
+    Resultados de los extractores sobre una página y, si el de `criterio`
+    no encontró nada, sus enlaces de contacto.
+    Corre en los workers de `PoolParseo` (por eso es de nivel de módulo).
+    """
+    documento = Documento(url_base, texto=html)
+    resultados = enriquecer(documento, extractores)
+    if criterio is None or resultados.get(criterio):
+        return resultados, []
+    return resultados, enlaces_de_contacto(documento.anclas, url_base)
+
+
+_SIN_DESCARGAR = object()
+
+Analizador = Callable[[str, Optional[Respuesta]], Awaitable[Tuple[Dict[str, Any], List[Tuple[int, str]]]]]
+
+
+async def rastrear_sitio(
+    motor: MotorDescargas,
+    url: str,
+    analizar: Analizador,
+    paginas: int = PAGINAS_POR_DOMINIO,
+    bytes_max: int = BYTES_POR_DOMINIO,
+    estadisticas: Optional[EstadisticasRastreo] = None,
+    respuesta_inicial: Any = _SIN_DESCARGAR,
+    criterio: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Rastrea un sitio desde `url` hasta que el extractor `criterio`
+    encuentre algo o se agote el presupuesto. Devuelve los resultados de
+    cada página visitada, en orden (ver `combinar_resultados`).
+
+    `analizar(url, respuesta)` devuelve (resultados, enlaces puntuados) de
+    una página (ver `analizar_pagina`). Si ya se descargó la home, se pasa
+    en `respuesta_inicial` (puede ser None si falló) y no se vuelve a pedir.
+    """
+    stats = estadisticas or EstadisticasRastreo()
+    stats.sitios += 1
+
+    frontera: List[Tuple[int, int, str]] = []   # (-puntaje, orden, url)
+    vistas = {_sin_fragmento(url)}
+    orden = 0
+    visitadas = 0
+    consumidos = 0
+    actual: Optional[str] = url
+    paginas_leidas: List[Dict[str, Any]] = []
+
+    while actual is not None:
+        if visitadas == 0 and respuesta_inicial is not _SIN_DESCARGAR:
+            respuesta = respuesta_inicial
+        else:
+            respuesta = await motor.descargar(actual)
+        visitadas += 1
+        stats.paginas += 1
+
+        resultados, enlaces = await analizar(actual, respuesta)
+        if resultados:
+            paginas_leidas.append(resultados)
+        if criterio is not None and resultados.get(criterio):
+            stats.sitios_con_email += 1
+            if visitadas > 1:
+                stats.emails_fuera_de_home += 1
+            return paginas_leidas
+
+        if respuesta is not None and respuesta.es_html:
+            tamano = len(respuesta.contenido) or len(respuesta.texto.encode('utf-8', errors='replace'))
+            consumidos += tamano
+            stats.bytes += tamano
+            for puntaje, enlace in enlaces:
+                if enlace not in vistas and len(vistas) <= MAX_FRONTERA:
+                    vistas.add(enlace)
+                    orden += 1
+                    heapq.heappush(frontera, (-puntaje, orden, enlace))
+
+        actual = None
+        if frontera and (visitadas >= paginas or consumidos >= bytes_max):
+            stats.sin_presupuesto += 1
+        elif frontera:
+            actual = heapq.heappop(frontera)[2]
+
+    return paginas_leidas
+
+
+# ==============================================================================
+# API SÍNCRONA PARA LOS PIPELINES
+# ==============================================================================
+
+def enriquecer_sitios(
+    urls: Iterable[str],
+    extractores: Sequence[Union[str, Extractor]],
+    criterio: Optional[str] = None,
+    concurrencia: int = CONCURRENCIA_GLOBAL,
+    por_host: int = CONCURRENCIA_POR_HOST,
+    timeout: int = TIMEOUT_SEGUNDOS,
+    cache: Optional[CacheHTTP] = None,
+    paginas_por_dominio: int = PAGINAS_POR_DOMINIO,
+    bytes_por_dominio: int = BYTES_POR_DOMINIO,
+    al_completar: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    procesos_parseo: int = PROCESOS_PARSEO,
+    profundidad_cola: int = PROFUNDIDAD_COLA,
+    caidos: Optional[RegistroDominiosCaidos] = None,
+    resolver: Optional[CacheDNS] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Descarga cada sitio una vez y corre todos los `extractores` (nombres
+    del registro de `enriquecimiento` o instancias de `Extractor`) sobre
+    cada página. Devuelve {url: {extractor: valor}}, con los valores de
+    las páginas del sitio juntados según el `combinar` de cada extractor;
+    {} si no se pudo leer ninguna página HTML.
+
+    Si la home no da resultado para `criterio`, se sigue por las páginas
+    de contacto del sitio, dentro del presupuesto. Sin `criterio` (o con
+    `paginas_por_dominio=1`) solo se mira la home.
+
+    El parseo corre en un `PoolParseo` de `procesos_parseo` workers con
+    una cola de `profundidad_cola` páginas, aparte de las descargas; las
+    funciones de los extractores tienen que ser de nivel de módulo en un
+    módulo importable.
+    Con `cache`, los resultados de cada página se guardan por extractor
+    y un hit fresco o un 304 no vuelve a parsear.
+
+    `al_completar(url, resultados)` se llama apenas termina cada sitio
+    (p. ej. para registrarlo en el diario de la corrida), una vez por cada
+    URL de `urls` aunque varias compartan el rastreo.
+
+    Con `caidos`, los sitios de dominios vetados o cortados en la corrida
+    no se piden (quedan sin resultados) y las fallas de red se registran.
+    `resolver` es la `CacheDNS` de la pre-resolución, compartida con las
+    descargas.
+    """
+    usados = tuple(e if isinstance(e, Extractor) else EXTRACTORES[e] for e in extractores)
+    nombres = [e.nombre for e in usados]
+    if criterio is not None and criterio not in nombres:
+        raise ValueError(f"El criterio '{criterio}' no está entre los extractores pedidos")
+    paginas = max(1, paginas_por_dominio) if criterio is not None else 1
+
+    unicas = list(dict.fromkeys(u for u in urls if u))
+    grupos: Dict[str, List[str]] = {}
+    for url in unicas:
+        grupos.setdefault(clave_url(url), []).append(url)
+    stats = EstadisticasRastreo()
+    sitios = UnVuelo(recordar=True)     # por clave de la URL final de la home
+
+    async def _correr() -> Dict[str, Dict[str, Any]]:
+        resultados: Dict[str, Dict[str, Any]] = {}
+        completados = 0
+
+        async with MotorDescargas(concurrencia, por_host, timeout, cache=cache,
+                                  caidos=caidos, resolver=resolver) as motor, \
+                PoolParseo(procesos_parseo, profundidad_cola) as parseo:
+
+            async def analizar(url: str, respuesta: Optional[Respuesta]):
+                if respuesta is None or not respuesta.es_html:
+                    return {}, []
+                if cache is not None and respuesta.desde_cache:
+                    guardado = cache.resultados(url, nombres)
+                    if len(guardado) == len(nombres) and (criterio is None or guardado[criterio]):
+                        METRICAS.contar('extractor_cache_total')
+                        return guardado, []
+                inicio = time.monotonic()
+                try:
+                    pagina, enlaces = await parseo.ejecutar(
+                        analizar_pagina, usados, criterio, respuesta.texto, respuesta.url_final
+                    )
+                except Exception as e:
+                    logger.debug(f"Error procesando {url}: {str(e)[:50]}")
+                    return {}, []
+                finally:
+                    METRICAS.observar('parseo_segundos', time.monotonic() - inicio)
+                if cache is not None:
+                    cache.guardar_resultados(url, pagina)
+                return pagina, enlaces
+
+            async def _sitio_completo(url: str, home: Optional[Respuesta]) -> Dict[str, Any]:
+                paginas_leidas = await rastrear_sitio(
+                    motor, url, analizar, paginas, bytes_por_dominio, stats,
+                    respuesta_inicial=home, criterio=criterio
+                )
+                return combinar_resultados(paginas_leidas, usados) if paginas_leidas else {}
+
+            async def _uno(urls_grupo: List[str]) -> None:
+                nonlocal completados
+                url = urls_grupo[0]
+                home = await motor.descargar(url)
+                clave_final = clave_url(home.url_final) if home is not None else clave_url(url)
+                datos = await sitios.ejecutar(clave_final, lambda: _sitio_completo(url, home))
+                for url in urls_grupo:
+                    resultados[url] = dict(datos)
+                    if al_completar is not None:
+                        al_completar(url, resultados[url])
+                completados += 1
+                if completados % 100 == 0:
+                    logger.info(f"   🌐 Rastreados {completados}/{len(grupos)} sitios")
+
+            await asyncio.gather(*(_uno(g) for g in grupos.values()))
+        return resultados
+
+    resultados = asyncio.run(_correr())
+    if len(grupos) < len(unicas) or sitios.coalescidos:
+        logger.info(
+            f"🔗 {len(unicas)} URLs -> {len(grupos)} sitios canónicos, "
+            f"{sitios.coalescidos} más unificados por redirección"
+        )
+    logger.info(
+        f"🕸️  Rastreo: {stats.sitios} sitios, {stats.paginas} páginas "
+        f"({stats.paginas / max(stats.sitios, 1):.2f}/sitio), "
+        f"{stats.sitios_con_email} con {criterio or 'resultado'} ({stats.emails_fuera_de_home} fuera de la home), "
+        f"{stats.sin_presupuesto} cortados por presupuesto"
+    )
+    return resultados
+
+
+def _emails_de_extractor(extractor: Callable[[str], Set[str]], documento: Documento) -> List[str]:
+    return sorted(extractor(documento.html))
+
+
+def extraer_emails_de_sitios(
+    urls: Iterable[str],
+    extractor: Callable[[str], Set[str]],
+    concurrencia: int = CONCURRENCIA_GLOBAL,
+    por_host: int = CONCURRENCIA_POR_HOST,
+    timeout: int = TIMEOUT_SEGUNDOS,
+    cache: Optional[CacheHTTP] = None,
+    nombre_extractor: str = 'emails',
+    paginas_por_dominio: int = PAGINAS_POR_DOMINIO,
+    bytes_por_dominio: int = BYTES_POR_DOMINIO,
+    al_completar: Optional[Callable[[str, Set[str]], None]] = None,
+    procesos_parseo: int = PROCESOS_PARSEO,
+    profundidad_cola: int = PROFUNDIDAD_COLA,
+    caidos: Optional[RegistroDominiosCaidos] = None,
+    resolver: Optional[CacheDNS] = None
+) -> Dict[str, Set[str]]:
+    """
+    Igual que `extraer_emails_de_urls`, pero si la home no tiene emails
+    sigue por las páginas de contacto del sitio, dentro del presupuesto.
+    Con `paginas_por_dominio=1` se comporta como `extraer_emails_de_urls`.
+
+    Es `enriquecer_sitios` con un solo extractor, `extractor(html)`, que
+    tiene que ser una función de nivel de módulo de un módulo importable
+    (no de `__main__`: los workers de parseo no se forkean); sus
+    resultados van a la cache como `nombre_extractor`.
+    `al_completar(url, emails)` se llama apenas termina cada sitio.
+    """
+    propio = Extractor(nombre_extractor, partial(_emails_de_extractor, extractor), combinar='union')
+
+    def _al_completar(url: str, resultados: Dict[str, Any]) -> None:
+        al_completar(url, set(resultados.get(nombre_extractor) or ()))
+
+    resultados = enriquecer_sitios(
+        urls, [propio], criterio=nombre_extractor,
+        concurrencia=concurrencia, por_host=por_host, timeout=timeout, cache=cache,
+        paginas_por_dominio=paginas_por_dominio, bytes_por_dominio=bytes_por_dominio,
+        al_completar=_al_completar if al_completar is not None else None,
+        procesos_parseo=procesos_parseo, profundidad_cola=profundidad_cola,
+        caidos=caidos, resolver=resolver
+    )
+    return {url: set(r.get(nombre_extractor) or ()) for url, r in resultados.items()}
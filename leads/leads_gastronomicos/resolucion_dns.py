@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRE-RESOLUCIÓN DNS EN BLOQUE CON CACHE COMPARTIDA
+=================================================
+Cada descarga resolvía su host por separado cuando le tocaba: un dominio
+lento o inexistente trababa el lugar de la descarga antes de abrir la
+conexión, y los NXDOMAIN se descubrían recién ahí (o a los 30s en
+Playwright).
+
+`CacheDNS` es un resolver de aiohttp con cache en memoria:
+
+- `prerresolver(hosts)` resuelve todos los hosts distintos de la lista
+  de negocios a la vez (`concurrencia` consultas en vuelo, cada una con
+  `timeout`) antes de descargar nada
+- las respuestas se guardan con su TTL (el del registro si está `aiodns`
+  instalado; si no, `TTL_POR_DEFECTO`) y los NXDOMAIN con `TTL_NEGATIVO`
+- `MotorDescargas(resolver=cache)` usa la misma cache, así las descargas
+  ya no esperan al DNS; consultas simultáneas del mismo host se hacen una
+  sola vez (`urls_canonicas.UnVuelo`)
+
+Los hosts inexistentes se sacan de la lista antes de agendar descargas o
+páginas de navegador:
+
+    dns = CacheDNS()
+    inexistentes = prerresolver_urls(urls, dns)
+    urls = [u for u in urls if host_de(u) not in inexistentes]
+    extraer_emails_de_sitios(urls, ..., resolver=dns)
+
+Un error transitorio (timeout, SERVFAIL, EAI_AGAIN) no descarta el host
+ni se guarda en la cache: la descarga lo vuelve a resolver con un
+getaddrinfo normal. Solo un NXDOMAIN termina en `socket.gaierror` desde
+la cache (y en un veto `dns` de `dominios_caidos`).
+"""
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from aiohttp.abc import AbstractResolver, ResolveResult
+
+from metricas import METRICAS
+from urls_canonicas import UnVuelo
+
+try:
+    import aiodns
+except ImportError:  # opcional: sin aiodns se usa getaddrinfo (sin TTL del registro)
+    aiodns = None
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+CONCURRENCIA_DNS = 64
+TIMEOUT_DNS = 5.0                # segundos por consulta
+TTL_POR_DEFECTO = 300.0          # cuando el resolver no informa TTL
+TTL_MINIMO = 30.0
+TTL_MAXIMO = 3600.0
+TTL_NEGATIVO = 900.0             # NXDOMAIN
+
+_ARES_ENOTFOUND = 4              # código de c-ares para NXDOMAIN
+_FLAGS_NUMERICOS = socket.AI_NUMERICHOST | socket.AI_NUMERICSERV
+
+
+def host_de(url: str) -> str:
+    """Host en minúsculas de una URL (sin puerto)"""
+    try:
+        return (urlsplit(url.strip()).hostname or '').lower().rstrip('.')
+    except ValueError:
+        return ''
+
+
+def _es_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+@dataclass
+class EntradaDNS:
+    """Resultado cacheado de un host: direcciones (familia, ip) o NXDOMAIN"""
+    direcciones: List[Tuple[int, str]] = field(default_factory=list)
+    expira: float = 0.0
+    inexistente: bool = False
+
+
+# ==============================================================================
+# CACHE / RESOLVER
+# ==============================================================================
+
+class CacheDNS(AbstractResolver):
+    """
+    Resolver de aiohttp con cache en memoria por TTL (positiva y negativa).
+    Sirve para varios `asyncio.run` seguidos: la cache y el pool de hilos
+    no dependen del loop.
+    """
+
+    def __init__(
+        self,
+        concurrencia: int = CONCURRENCIA_DNS,
+        timeout: float = TIMEOUT_DNS,
+        ttl_por_defecto: float = TTL_POR_DEFECTO
+    ):
+        self.concurrencia = max(1, concurrencia)
+        self.timeout = timeout
+        self.ttl_por_defecto = ttl_por_defecto
+        self._entradas: Dict[str, EntradaDNS] = {}
+        self._vuelos = UnVuelo()
+        self._ejecutor = ThreadPoolExecutor(self.concurrencia, thread_name_prefix='dns')
+        self._aiodns = None
+        self._aiodns_loop = None
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._semaforo_loop = None
+
+        # Contadores
+        self.consultas = 0
+        self.hits = 0
+        self.inexistentes = 0
+        self.fallos = 0
+
+    # --------------------------------------------------------------------------
+    # Interfaz de aiohttp
+    # --------------------------------------------------------------------------
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> List[ResolveResult]:
+        entrada = await self.entrada(host)
+        if entrada.inexistente:
+            raise socket.gaierror(socket.EAI_NONAME, f"Name or service not known: {host}")
+        direcciones = [
+            (f, ip) for f, ip in entrada.direcciones
+            if family in (socket.AF_UNSPEC, f)
+        ]
+        if not direcciones:
+            # Falla transitoria en la consulta: que la descarga resuelva por su cuenta
+            return await self._resolver_sin_cache(host, port, family)
+        return [
+            ResolveResult(hostname=host, host=ip, port=port, family=f, proto=0, flags=_FLAGS_NUMERICOS)
+            for f, ip in direcciones
+        ]
+
+    @staticmethod
+    async def _resolver_sin_cache(
+        host: str, port: int, family: socket.AddressFamily
+    ) -> List[ResolveResult]:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM, family=family
+        )
+        return [
+            ResolveResult(hostname=host, host=direccion[0], port=port, family=f, proto=0, flags=_FLAGS_NUMERICOS)
+            for f, _, _, _, direccion in infos
+            if f in (socket.AF_INET, socket.AF_INET6)
+        ]
+
+    async def close(self) -> None:
+        # La cache sobrevive a cada sesión de aiohttp; se libera con `cerrar()`
+        pass
+
+    def cerrar(self) -> None:
+        self._ejecutor.shutdown(wait=False)
+
+    # --------------------------------------------------------------------------
+    # Consultas
+    # --------------------------------------------------------------------------
+
+    def es_inexistente(self, host: str) -> bool:
+        entrada = self._entradas.get(host.lower().rstrip('.'))
+        return entrada is not None and entrada.inexistente
+
+    async def entrada(self, host: str) -> EntradaDNS:
+        """Entrada vigente del host, consultando el DNS si no hay o venció"""
+        host = host.lower().rstrip('.')
+        entrada = self._entradas.get(host)
+        if entrada is not None and entrada.expira > time.monotonic():
+            self.hits += 1
+            return entrada
+        return await self._vuelos.ejecutar(host, lambda: self._consultar(host))
+
+    async def _consultar(self, host: str) -> EntradaDNS:
+        loop = asyncio.get_running_loop()
+        if self._semaforo is None or self._semaforo_loop is not loop:
+            self._semaforo = asyncio.Semaphore(self.concurrencia)
+            self._semaforo_loop = loop
+        async with self._semaforo:
+            self.consultas += 1
+            entrada = None
+            if aiodns is not None and not _es_ip(host):
+                entrada = await self._consultar_aiodns(host, loop)
+            if entrada is None:
+                entrada = await self._consultar_getaddrinfo(host, loop)
+        if entrada.inexistente:
+            self.inexistentes += 1
+        elif not entrada.direcciones:
+            self.fallos += 1
+        METRICAS.contar('dns_consultas_total', resultado=(
+            'nxdomain' if entrada.inexistente else 'ok' if entrada.direcciones else 'fallo'
+        ))
+        # Las fallas transitorias no se guardan: la próxima consulta vuelve a preguntar
+        if entrada.inexistente or entrada.direcciones:
+            self._entradas[host] = entrada
+        return entrada
+
+    async def _consultar_aiodns(self, host: str, loop) -> Optional[EntradaDNS]:
+        """Registros A con su TTL; None si hay que caer a getaddrinfo"""
+        if self._aiodns is None or self._aiodns_loop is not loop:
+            self._aiodns = aiodns.DNSResolver(loop=loop, timeout=self.timeout, tries=1)
+            self._aiodns_loop = loop
+        try:
+            registros = await asyncio.wait_for(self._aiodns.query(host, 'A'), self.timeout)
+        except aiodns.error.DNSError as e:
+            if e.args and e.args[0] == _ARES_ENOTFOUND:
+                return EntradaDNS(expira=time.monotonic() + TTL_NEGATIVO, inexistente=True)
+            return None
+        except asyncio.TimeoutError:
+            return None
+        if not registros:
+            return None
+        ttl = min(max(min(r.ttl for r in registros), TTL_MINIMO), TTL_MAXIMO)
+        return EntradaDNS(
+            direcciones=[(socket.AF_INET, r.host) for r in registros],
+            expira=time.monotonic() + ttl
+        )
+
+    async def _consultar_getaddrinfo(self, host: str, loop) -> EntradaDNS:
+        try:
+            infos = await asyncio.wait_for(
+                loop.run_in_executor(
+                    self._ejecutor,
+                    lambda: socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+                ),
+                self.timeout
+            )
+        except socket.gaierror as e:
+            if e.errno in (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)):
+                return EntradaDNS(expira=time.monotonic() + TTL_NEGATIVO, inexistente=True)
+            return EntradaDNS()           # falla transitoria: no se cachea
+        except (asyncio.TimeoutError, OSError):
+            return EntradaDNS()
+        direcciones = list(dict.fromkeys(
+            (familia, direccion[0]) for familia, _, _, _, direccion in infos
+            if familia in (socket.AF_INET, socket.AF_INET6)
+        ))
+        return EntradaDNS(direcciones=direcciones, expira=time.monotonic() + self.ttl_por_defecto)
+
+    # --------------------------------------------------------------------------
+    # Pre-resolución en bloque
+    # --------------------------------------------------------------------------
+
+    async def prerresolver(self, hosts: Iterable[str]) -> Set[str]:
+        """Resuelve todos los hosts distintos a la vez; devuelve los inexistentes (NXDOMAIN)"""
+        unicos = list(dict.fromkeys(h.lower().rstrip('.') for h in hosts if h))
+        inicio = time.monotonic()
+        with METRICAS.etapa('dns'):
+            entradas = await asyncio.gather(*(self.entrada(h) for h in unicos))
+        inexistentes = {h for h, e in zip(unicos, entradas) if e.inexistente}
+        sin_respuesta = sum(1 for e in entradas if not e.inexistente and not e.direcciones)
+        logger.info(
+            f"🧭 DNS: {len(unicos)} hosts resueltos en {time.monotonic() - inicio:.1f}s "
+            f"({len(inexistentes)} inexistentes, {sin_respuesta} sin respuesta)"
+        )
+        return inexistentes
+
+
+def prerresolver_urls(urls: Iterable[str], cache: CacheDNS) -> Set[str]:
+    """Versión síncrona para los pipelines: hosts inexistentes entre los de `urls`"""
+    return asyncio.run(cache.prerresolver(host_de(u) for u in urls))
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RESOLUCIÓN DE ENTIDADES (BLOQUEO + MINHASH LSH)
+===============================================
+`consolidar_y_guardar` y `eliminar_duplicados_y_guardar` deduplicaban por
+coincidencia exacta del título normalizado (más teléfono o dominio), con
+varias pasadas de sort + drop_duplicates. Se les escapaban casos como
+"La Cabrera Palermo" / "La Cabrera - Cabrera Norte".
+
+Acá:
+
+1. Candidatos (sin comparar todos contra todos):
+   - claves de bloqueo: teléfono normalizado, dominio propio, geohash
+   - MinHash de los shingles (trigramas) de título + dirección, con LSH
+     por bandas: dos registros son candidatos si coinciden en una banda
+2. Cada par candidato se verifica con reglas (`REGLAS`) sobre la
+   similitud de título/dirección y lo que comparten.
+3. Union-find arma los clusters; de cada uno sale un registro canónico
+   (el mejor rankeado, completado con los datos de los demás) y una fila
+   de auditoría con los ids fusionados y las reglas que los unieron.
+
+El costo es casi lineal: cada registro cae en un número fijo de buckets
+y los buckets enormes (p. ej. un geohash del centro) se acotan.
+"""
+
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from clasificacion_negocios import es_plataforma_excluir
+
+# ==============================================================================
+# NORMALIZACIÓN DE TÍTULOS
+# ==============================================================================
+
+PALABRAS_GENERICAS = ['sucursal', 'local', 'branch', 'store', 'tienda']
+PALABRAS_GENERICAS_AGRESIVO = PALABRAS_GENERICAS + [
+    'restaurant', 'bar', 'cafe', 'coffee', 'parrilla', 'grill'
+]
+BARRIOS = ['palermo', 'belgrano', 'recoleta', 'san telmo', 'puerto madero', 'villa crespo', 'barracas']
+
+_NO_PALABRA = re.compile(r'[^\w\s]')
+_NUMEROS = re.compile(r'\d+')
+_GENERICAS = re.compile(rf"\b({'|'.join(PALABRAS_GENERICAS)})\b")
+_GENERICAS_AGRESIVO = re.compile(rf"\b({'|'.join(PALABRAS_GENERICAS_AGRESIVO)})\b")
+_BARRIOS = re.compile(rf"\b({'|'.join(BARRIOS)})\b")
+
+
+def _sin_acentos(texto: str) -> str:
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', texto.lower())
+        if unicodedata.category(c) != 'Mn'
+    )
+
+
+def normalizar_titulo(titulo, agresivo: bool = False) -> str:
+    """
+    Título sin acentos, signos, números ni palabras genéricas (sucursal,
+    local...). `agresivo` quita además el rubro (bar, cafe, parrilla...) y
+    los barrios, como hacía `extraer_emails_directamente`.
+    """
+    if pd.isna(titulo):
+        return ""
+    titulo_norm = _NO_PALABRA.sub('', _sin_acentos(str(titulo)))
+    titulo_norm = _NUMEROS.sub('', titulo_norm)
+    if agresivo:
+        titulo_norm = _GENERICAS_AGRESIVO.sub('', titulo_norm)
+        titulo_norm = _BARRIOS.sub('', titulo_norm)
+    else:
+        titulo_norm = _GENERICAS.sub('', titulo_norm)
+    return ' '.join(titulo_norm.split()).strip()
+
+
+def normalizar_telefono(telefono) -> str:
+    """Últimos 8 dígitos del teléfono (número local, sin +54 / 11 / 9)"""
+    digitos = re.sub(r'\D', '', '' if pd.isna(telefono) else str(telefono))
+    return digitos[-8:] if len(digitos) >= 8 else ''
+
+
+def normalizar_direccion(direccion) -> str:
+    if pd.isna(direccion):
+        return ""
+    texto = _NO_PALABRA.sub(' ', _sin_acentos(str(direccion)))
+    texto = re.sub(r'\b(caba|buenos aires|argentina|ciudad autonoma de)\b', ' ', texto)
+    return ' '.join(texto.split())
+
+
+_NUMERO_CALLE = re.compile(r'\b\d{2,5}\b')
+
+
+def numero_calle(direccion: str) -> str:
+    """Primer número de la dirección normalizada (la altura)"""
+    m = _NUMERO_CALLE.search(direccion)
+    return m.group(0) if m else ''
+
+
+# ==============================================================================
+# GEOHASH
+# ==============================================================================
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash(lat: float, lon: float, precision: int = 7) -> str:
+    """Geohash estándar (precisión 7 ≈ 150 m, 6 ≈ 1 km)"""
+    lat_rango, lon_rango = [-90.0, 90.0], [-180.0, 180.0]
+    bits, bit, caracteres, par = 0, 0, [], True
+    while len(caracteres) < precision:
+        rango, valor = (lon_rango, lon) if par else (lat_rango, lat)
+        medio = (rango[0] + rango[1]) / 2
+        if valor >= medio:
+            bits = (bits << 1) | 1
+            rango[0] = medio
+        else:
+            bits <<= 1
+            rango[1] = medio
+        par = not par
+        bit += 1
+        if bit == 5:
+            caracteres.append(_BASE32[bits])
+            bits, bit = 0, 0
+    return ''.join(caracteres)
+
+
+# ==============================================================================
+# MINHASH + LSH
+# ==============================================================================
+
+PERMUTACIONES = 64
+BANDAS = 16                      # 16 bandas x 4 filas: umbral LSH ≈ 0.5
+TAMANO_SHINGLE = 3
+MAX_BUCKET = 300                 # buckets más grandes se parten en bloques de este tamaño
+
+# Hash multiply-shift sobre el crc32 de cada shingle: ((a * x + b) mod 2^64) >> 32
+_rng = np.random.default_rng(20251020)
+_A = _rng.integers(0, 1 << 64, size=PERMUTACIONES, dtype=np.uint64, endpoint=False) | np.uint64(1)
+_B = _rng.integers(0, 1 << 64, size=PERMUTACIONES, dtype=np.uint64, endpoint=False)
+_DESPLAZAMIENTO = np.uint64(32)
+
+
+def shingles(texto: str, k: int = TAMANO_SHINGLE) -> FrozenSet[str]:
+    texto = f" {texto} "
+    if len(texto) <= k:
+        return frozenset([texto]) if texto.strip() else frozenset()
+    return frozenset(texto[i:i + k] for i in range(len(texto) - k + 1))
+
+
+def firma_minhash(conjunto: Iterable[str]) -> Optional[np.ndarray]:
+    """Firma MinHash de un conjunto de shingles (None si está vacío)"""
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in conjunto), dtype=np.uint64)
+    if hashes.size == 0:
+        return None
+    return ((np.outer(_A, hashes) + _B[:, None]) >> _DESPLAZAMIENTO).min(axis=1)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+MIN_SHINGLES_CONTENCION = 5      # títulos más cortos ("Bar") contienen a demasiados
+
+
+def contencion(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """|A ∩ B| / min(|A|, |B|): alto si un título contiene al otro"""
+    if min(len(a), len(b)) < MIN_SHINGLES_CONTENCION:
+        return jaccard(a, b)
+    return len(a & b) / min(len(a), len(b))
+
+
+# ==============================================================================
+# RESOLUCIÓN
+# ==============================================================================
+
+@dataclass
+class ConfigResolucion:
+    """Umbrales de las reglas de fusión"""
+    contencion_titulo_telefono: float = 0.5     # mismo teléfono
+    contencion_titulo_dominio: float = 0.5      # mismo dominio propio
+    contencion_titulo_cercania: float = 0.8     # mismo geohash de 7 (≈150 m)
+    contencion_titulo: float = 0.8              # título + dirección parecidos
+    jaccard_direccion: float = 0.6
+    precision_geohash: int = 7
+
+
+REGLAS = ('telefono', 'dominio', 'cercania', 'titulo_direccion')
+
+
+@dataclass
+class ResultadoResolucion:
+    """Registros canónicos, auditoría de fusiones y cluster de cada fila de entrada"""
+    canonicos: pd.DataFrame
+    auditoria: pd.DataFrame
+    clusters: pd.Series = field(default_factory=pd.Series)
+
+    @property
+    def fusionados(self) -> int:
+        return int(self.auditoria['cantidad'].sum() - len(self.auditoria)) if len(self.auditoria) else 0
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.padre = list(range(n))
+
+    def buscar(self, x: int) -> int:
+        while self.padre[x] != x:
+            self.padre[x] = self.padre[self.padre[x]]
+            x = self.padre[x]
+        return x
+
+    def unir(self, a: int, b: int) -> None:
+        ra, rb = self.buscar(a), self.buscar(b)
+        if ra != rb:
+            self.padre[max(ra, rb)] = min(ra, rb)
+
+
+def _columna(df: pd.DataFrame, nombre: str) -> pd.Series:
+    return df[nombre] if nombre in df else pd.Series([None] * len(df), index=df.index)
+
+
+def _vacio(valor) -> bool:
+    return valor is None or (isinstance(valor, float) and pd.isna(valor)) or str(valor).strip() == ''
+
+
+def _pares_de_buckets(buckets: Dict[object, List[int]]) -> Set[Tuple[int, int]]:
+    pares: Set[Tuple[int, int]] = set()
+    for miembros in buckets.values():
+        if len(miembros) < 2:
+            continue
+        for inicio in range(0, len(miembros), MAX_BUCKET):
+            bloque = miembros[inicio:inicio + MAX_BUCKET]
+            pares.update(combinations(bloque, 2))
+    return pares
+
+
+def resolver_entidades(
+    df: pd.DataFrame,
+    config: Optional[ConfigResolucion] = None,
+    columna_id: str = 'place_id',
+    agresivo: bool = False
+) -> ResultadoResolucion:
+    """
+    Agrupa registros que son el mismo negocio y devuelve un canónico por grupo.
+
+    Usa las columnas de los registros de los pipelines: titulo, direccion,
+    telefono, dominio, latitud, longitud, rating, cantidad_reviews, emails,
+    whatsapp, url y `columna_id`. `agresivo` se pasa a `normalizar_titulo`.
+    """
+    config = config or ConfigResolucion()
+    df = df.reset_index(drop=True)
+    n = len(df)
+    if n == 0:
+        return ResultadoResolucion(df.copy(), pd.DataFrame(columns=COLUMNAS_AUDITORIA))
+
+    titulos = [normalizar_titulo(t, agresivo) for t in _columna(df, 'titulo')]
+    direcciones = [normalizar_direccion(d) for d in _columna(df, 'direccion')]
+    telefonos = [normalizar_telefono(t) for t in _columna(df, 'telefono')]
+    dominios = ['' if _vacio(d) else str(d).lower().removeprefix('www.') for d in _columna(df, 'dominio')]
+    latitudes = pd.to_numeric(_columna(df, 'latitud'), errors='coerce')
+    longitudes = pd.to_numeric(_columna(df, 'longitud'), errors='coerce')
+    geohashes = [
+        geohash(lat, lon, config.precision_geohash) if pd.notna(lat) and pd.notna(lon) else ''
+        for lat, lon in zip(latitudes, longitudes)
+    ]
+
+    alturas = [numero_calle(d) for d in direcciones]
+    sh_titulo = [shingles(t) for t in titulos]
+    sh_direccion = [shingles(d) for d in direcciones]
+
+    # 1. Candidatos: claves de bloqueo + LSH sobre título y dirección
+    buckets: Dict[object, List[int]] = defaultdict(list)
+    filas_por_banda = PERMUTACIONES // BANDAS
+    for i in range(n):
+        if telefonos[i]:
+            buckets[('tel', telefonos[i])].append(i)
+        if dominios[i] and not es_plataforma_excluir('', dominios[i]):
+            buckets[('dom', dominios[i])].append(i)
+        if geohashes[i]:
+            buckets[('geo', geohashes[i])].append(i)
+        firma = firma_minhash({f"t{s}" for s in sh_titulo[i]} | {f"d{s}" for s in sh_direccion[i]})
+        if firma is not None:
+            for banda in range(BANDAS):
+                tramo = firma[banda * filas_por_banda:(banda + 1) * filas_por_banda]
+                buckets[('lsh', banda, tramo.tobytes())].append(i)
+
+    candidatos = _pares_de_buckets(buckets)
+
+    # 2. Verificación de cada par
+    uf = _UnionFind(n)
+    reglas_por_par: List[Tuple[int, int, str]] = []
+    for i, j in candidatos:
+        if not sh_titulo[i] or not sh_titulo[j]:
+            continue
+        regla = None
+        if telefonos[i] and telefonos[i] == telefonos[j] \
+                and contencion(sh_titulo[i], sh_titulo[j]) >= config.contencion_titulo_telefono:
+            regla = 'telefono'
+        elif dominios[i] and dominios[i] == dominios[j] and not es_plataforma_excluir('', dominios[i]) \
+                and contencion(sh_titulo[i], sh_titulo[j]) >= config.contencion_titulo_dominio:
+            regla = 'dominio'
+        elif geohashes[i] and geohashes[i] == geohashes[j] \
+                and contencion(sh_titulo[i], sh_titulo[j]) >= config.contencion_titulo_cercania:
+            regla = 'cercania'
+        elif contencion(sh_titulo[i], sh_titulo[j]) >= config.contencion_titulo \
+                and jaccard(sh_direccion[i], sh_direccion[j]) >= config.jaccard_direccion \
+                and not (alturas[i] and alturas[j] and alturas[i] != alturas[j]):   # misma calle, otra altura
+            regla = 'titulo_direccion'
+        if regla:
+            uf.unir(i, j)
+            reglas_por_par.append((i, j, regla))
+
+    # 3. Clusters, canónicos y auditoría
+    raices = np.array([uf.buscar(i) for i in range(n)])
+    rating = pd.to_numeric(_columna(df, 'rating'), errors='coerce').fillna(-1)
+    reviews = pd.to_numeric(_columna(df, 'cantidad_reviews'), errors='coerce').fillna(-1)
+    orden = np.lexsort((np.arange(n), -reviews.to_numpy(), -rating.to_numpy()))
+
+    miembros: Dict[int, List[int]] = defaultdict(list)
+    for i in orden:
+        miembros[raices[i]].append(i)
+
+    reglas_cluster: Dict[int, Set[str]] = defaultdict(set)
+    for i, _, regla in reglas_por_par:
+        reglas_cluster[raices[i]].add(regla)
+
+    ids = _columna(df, columna_id).astype(str).tolist()
+    titulos_originales = _columna(df, 'titulo').astype(str).tolist()
+    grupos = list(miembros.items())                              # en orden del mejor de cada cluster
+    canonicos = df.iloc[[grupo[0] for _, grupo in grupos]].reset_index(drop=True)
+    valores = {c: df[c].tolist() for c in ['emails', *COLUMNAS_COMPLETAR] if c in df}
+
+    auditoria = []
+    cluster_de_fila = np.empty(n, dtype=np.int64)
+    for numero, (raiz, grupo) in enumerate(grupos):
+        cluster_de_fila[grupo] = numero
+        if len(grupo) == 1:
+            continue
+        for columna, valor in _completar(grupo, valores).items():
+            canonicos.at[numero, columna] = valor
+        auditoria.append({
+            'cluster': numero,
+            'canonico': ids[grupo[0]],
+            'ids': ', '.join(ids[i] for i in grupo),
+            'titulos': ' | '.join(titulos_originales[i] for i in grupo),
+            'cantidad': len(grupo),
+            'reglas': ', '.join(sorted(reglas_cluster[raiz])),
+        })
+
+    return ResultadoResolucion(
+        canonicos=canonicos,
+        auditoria=pd.DataFrame(auditoria, columns=COLUMNAS_AUDITORIA),
+        clusters=pd.Series(cluster_de_fila, index=df.index)
+    )
+
+
+COLUMNAS_AUDITORIA = ['cluster', 'canonico', 'ids', 'titulos', 'cantidad', 'reglas']
+
+# Columnas del canónico que se completan con los otros registros del cluster
+COLUMNAS_COMPLETAR = ['telefono', 'whatsapp', 'url', 'dominio', 'direccion', 'redes', 'url_menu']
+
+
+def _completar(grupo: List[int], valores: Dict[str, list]) -> Dict[str, object]:
+    """
+    Valores nuevos del canónico (`grupo[0]`): la unión de los emails del
+    cluster y los campos vacíos completados con el primer otro que los tenga.
+    """
+    cambios: Dict[str, object] = {}
+    if 'emails' in valores:
+        emails = set()
+        for i in grupo:
+            valor = valores['emails'][i]
+            if not _vacio(valor):
+                emails.update(e.strip() for e in str(valor).split(',') if e.strip())
+        cambios['emails'] = ', '.join(sorted(emails))
+    for columna in COLUMNAS_COMPLETAR:
+        if columna in valores and _vacio(valores[columna][grupo[0]]):
+            for i in grupo[1:]:
+                if not _vacio(valores[columna][i]):
+                    cambios[columna] = valores[columna][i]
+                    break
+    return cambios
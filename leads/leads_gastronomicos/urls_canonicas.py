@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+URLS CANÓNICAS Y DESCARGAS COMPARTIDAS
+======================================
+Muchos items de DataForSEO apuntan al mismo sitio: el dominio de una
+franquicia, una página de reservas compartida, variantes http/https o con
+y sin `www.`, URLs con `?utm_source=...`. Hasta ahora cada una se
+descargaba y parseaba por separado.
+
+- `clave_url` lleva una URL a una clave canónica (sin esquema, sin
+  `www.`, host en minúsculas, sin puerto por defecto, sin barra final, sin
+  parámetros de tracking, query ordenada, sin fragmento)
+- `MemoRedirecciones` recuerda a dónde terminó cada URL, así la próxima
+  vez se pide directo la URL final y se sabe qué sitios son el mismo
+- `UnVuelo` (single-flight) hace que los pedidos simultáneos con la misma
+  clave esperen al primero y compartan su resultado
+
+    vuelo = UnVuelo()
+    emails = await vuelo.ejecutar(clave_url(url), lambda: rastrear(url))
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Parámetros de query que no cambian el contenido de la página
+PARAMETROS_TRACKING = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref', 'ref_src', 'srsltid', 'hsa_acc',
+}
+PREFIJOS_TRACKING = ('utm_', 'hsa_', 'pk_', 'mtm_')
+
+PUERTOS_POR_DEFECTO = {'http': 80, 'https': 443}
+
+
+def _es_tracking(parametro: str) -> bool:
+    parametro = parametro.lower()
+    return parametro in PARAMETROS_TRACKING or parametro.startswith(PREFIJOS_TRACKING)
+
+
+def clave_url(url: str) -> str:
+    """
+    Clave canónica de una URL: 'HTTPS://www.Resto.com:443/menu/?utm_source=x'
+    y 'http://resto.com/menu' dan 'resto.com/menu'.
+    """
+    try:
+        partes = urlsplit(url.strip())
+        puerto = partes.port
+    except ValueError:
+        return url.strip()
+    esquema = (partes.scheme or 'http').lower()
+    host = (partes.hostname or '').lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    if puerto and puerto != PUERTOS_POR_DEFECTO.get(esquema):
+        host = f"{host}:{puerto}"
+    path = partes.path.rstrip('/') or ''
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True) if not _es_tracking(k)
+    ))
+    return f"{host}{path}" + (f"?{query}" if query else '')
+
+
+# ==============================================================================
+# REDIRECCIONES
+# ==============================================================================
+
+class MemoRedirecciones:
+    """Clave de URL pedida -> URL final a la que redirigió"""
+
+    def __init__(self):
+        self._destino: Dict[str, str] = {}
+
+    def registrar(self, url: str, url_final: str) -> None:
+        origen, destino = clave_url(url), clave_url(url_final)
+        if origen != destino:
+            self._destino[origen] = url_final
+
+    def resolver(self, url: str, max_saltos: int = 10) -> str:
+        """URL final conocida para `url` (siguiendo la cadena), o la misma `url`"""
+        actual = url
+        for _ in range(max_saltos):
+            siguiente = self._destino.get(clave_url(actual))
+            if siguiente is None or siguiente == actual:
+                break
+            actual = siguiente
+        return actual
+
+    def __len__(self) -> int:
+        return len(self._destino)
+
+
+# ==============================================================================
+# SINGLE-FLIGHT
+# ==============================================================================
+
+class UnVuelo:
+    """
+    Coalesce trabajos asíncronos por clave: mientras uno está en vuelo, los
+    demás con la misma clave lo esperan. Con `recordar=True` el resultado
+    queda guardado para toda la corrida (usar solo con resultados chicos).
+    """
+
+    def __init__(self, recordar: bool = False):
+        self.recordar = recordar
+        self._en_vuelo: Dict[str, asyncio.Future] = {}
+        self._hechos: Dict[str, Any] = {}
+        self.ejecutados = 0
+        self.coalescidos = 0
+
+    async def ejecutar(self, clave: str, fabrica: Callable[[], Awaitable[Any]]) -> Any:
+        if clave in self._hechos:
+            self.coalescidos += 1
+            return self._hechos[clave]
+        futuro = self._en_vuelo.get(clave)
+        if futuro is not None:
+            self.coalescidos += 1
+            return await asyncio.shield(futuro)
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._en_vuelo[clave] = futuro
+        self.ejecutados += 1
+        try:
+            resultado = await fabrica()
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+        except BaseException as e:
+            futuro.set_exception(e)
+            futuro.exception()          # evita el aviso de excepción no recuperada
+            raise
+        else:
+            futuro.set_result(resultado)
+            if self.recordar:
+                self._hechos[clave] = resultado
+            return resultado
+        finally:
+            del self._en_vuelo[clave]
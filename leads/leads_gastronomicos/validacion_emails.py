@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VALIDADOR DE EMAILS COMPILADO
+=============================
+Una sola implementación de `es_email_valido` para los dos pipelines, con
+dos perfiles:
+
+- PIPELINE: el de `pipeline_completo.py`
+- ESTRICTO: el de `extraer_emails_directamente.py` (más exclusiones,
+  pensado para PyMEs que usan Gmail/Yahoo)
+
+Cada perfil compila todas sus reglas de exclusión (emails genéricos,
+extensiones de archivo, dominios sospechosos y patrones raros) en una
+única regex de rechazo, en vez de recorrer los sets con `in` y correr
+varios `re.match` por email. Se expone:
+
+- `validador(email) -> bool`              para un email suelto
+- `validador.validar(serie) -> mascara`   para una pd.Series completa
+
+Revalidar un CSV histórico:
+    python3 validacion_emails.py resultados/emails_extraidos_20251020_195343.csv
+    python3 validacion_emails.py archivo.csv --perfil pipeline
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+from typing import Iterable, List
+
+import pandas as pd
+
+EMAIL_REGEX = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# ==============================================================================
+# LISTAS DE EXCLUSIÓN
+# ==============================================================================
+
+# Emails genéricos a ignorar
+EMAILS_IGNORAR = {
+    'example@example.com', 'test@test.com', 'admin@admin.com',
+    'info@example.com', 'contact@example.com', 'noreply@',
+    'no-reply@', 'webmaster@', 'postmaster@', '@sentry.io',
+    '@placeholder', '@example', 'xxx@', 'email@'
+}
+
+# Emails genéricos a ignorar - VALIDACIÓN ESTRICTA (permite Gmail, Yahoo, etc para PyMEs)
+EMAILS_IGNORAR_ESTRICTO = EMAILS_IGNORAR | {
+    'reservas@reservas', 'info@info', 'contact@contact',
+    'admin@', 'root@', 'user@', '@localhost', '@127.0.0.1'
+}
+
+# Extensiones de archivo a excluir (no son emails)
+EXTENSIONES_ARCHIVO = {
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.zip', '.rar',
+    '.mp4', '.mp3', '.avi', '.mov', '.css', '.js', '.json',
+    '.xml', '.txt', '.csv', '.html', '.htm', '.woff', '.ttf'
+}
+
+# Dominios sospechosos a excluir
+DOMINIOS_SOSPECHOSOS = {
+    '2x.png', '3x.png', '1x.png', 'x.png', 'x.jpg', 'x.svg',
+    'localhost', '127.0.0.1', 'test.com', 'example.com'
+}
+
+# TLDs combinados válidos (no son concatenaciones tipo info@domain.comarav)
+TLDS_COMBINADOS_VALIDOS = [
+    '.com.ar', '.gob.ar', '.org.ar', '.net.ar', '.edu.ar',
+    '.co.uk', '.co.nz', '.com.mx', '.com.br', '.com.au'
+]
+
+
+def _alternativa(literales: Iterable[str]) -> str:
+    # Más largos primero para que la alternancia no corte antes
+    return '|'.join(re.escape(x) for x in sorted(set(literales), key=len, reverse=True))
+
+
+# ==============================================================================
+# VALIDADOR
+# ==============================================================================
+
+class ValidadorEmails:
+    """
+    Validador de emails con las reglas de exclusión compiladas.
+
+    Todas las reglas del perfil son condiciones que se combinan con AND,
+    así que se pueden evaluar en cualquier orden: primero las estructurales
+    (largo, un único '@', formato base) y después una sola búsqueda de la
+    regex de rechazo sobre el email en minúsculas.
+    """
+
+    def __init__(self, ignorar: Iterable[str], estricto: bool = False):
+        self.estricto = estricto
+
+        # Reglas que los validadores originales aplicaban sobre el email en minúsculas
+        reglas: List[str] = [
+            _alternativa(ignorar),                                   # emails genéricos
+            rf'(?:{_alternativa(EXTENSIONES_ARCHIVO)})\Z',           # termina en extensión
+            rf'@.*(?:{_alternativa(DOMINIOS_SOSPECHOSOS)})',         # dominio sospechoso
+            r'[/\\]',                                                # parece una ruta
+            r'@[^.]*\Z',                                             # dominio sin punto
+            r'\.[^.@]?\Z',                                           # TLD de menos de 2 caracteres
+            r'\A\d+@',                                               # parte local solo números
+        ]
+        if estricto:
+            reglas += [
+                r'@(?=[\d.]*\d)[\d.]*\.[^.]*\Z',                     # dominio (sin TLD) solo números
+                r'@.{0,3}\.[^.]*\Z',                                 # dominio (sin TLD) < 4 caracteres
+                r'\A[^@]?@',                                         # parte local < 2 caracteres
+                r'\A\d{4}',                                          # empieza con 4+ números
+                r'\A[0-9.]{5,}@',                                    # parte local solo números y puntos
+                r'\d{5}',                                            # 5+ números seguidos
+            ]
+        else:
+            reglas += [
+                rf'@(?!.*(?:{_alternativa(TLDS_COMBINADOS_VALIDOS)})).*\.(?:com|net|org)[a-z]{{2,}}',  # .comarav
+                r'\A\d{4,}\.\d',                                     # tipo 4131.8028reservas@
+                r'\A\d{4,}[a-z]',                                    # empieza con 4+ números y letras
+            ]
+        self.regex_rechazo = re.compile('|'.join(f'(?:{r})' for r in reglas), re.DOTALL)
+
+        # Patrones del perfil estricto que se aplicaban sobre la parte local sin pasar a minúsculas
+        self.regex_rechazo_local = re.compile(
+            r'\A(?:image\d|img\d|photo\d|pic\d|[a-z]@|[a-z]{1,2}\d+@)'
+        ) if estricto else None
+
+    def es_valido(self, email: str) -> bool:
+        """Valida que el email sea legítimo y no un falso positivo"""
+        if not email or not isinstance(email, str):
+            return False
+        if len(email) < 6 or len(email) > 100 or email.count('@') != 1:
+            return False
+        if not EMAIL_REGEX.match(email):
+            return False
+        if self.regex_rechazo.search(email.lower()):
+            return False
+        if self.regex_rechazo_local is not None and self.regex_rechazo_local.match(email):
+            return False
+        return True
+
+    __call__ = es_valido
+
+    def validar(self, emails: pd.Series) -> pd.Series:
+        """Versión vectorizada: devuelve una máscara booleana alineada con `emails`"""
+        es_texto = emails.map(lambda x: isinstance(x, str))
+        s = emails.where(es_texto, '').astype(str)
+
+        largo = s.str.len()
+        mascara = (
+            es_texto
+            & largo.between(6, 100)
+            & (s.str.count('@') == 1)
+            & s.str.match(EMAIL_REGEX.pattern)
+            & ~s.str.lower().str.contains(self.regex_rechazo.pattern, flags=re.DOTALL, regex=True)
+        )
+        if self.regex_rechazo_local is not None:
+            mascara &= ~s.str.match(self.regex_rechazo_local.pattern)
+        return mascara.fillna(False).astype(bool)
+
+
+VALIDADOR_PIPELINE = ValidadorEmails(EMAILS_IGNORAR)
+VALIDADOR_ESTRICTO = ValidadorEmails(EMAILS_IGNORAR_ESTRICTO, estricto=True)
+
+PERFILES = {
+    'pipeline': VALIDADOR_PIPELINE,
+    'estricto': VALIDADOR_ESTRICTO,
+}
+
+
+# ==============================================================================
+# REVALIDACIÓN DE CSV HISTÓRICOS
+# ==============================================================================
+
+def revalidar_csv(ruta: Path, validador: ValidadorEmails, columna: str = 'emails') -> pd.DataFrame:
+    """
+    Revalida la columna de emails ("a@x.com, b@y.com") de un CSV y devuelve
+    el DataFrame con los emails inválidos removidos.
+    """
+    df = pd.read_csv(ruta, dtype={columna: str})
+    emails = (
+        df[columna].fillna('').str.split(',').explode().str.strip().str.lower()
+    )
+    emails = emails[emails != '']
+    validos = emails[validador.validar(emails)]
+    df[columna] = validos.groupby(level=0).agg(lambda x: ', '.join(sorted(set(x)))).reindex(df.index).fillna('')
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Revalidar emails de un CSV histórico')
+    parser.add_argument('csv', type=Path, help='CSV con una columna de emails separados por coma')
+    parser.add_argument('--perfil', choices=sorted(PERFILES), default='estricto')
+    parser.add_argument('--columna', default='emails')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    df = revalidar_csv(args.csv, PERFILES[args.perfil], args.columna)
+    duracion = time.perf_counter() - inicio
+
+    salida = args.csv.with_name(f"{args.csv.stem}_revalidado.csv")
+    df.to_csv(salida, index=False, encoding='utf-8')
+    print(f"✅ {len(df)} registros revalidados en {duracion:.2f}s")
+    print(f"   Con email válido: {(df[args.columna] != '').sum()}")
+    print(f"📁 {salida}")
+
+
+if __name__ == "__main__":
+    main()
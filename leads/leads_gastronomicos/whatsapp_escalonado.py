@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DETECCIÓN DE WHATSAPP ESCALONADA (HTML ESTÁTICO → NAVEGADOR)
+============================================================
+El WhatsApp de cada web se buscaba siempre abriendo la página en un
+Chromium headless, aunque la mayoría de los sitios tiene el enlace
+`wa.me/...` o `api.whatsapp.com/send?phone=...` en el HTML que devuelve
+el servidor.
+
+Ahora hay dos niveles:
+
+1. HTML estático (la misma descarga del rastreo de emails): se aplican
+   los mismos patrones de enlace y de texto que en el navegador
+   (`extraccion_whatsapp.whatsapp_de_html`).
+2. Navegador, solo si no apareció un número y la página muestra señales
+   de que el contenido lo arma JavaScript (`senal_js`):
+   - `cuerpo_vacio`: casi sin texto visible fuera de los scripts
+   - `spa`: punto de montaje vacío (`<div id="root"></div>`, `__next`...)
+     o un `<noscript>` que pide habilitar JavaScript
+   - `widget`: scripts de botones de WhatsApp (o que mencionan whatsapp/wa.me)
+   - `desafio_js`: página de verificación anti-bots
+   - `sin_respuesta`: la descarga estática falló (un 403 de un anti-bots
+     también cae acá); si el dominio está caído el pool lo saltea al instante
+
+No hay una pasada aparte: los extractores `whatsapp` y `senal_js` de
+`enriquecimiento` corren en el mismo rastreo que los emails y
+`DeteccionWhatsapp.de_resultados` arma la detección.
+
+Uso:
+    datos = enriquecer_sitios(urls, ['emails_pipeline', 'whatsapp', 'senal_js'], ...)
+    for url, resultados in datos.items():
+        d = contar_deteccion(DeteccionWhatsapp.de_resultados(resultados))
+        if d.numero: ...                  # resuelto sin navegador
+        elif d.escalar: pool.enviar(url)  # hace falta Playwright
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONFIGURACIÓN
+# ==============================================================================
+
+TEXTO_VISIBLE_MINIMO = 200                  # caracteres; menos = cuerpo vacío
+
+# Scripts de botones/chats de WhatsApp (en el src o en el código inline)
+SENALES_WIDGET = (
+    'whatsapp', 'wa.me', 'getbutton.io', 'joinchat', 'elfsight', 'wati.io',
+    'callbell', 'click-to-chat', 'clicktochat', 'wa-widget',
+)
+SENALES_DESAFIO = ('challenge-platform', 'cf-browser-verification', 'cf_chl_', '_incapsula_resource')
+
+_SCRIPTS = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+_NO_VISIBLE = re.compile(r'<(script|style|noscript|template|svg)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_CUERPO = re.compile(r'<body\b[^>]*>(.*)', re.IGNORECASE | re.DOTALL)
+_ETIQUETAS = re.compile(r'<[^>]+>')
+_MONTAJE_VACIO = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|svelte|main-app)["\'][^>]*>\s*</div>', re.IGNORECASE
+)
+_NOSCRIPT_JS = re.compile(
+    r'<noscript\b[^>]*>[^<]{0,300}?(?:enable|habilit|activ)[^<]{0,100}?javascript', re.IGNORECASE
+)
+
+
+# ==============================================================================
+# DETECCIÓN SOBRE EL HTML
+# ==============================================================================
+
+@dataclass
+class DeteccionWhatsapp:
+    """Resultado del nivel estático para una URL"""
+    numero: Optional[str] = None
+    senal_js: Optional[str] = None          # motivo para abrir el navegador
+
+    @property
+    def escalar(self) -> bool:
+        return self.numero is None and self.senal_js is not None
+
+    @classmethod
+    def de_resultados(cls, resultados: Dict[str, Any]) -> 'DeteccionWhatsapp':
+        """
+        Detección a partir de los extractores `whatsapp` y `senal_js` de
+        `enriquecimiento` ({} = no se pudo leer la web: sin_respuesta)
+        """
+        if not resultados:
+            return cls(senal_js='sin_respuesta')
+        numero = resultados.get('whatsapp')
+        return cls(numero=numero) if numero else cls(senal_js=resultados.get('senal_js'))
+
+
+def texto_visible(html: str) -> str:
+    """Texto del body sin scripts, estilos ni etiquetas (aproximado, sin parser)"""
+    cuerpo = _CUERPO.search(html)
+    texto = _NO_VISIBLE.sub(' ', cuerpo.group(1) if cuerpo else html)
+    return ' '.join(_ETIQUETAS.sub(' ', texto).split())
+
+
+def senal_js(html: str) -> Optional[str]:
+    """Motivo por el que la página necesitaría un navegador para mostrar sus contactos; None si no hay"""
+    minusculas = html.lower()
+    if any(s in minusculas for s in SENALES_DESAFIO):
+        return 'desafio_js'
+    for atributos, codigo in _SCRIPTS.findall(html):
+        fragmento = (atributos + codigo).lower()
+        if any(s in fragmento for s in SENALES_WIDGET):
+            return 'widget'
+    if _MONTAJE_VACIO.search(html) or _NOSCRIPT_JS.search(html):
+        return 'spa'
+    if len(texto_visible(html)) < TEXTO_VISIBLE_MINIMO:
+        return 'cuerpo_vacio'
+    return None
+
+
+def contar_deteccion(deteccion: DeteccionWhatsapp) -> DeteccionWhatsapp:
+    """Suma la detección a `whatsapp_deteccion_total` y la devuelve"""
+    if deteccion.numero:
+        METRICAS.contar('whatsapp_deteccion_total', resultado='html')
+    elif deteccion.escalar:
+        METRICAS.contar('whatsapp_deteccion_total', resultado='navegador', senal=deteccion.senal_js)
+    else:
+        METRICAS.contar('whatsapp_deteccion_total', resultado='sin_whatsapp')
+    return deteccion
+